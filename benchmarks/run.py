@@ -0,0 +1,208 @@
+"""
+Benchmark harness for the sync, render and admin hot paths.
+
+    python -m benchmarks.run --categories 10 --templates 100 --size 4096 --output results.json
+
+Seeds N categories x M templates into a throwaway SQLite database and measures full and
+incremental sync_templates, the admin changelists, single-template render latency,
+peak memory and the query plans of the hot lookups. Results are printed (or written) as JSON so runs can be compared across versions.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import time
+import tracemalloc
+
+
+def timed(func, *args, **kwargs) -> tuple:
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def latencies(samples: list) -> dict:
+    samples = sorted(samples)
+    quantiles = statistics.quantiles(samples, n=100, method='inclusive') if len(samples) > 1 else samples * 99
+    return {
+        'count': len(samples),
+        'min_ms': samples[0] * 1000,
+        'p50_ms': quantiles[49] * 1000,
+        'p95_ms': quantiles[94] * 1000,
+        'p99_ms': quantiles[98] * 1000,
+        'max_ms': samples[-1] * 1000,
+    }
+
+
+def seed(categories: int, templates: int, size: int) -> list:
+    from dj_dynamic_templates.models import DjDynamicTemplate, DjDynamicTemplateCategory, content_digest
+
+    body = ('<p>Hello {{ name }}, this is line {{ forloop.counter }}.</p>\n' * (size // 60 + 1))[:size]
+    category_objs = DjDynamicTemplateCategory.objects.bulk_create(
+        DjDynamicTemplateCategory(app='bench', name=f'category_{index}') for index in range(categories)
+    )
+    template_objs = []
+    for category in category_objs:
+        for index in range(templates):
+            content = f'{{% for item in items %}}{body}{{% endfor %}}<!-- {category.name}/{index} -->'
+            template_objs.append(DjDynamicTemplate(
+                category=category, template_name=f'template_{index}', content=content, content_hash=content_digest(content)
+            ))
+    DjDynamicTemplate.objects.bulk_create(template_objs, batch_size=500)
+    return [template.loader_name for template in DjDynamicTemplate.objects.select_related('category').order_by('id')[:1]]
+
+
+def bench_sync(total: int, changed_ratio: float) -> dict:
+    from django.core.management import call_command
+    from dj_dynamic_templates.models import DjDynamicTemplate, content_digest
+
+    results = {}
+    for label in ('full', 'unchanged'):
+        _, elapsed = timed(call_command, 'sync_templates', app=['bench'], stdout=io.StringIO())
+        results[label] = {'seconds': elapsed, 'files_per_second': total / elapsed if elapsed else None}
+
+    changed = list(DjDynamicTemplate.objects.order_by('id').values_list('pk', 'content')[:max(1, int(total * changed_ratio))])
+    for pk, content in changed:
+        content = f'{content}\n<!-- changed -->'
+        DjDynamicTemplate.objects.filter(pk=pk).update(content=content, content_hash=content_digest(content))
+    _, elapsed = timed(call_command, 'sync_templates', app=['bench'], stdout=io.StringIO())
+    results['incremental'] = {'seconds': elapsed, 'changed': len(changed), 'files_per_second': total / elapsed if elapsed else None}
+    return results
+
+
+def bench_changelists(repeat: int) -> dict:
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    user = get_user_model().objects.create_superuser('bench', 'bench@example.com', 'bench')
+    client = Client()
+    client.force_login(user)
+    results = {}
+    for label, url in (
+        ('templates', '/admin/dj_dynamic_templates/djdynamictemplate/'),
+        ('categories', '/admin/dj_dynamic_templates/djdynamictemplatecategory/'),
+    ):
+        samples, queries = [], 0
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as context:
+                response, elapsed = timed(client.get, url)
+            assert response.status_code == 200, f'{url} returned {response.status_code}'
+            samples.append(elapsed)
+            queries = len(context.captured_queries)
+        results[label] = {**latencies(samples), 'queries': queries}
+    return results
+
+
+def bench_render(loader_name: str, repeat: int) -> dict:
+    from django.contrib.auth import get_user_model
+    from django.template.loader import render_to_string
+    from django.test import Client
+    from dj_dynamic_templates.cache import template_cache
+    from dj_dynamic_templates.models import DjDynamicTemplate
+
+    context = {'name': 'Benchmark', 'items': range(3)}
+    template_cache.clear()
+    _, cold = timed(render_to_string, loader_name, context)
+    samples = [timed(render_to_string, loader_name, context)[1] for _ in range(repeat)]
+
+    user, _ = get_user_model().objects.get_or_create(username='bench', defaults={'is_staff': True, 'is_superuser': True})
+    client = Client()
+    client.force_login(user)
+    template_id = DjDynamicTemplate.objects.filter(template_is_active=True).values_list('pk', flat=True).first()
+    url = f'/admin/dj_dynamic_templates/djdynamictemplate/template-view/{template_id}/'
+    view_samples = [timed(client.get, url)[1] for _ in range(repeat)]
+    etag = client.get(url).get('ETag')
+    revalidate_samples = [timed(client.get, url, HTTP_IF_NONE_MATCH=etag)[1] for _ in range(repeat)]
+    return {
+        'loader_cold_ms': cold * 1000,
+        'loader': latencies(samples),
+        'view': latencies(view_samples),
+        'view_not_modified': latencies(revalidate_samples),
+    }
+
+
+def explain_queries() -> dict:
+    """Query plans of the hot lookups, to check they use the indexes on the current database."""
+    from django.db import connection
+    from dj_dynamic_templates.models import DjDynamicTemplate
+
+    template = DjDynamicTemplate.objects.filter(template_is_active=True).select_related('category').first()
+    queries = {
+        'sync_active_by_app': DjDynamicTemplate.objects.select_related('category').filter(
+            category__app__in=[template.category.app], template_is_active=True
+        ).order_by('id'),
+        'clean_duplicate_check': DjDynamicTemplate.objects.filter(
+            template_name=template.template_name, category=template.category, template_is_active=True
+        ).exclude(pk=template.pk),
+        'admin_active_changelist': DjDynamicTemplate.objects.filter(template_is_active=True)[:20],
+        'name_revisions': DjDynamicTemplate.objects.filter(
+            category=template.category, template_name=template.template_name
+        ).order_by('-created_at'),
+        'lineage_history': DjDynamicTemplate.objects.filter(lineage=template.lineage).order_by('-revision'),
+    }
+    return {'vendor': connection.vendor, **{label: queryset.explain() for label, queryset in queries.items()}}
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--categories', type=int, default=10, help='Number of categories to seed')
+    parser.add_argument('--templates', type=int, default=50, help='Number of templates per category')
+    parser.add_argument('--size', type=int, default=2048, help='Approximate template size in bytes')
+    parser.add_argument('--changed', type=float, default=0.1, help='Ratio of templates changed before the incremental sync')
+    parser.add_argument('--repeat', type=int, default=50, help='Samples per latency measurement')
+    parser.add_argument('--output', type=str, help='Write the JSON results to this file instead of stdout')
+    parser.add_argument('--keep', action='store_true', help='Keep the temporary BASE_DIR for inspection')
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    django.setup()
+    try:
+        call_command('migrate', verbosity=0, interactive=False)
+        tracemalloc.start()
+        (loader_name,), seed_seconds = timed(seed, args.categories, args.templates, args.size)
+        total = args.categories * args.templates
+        results = {
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'platform': platform.platform(),
+            },
+            'parameters': vars(args),
+            'seed_seconds': seed_seconds,
+            'sync': bench_sync(total, args.changed),
+            'changelist': bench_changelists(args.repeat),
+            'render': bench_render(loader_name, args.repeat),
+            'explain': explain_queries(),
+        }
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results['memory'] = {
+            'traced_peak_bytes': peak,
+            'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        }
+    finally:
+        if not args.keep:
+            shutil.rmtree(settings.BASE_DIR, ignore_errors=True)
+
+    output = json.dumps(results, indent=2, default=str)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output)
+    else:
+        sys.stdout.write(output + '\n')
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Throwaway settings for the benchmark harness: a SQLite database and template directories
+inside a temporary BASE_DIR, removed by the harness when it is done.
+"""
+import os
+import tempfile
+
+BASE_DIR = os.environ.get('DJ_DYNAMIC_TEMPLATES_BENCH_DIR') or tempfile.mkdtemp(prefix='dj_dynamic_templates_bench_')
+
+SECRET_KEY = 'dj-dynamic-templates-benchmarks'
+DEBUG = False
+ALLOWED_HOSTS = ['testserver']
+USE_TZ = True
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'dj_dynamic_templates',
+]
+
+MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+]
+
+ROOT_URLCONF = 'benchmarks.urls'
+
+# Point DJ_DYNAMIC_TEMPLATES_BENCH_DB_ENGINE at e.g. django.db.backends.postgresql (with the
+# matching NAME/HOST/PORT/USER/PASSWORD variables) to compare query plans on another database.
+DATABASES = {
+    'default': {
+        'ENGINE': os.environ.get('DJ_DYNAMIC_TEMPLATES_BENCH_DB_ENGINE', 'django.db.backends.sqlite3'),
+        'NAME': os.environ.get('DJ_DYNAMIC_TEMPLATES_BENCH_DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
+        'HOST': os.environ.get('DJ_DYNAMIC_TEMPLATES_BENCH_DB_HOST', ''),
+        'PORT': os.environ.get('DJ_DYNAMIC_TEMPLATES_BENCH_DB_PORT', ''),
+        'USER': os.environ.get('DJ_DYNAMIC_TEMPLATES_BENCH_DB_USER', ''),
+        'PASSWORD': os.environ.get('DJ_DYNAMIC_TEMPLATES_BENCH_DB_PASSWORD', ''),
+    }
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+            'loaders': [
+                'dj_dynamic_templates.loaders.DatabaseLoader',
+                'django.template.loaders.app_directories.Loader',
+            ],
+        },
+    },
+]
+
+STATIC_URL = '/static/'
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
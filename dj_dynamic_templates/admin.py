@@ -1,13 +1,23 @@
-import os
-from django.utils.html import format_html
+from asgiref.sync import sync_to_async
+from datetime import datetime
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db.models import QuerySet, prefetch_related_objects
+from django.template.defaultfilters import filesizeformat
+from django.template.response import TemplateResponse
+from django.utils.html import format_html, format_html_join
 from django.shortcuts import redirect
 from django.urls import reverse, path, include
 from django.contrib import admin, messages
 from django.http import HttpResponseRedirect
 from django.contrib.auth.admin import UserAdmin
+from django.contrib.auth.views import redirect_to_login
 from django.db import IntegrityError, transaction
 from .forms import *
-from .views import template_view
+from .relocate import relocate_categories
+from .sandbox import RenderProfile, TemplateLimitExceeded, get_profile, save_profile
+from .storage import get_storage
+from .views import atemplate_view, metrics_view, template_view
 
 try:
     from markdownx.admin import MarkdownxModelAdmin
@@ -16,6 +26,13 @@ except ModuleNotFoundError:
         pass
 
 
+def summarize(names: list, limit: int = 5) -> str:
+    quoted = [f"'{name}'" for name in names[:limit]]
+    if len(names) > limit:
+        return ", ".join(quoted) + f" and {len(names) - limit} more"
+    return ", ".join(quoted)
+
+
 @admin.register(DjDynamicTemplateCategory)
 class DjDynamicTemplateCategoryAdmin(admin.ModelAdmin):
 
@@ -30,6 +47,8 @@ class DjDynamicTemplateCategoryAdmin(admin.ModelAdmin):
 
     change_form_template = 'category_change_form.html'
     form = DjDynamicTemplateCategoryForm
+    files_preview_size = 20
+    files_per_page = 100
     actions = ['create_directory', 'delete_directory']
     readonly_fields = ['created_by', 'created_at', 'last_updated_at', 'last_updated_by']
 
@@ -50,7 +69,9 @@ class DjDynamicTemplateCategoryAdmin(admin.ModelAdmin):
 
     @staticmethod
     def is_directory_exists(obj: DjDynamicTemplateCategory) -> bool:
-        if obj.is_directory_exists:
+        if obj.directory_exists is None:
+            return format_html("""<img src="/static/admin/img/icon-unknown.svg" alt="Not Verified">""")
+        elif obj.directory_exists:
             return format_html("""<img src="/static/admin/img/icon-yes.svg" alt="True">""")
         else:
             return format_html("""<img src="/static/admin/img/icon-no.svg" alt="True">""")
@@ -94,24 +115,99 @@ class DjDynamicTemplateCategoryAdmin(admin.ModelAdmin):
             return []
 
     @staticmethod
-    def files_in_directory(obj: DjDynamicTemplate):
-        return format_html("<ol>" + "".join(['<li>{file_name}</li>'.format(file_name=file) for file in obj.files_in_dir]) + "</ol>")
+    def file_rows(entries: list, active: set) -> str:
+        return format_html_join('', '<tr><td>{}</td><td>{}</td><td>{}</td><td>{}</td></tr>', (
+            (entry.name, filesizeformat(entry.size), datetime.fromtimestamp(entry.mtime).strftime('%Y-%m-%d %H:%M:%S'),
+             'Active template' if entry.name in active else 'Orphan')
+            for entry in entries
+        ))
+
+    def files_in_directory(self, obj: DjDynamicTemplateCategory):
+        entries = obj.list_files()
+        active = obj.active_file_names()
+        orphans = sum(1 for entry in entries if entry.name not in active)
+        return format_html(
+            '<p>{} files, {}, {} orphaned. <a href="{}">Browse and search all files</a></p>'
+            '<table><thead><tr><th>File</th><th>Size</th><th>Modified</th><th>Status</th></tr></thead><tbody>{}</tbody></table>',
+            len(entries), filesizeformat(sum(entry.size for entry in entries)), orphans,
+            reverse('admin:dj_dynamic_templates_djdynamictemplatecategory_files', args=[obj.pk]),
+            self.file_rows(entries[:self.files_preview_size], active),
+        )
+
+    def files_view(self, request, object_id):
+        """
+        Paginated listing of the category directory, searchable with ?q= and filterable with
+        ?status=active or ?status=orphan. Only the files of the page are matched against the
+        database unless the status filter needs all of them.
+        """
+        if not request.user.has_perm('dj_dynamic_templates.can_view_files_in_directory'):
+            raise PermissionDenied
+        obj = self.get_object(request, object_id)
+        if obj is None:
+            return self._get_obj_does_not_exist_redirect(request, self.opts, object_id)
+        search = request.GET.get('q', '').strip()
+        status = request.GET.get('status')
+        entries = obj.list_files(search)
+        if status in ('active', 'orphan'):
+            active = obj.active_file_names()
+            entries = [entry for entry in entries if (entry.name in active) == (status == 'active')]
+        page = Paginator(entries, self.files_per_page).get_page(request.GET.get('p'))
+        if status not in ('active', 'orphan'):
+            active = obj.active_file_names([entry.name for entry in page])
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.opts,
+            'original': obj,
+            'title': f'Files in {obj.directory_path}',
+            'search': search,
+            'status': status,
+            'page': page,
+            'page_range': page.paginator.get_elided_page_range(page.number),
+            'files': [(entry, datetime.fromtimestamp(entry.mtime), entry.name in active) for entry in page],
+        }
+        return TemplateResponse(request, 'category_files.html', context)
+
+    def get_urls(self) -> list:
+        urls = super(DjDynamicTemplateCategoryAdmin, self).get_urls()
+        return [
+            path('<path:object_id>/files/', self.admin_site.admin_view(self.files_view), name='dj_dynamic_templates_djdynamictemplatecategory_files'),
+        ] + urls
 
     @admin.action(description='Create Category Directory for selected Records')
     def create_directory(self, request, queryset) -> None:
-        for obj in queryset:
-            if obj.make_directory():
-                self.message_user(request, f"Directory '{obj.name}' has been successfully created in the 'templates' directory of the '{obj.app}' app.", messages.SUCCESS)
-            else:
-                self.message_user(request, f"Directory '{obj.name}' already exists in the 'templates' directory of the '{obj.app}' app.", messages.ERROR)
+        categories = list(queryset)
+        created, failed = get_storage().map(lambda obj: obj.make_directory(), categories)
+        DjDynamicTemplateCategory.save_sync_state(categories)
+        existing = [obj for obj, result in created.items() if not result]
+        created = [obj for obj, result in created.items() if result]
+        if len(created) == 1:
+            self.message_user(request, f"Directory '{created[0].name}' has been successfully created in the 'templates' directory of the '{created[0].app}' app.", messages.SUCCESS)
+        elif created:
+            self.message_user(request, f"{len(created)} category directories have been successfully created: {summarize([str(obj) for obj in created])}.", messages.SUCCESS)
+        if len(existing) == 1:
+            self.message_user(request, f"Directory '{existing[0].name}' already exists in the 'templates' directory of the '{existing[0].app}' app.", messages.ERROR)
+        elif existing:
+            self.message_user(request, f"{len(existing)} category directories already exist: {summarize([str(obj) for obj in existing])}.", messages.ERROR)
+        if failed:
+            self.message_user(request, f"Failed to create {len(failed)} category directories: {summarize([f'{obj} ({error})' for obj, error in failed.items()])}.", messages.ERROR)
 
     @admin.action(description='Remove Category Directory for selected Records')
     def delete_directory(self, request, queryset) -> None:
-        for obj in queryset:
-            if obj.remove_directory():
-                self.message_user(request, f"Directory '{obj.name}' has been successfully deleted in the 'templates' directory of the '{obj.app}' app.", messages.SUCCESS)
-            else:
-                self.message_user(request, f"Directory '{obj.name}' does not exist in the 'templates' directory of the '{obj.app}' app.", messages.ERROR)
+        categories = list(queryset)
+        deleted, failed = get_storage().map(lambda obj: obj.remove_directory(), categories)
+        DjDynamicTemplateCategory.save_sync_state(categories)
+        missing = [obj for obj, result in deleted.items() if not result]
+        deleted = [obj for obj, result in deleted.items() if result]
+        if len(deleted) == 1:
+            self.message_user(request, f"Directory '{deleted[0].name}' has been successfully deleted in the 'templates' directory of the '{deleted[0].app}' app.", messages.SUCCESS)
+        elif deleted:
+            self.message_user(request, f"{len(deleted)} category directories have been successfully deleted: {summarize([str(obj) for obj in deleted])}.", messages.SUCCESS)
+        if len(missing) == 1:
+            self.message_user(request, f"Directory '{missing[0].name}' does not exist in the 'templates' directory of the '{missing[0].app}' app.", messages.ERROR)
+        elif missing:
+            self.message_user(request, f"{len(missing)} category directories do not exist: {summarize([str(obj) for obj in missing])}.", messages.ERROR)
+        if failed:
+            self.message_user(request, f"Failed to delete {len(failed)} category directories: {summarize([f'{obj} ({error})' for obj, error in failed.items()])}.", messages.ERROR)
 
     def changeform_view(self, request, object_id=None, form_url="", extra_context=None):
         if '_sync_dir' in request.POST:
@@ -128,20 +224,32 @@ class DjDynamicTemplateCategoryAdmin(admin.ModelAdmin):
             old_obj = self.model.objects.get(pk=obj.pk)
         else:
             obj.created_by = obj.last_updated_by = request.user
+        if change and old_obj.directory_path != obj.directory_path and '_make_dir' in request.POST:
+            app, name = obj.app, obj.name
+            obj.app, obj.name = old_obj.app, old_obj.name
+            obj.save()
+            self.relocate(request, [(obj, app, name)])
+            return
         obj.save()
         if '_make_dir' in request.POST:
             self.create_directory(request, [obj])
-        if change and old_obj.directory_path != obj.directory_path and '_make_dir' in request.POST:
-            try:
-                os.rename(old_obj.directory_path, obj.directory_path)
-                self.message_user(request, f"Directory path updated: Changed from '{old_obj.directory_path}' to '{obj.directory_path}'.", messages.SUCCESS)
-            except FileExistsError:
-                self.message_user(request, f"Directory '{obj.name}' already exists in the 'templates' directory of the '{obj.app}' app.", messages.ERROR)
-            except FileNotFoundError:
-                if old_obj.app != obj.app:
-                    self.create_directory(request, [obj])
-                else:
-                    self.message_user(request, f"Directory '{old_obj.name}' does not exist in the 'templates' directory of the '{old_obj.app}' app.", messages.ERROR)
+
+    def relocate(self, request, moves: list) -> None:
+        """Move categories along with their directories, reporting the outcome once the directories have moved."""
+        paths = {category: category.directory_path for category, _, _ in moves}
+
+        def report(relocation) -> None:
+            for category in relocation.moved:
+                self.message_user(request, f"Directory path updated: Changed from '{paths[category]}' to '{category.directory_path}'.", messages.SUCCESS)
+            for category in relocation.created:
+                self.message_user(request, f"Directory '{category.name}' has been successfully created in the 'templates' directory of the '{category.app}' app.", messages.SUCCESS)
+            for category, error in relocation.failed:
+                self.message_user(request, f"Failed to move '{paths[category]}', the category '{category}' was left unchanged: {error}", messages.ERROR)
+
+        try:
+            relocate_categories(moves, user=request.user, on_complete=report)
+        except FileExistsError as error:
+            self.message_user(request, f"Directory '{error}' already exists, the category was left unchanged.", messages.ERROR)
 
     def delete_model(self, request, obj) -> None:
         obj.remove_directory()
@@ -156,7 +264,7 @@ class DjDynamicTemplateAdmin(MarkdownxModelAdmin):
     list_filter = ['category', 'created_by', 'created_at']
     readonly_fields = ['created_at', 'created_by']
     exclude = ['template_is_active']
-    actions = ['sync_templates', 'delete_templates']
+    actions = ['sync_templates', 'delete_templates', 'rollback_templates']
     change_form_template = 'template_change_form.html'
 
     def get_actions(self, request) -> dict:
@@ -165,6 +273,8 @@ class DjDynamicTemplateAdmin(MarkdownxModelAdmin):
             del actions['sync_templates']
         if not request.user.has_perm('dj_dynamic_templates.can_delete_file'):
             del actions['delete_templates']
+        if not (request.user.has_perm('dj_dynamic_templates.can_view_inactive_templates') and request.user.has_perm('dj_dynamic_templates.can_create_file')):
+            del actions['rollback_templates']
         return actions
 
     def get_exclude(self, request, obj=None) -> list:
@@ -180,9 +290,15 @@ class DjDynamicTemplateAdmin(MarkdownxModelAdmin):
     def get_queryset(self, request):
         queryset = super(DjDynamicTemplateAdmin, self).get_queryset(request)
         if not request.user.has_perm('dj_dynamic_templates.can_view_inactive_templates'):
-            queryset = queryset.exclude(template_is_active=False)
+            queryset = queryset.filter(template_is_active=True)
         return queryset
 
+    def get_object(self, request, object_id, from_field=None):
+        obj = super().get_object(request, object_id, from_field)
+        if obj is not None:
+            obj.unpack_content()
+        return obj
+
     def get_list_filter(self, request) -> list:
         list_filter = self.list_filter.copy()
         if request.user.has_perm('dj_dynamic_templates.can_view_inactive_templates'):
@@ -200,10 +316,11 @@ class DjDynamicTemplateAdmin(MarkdownxModelAdmin):
 
     def get_readonly_fields(self, request, obj=None) -> list:
         if obj:
-            fields = self.readonly_fields + ['revision_of']
+            fields = self.readonly_fields + ['revision_of', 'revision']
             if obj.template_is_active:
                 if request.user.has_perm('dj_dynamic_templates.can_view_file_status'):
                     fields.append('template_status')
+                fields.append('render_profile')
             return fields
         else:
             return []
@@ -217,34 +334,95 @@ class DjDynamicTemplateAdmin(MarkdownxModelAdmin):
             old_obj.template_is_active = False
             old_obj.save()
             old_obj.delete_file()
+            DjDynamicTemplate.save_sync_state([old_obj])
             obj.created_by = request.user
             obj.revision_of = old_obj
             obj.pk = None
-            self.sync_templates(request, [obj])
         obj.save()
         if '_make_template' in request.POST:
             self.sync_templates(request, [obj])
 
+    @staticmethod
+    def with_categories(queryset) -> list:
+        if isinstance(queryset, QuerySet):
+            return list(queryset.select_related('category'))
+        templates = list(queryset)
+        prefetch_related_objects(templates, 'category')
+        return templates
+
     @admin.action(description='Sync Templates to File for selected records')
     def sync_templates(self, request, queryset) -> None:
-        for obj in queryset:
-            if not obj.template_is_active:
-                self.message_user(request, f"'{obj.template_name}' Template is Inactive. So, Unable to sync")
-            elif obj.create_file():
-                self.message_user(request, f"Successfully synced template '{obj.template_name}' into '{obj.category.name}' directory of App '{obj.category.app}' template's directory", messages.SUCCESS)
-            else:
-                if obj.category.make_directory():
-                    self.message_user(request, f"Directory does not exist so, '{obj.category.name}' directory has been created in the 'templates' directory of the '{obj.category.name}' app.", messages.WARNING)
-                    obj.create_file()
-                    self.message_user(request, f"Successfully synced template '{obj.template_name}' into '{obj.category.name}' directory of App {obj.category.app}' template's directory", messages.SUCCESS)
+        templates = self.with_categories(queryset)
+        inactive = [obj for obj in templates if not obj.template_is_active]
+        templates = [obj for obj in templates if obj.template_is_active]
+        if len(inactive) == 1:
+            self.message_user(request, f"'{inactive[0].template_name}' Template is Inactive. So, Unable to sync")
+        elif inactive:
+            self.message_user(request, f"{len(inactive)} templates are Inactive. So, Unable to sync: {summarize([obj.template_name for obj in inactive])}")
+
+        categories = {obj.category_id: obj.category for obj in templates}
+        created, failed = get_storage().map(lambda category: category.make_directory(exists_ok=True), list(categories.values()))
+        DjDynamicTemplateCategory.save_sync_state(categories.values())
+        created = [category for category, result in created.items() if result]
+        if len(created) == 1:
+            self.message_user(request, f"Directory does not exist so, '{created[0].name}' directory has been created in the 'templates' directory of the '{created[0].app}' app.", messages.WARNING)
+        elif created:
+            self.message_user(request, f"{len(created)} category directories did not exist so, they have been created: {summarize([str(category) for category in created])}.", messages.WARNING)
+        missing = {category.pk for category in failed}
+        if failed:
+            self.message_user(request, f"Failed to create {len(failed)} category directories: {summarize([f'{category} ({error})' for category, error in failed.items()])}.", messages.ERROR)
+
+        synced, failed = get_storage().map(lambda obj: obj.create_file(), [obj for obj in templates if obj.category_id not in missing])
+        DjDynamicTemplate.save_sync_state(obj for obj, result in synced.items() if result)
+        synced = [obj for obj, result in synced.items() if result]
+        if len(synced) == 1:
+            obj = synced[0]
+            self.message_user(request, f"Successfully synced template '{obj.template_name}' into '{obj.category.name}' directory of App '{obj.category.app}' template's directory", messages.SUCCESS)
+        elif synced:
+            self.message_user(request, f"Successfully synced {len(synced)} templates: {summarize([obj.template_name for obj in synced])}", messages.SUCCESS)
+        if failed:
+            self.message_user(request, f"Failed to sync {len(failed)} templates: {summarize([f'{obj.template_name} ({error})' for obj, error in failed.items()])}", messages.ERROR)
 
     @admin.action(description='Delete Template Files for selected records')
     def delete_templates(self, request, queryset) -> None:
-        for obj in queryset:
-            if obj.delete_file():
-                self.message_user(request, f"Successfully deleted template '{obj.template_name}' in '{obj.category.name} directory of App {obj.category.app}' template's directory", messages.SUCCESS)
-            else:
-                self.message_user(request, f"Template File does not exist for template {obj.template_name} to delete it...!", messages.ERROR)
+        deleted, failed = get_storage().map(lambda obj: obj.delete_file(), self.with_categories(queryset))
+        DjDynamicTemplate.save_sync_state(obj for obj, result in deleted.items() if result)
+        missing = [obj for obj, result in deleted.items() if not result]
+        deleted = [obj for obj, result in deleted.items() if result]
+        if len(deleted) == 1:
+            obj = deleted[0]
+            self.message_user(request, f"Successfully deleted template '{obj.template_name}' in '{obj.category.name} directory of App {obj.category.app}' template's directory", messages.SUCCESS)
+        elif deleted:
+            self.message_user(request, f"Successfully deleted {len(deleted)} template files: {summarize([obj.template_name for obj in deleted])}", messages.SUCCESS)
+        if len(missing) == 1:
+            self.message_user(request, f"Template File does not exist for template {missing[0].template_name} to delete it...!", messages.ERROR)
+        elif missing:
+            self.message_user(request, f"Template Files do not exist for {len(missing)} templates to delete them...!: {summarize([obj.template_name for obj in missing])}", messages.ERROR)
+        if failed:
+            self.message_user(request, f"Failed to delete {len(failed)} template files: {summarize([f'{obj.template_name} ({error})' for obj, error in failed.items()])}", messages.ERROR)
+
+    @admin.action(description='Rollback to selected template revisions')
+    def rollback_templates(self, request, queryset) -> None:
+        revisions = self.with_categories(queryset)
+        lineages = [revision.lineage for revision in revisions]
+        if len(set(lineages)) != len(lineages):
+            self.message_user(request, "Select at most one revision per template to roll back to.", messages.ERROR)
+            return
+        rolled_back, failed = [], []
+        for revision in revisions:
+            if revision.template_is_active:
+                continue
+            try:
+                rolled_back.append(revision.rollback(request.user))
+            except IntegrityError as error:
+                failed.append((revision, error))
+        if len(rolled_back) == 1:
+            obj = rolled_back[0]
+            self.message_user(request, f"Template '{obj.template_name}' has been rolled back to revision {obj.revision} in '{obj.category.name}' directory of App '{obj.category.app}'", messages.SUCCESS)
+        elif rolled_back:
+            self.message_user(request, f"Rolled back {len(rolled_back)} templates: {summarize([f'{obj.template_name} (revision {obj.revision})' for obj in rolled_back])}", messages.SUCCESS)
+        if failed:
+            self.message_user(request, f"Failed to roll back {len(failed)} templates: {summarize([f'{obj.template_name} ({error})' for obj, error in failed])}", messages.ERROR)
 
     def has_change_permission(self, request, obj=None):
         return super(DjDynamicTemplateAdmin, self).has_change_permission(request, obj) and (obj.template_is_active if obj else True)
@@ -262,11 +440,70 @@ class DjDynamicTemplateAdmin(MarkdownxModelAdmin):
         elif '_remove_template' in request.POST:
             self.delete_templates(request, [obj])
             return redirect('.')
+        elif '_profile_template' in request.POST and self.has_change_permission(request, obj):
+            self.profile_render(request, obj)
+            return redirect('.')
         return super().changeform_view(request, object_id, form_url, extra_context)
 
+    def profile_render(self, request, obj: DjDynamicTemplate) -> None:
+        """Render the template in the sandbox with node timings, and keep them for the Render Profile field."""
+        profile = RenderProfile()
+        try:
+            obj.render_sandboxed(request=request, profile=profile)
+        except TemplateLimitExceeded as error:
+            save_profile(obj, profile, error)
+            self.message_user(request, f"Rendering '{obj.template_name}' was stopped: {error}. The nodes rendered until then are listed in its render profile.", messages.ERROR)
+        except Exception as error:
+            self.message_user(request, f"Failed to render '{obj.template_name}': {error}", messages.ERROR)
+        else:
+            save_profile(obj, profile)
+            self.message_user(request, f"Rendered '{obj.template_name}' in {profile.duration * 1000:.1f}ms, the slowest nodes are listed in its render profile.", messages.SUCCESS)
+
+    @staticmethod
+    def render_profile(obj: DjDynamicTemplate) -> str:
+        profile = get_profile(obj)
+        if profile is None:
+            return "Not profiled yet, use 'Profile Render' to time every tag of this revision."
+        rows = format_html_join('', '<tr><td>{}</td><td>{}</td><td><code>{}</code></td><td>{}</td><td>{}</td><td>{}</td></tr>', (
+            (entry.template, entry.line or '', entry.node, entry.calls, f'{entry.own * 1000:.2f}', f'{entry.total * 1000:.2f}')
+            for entry in profile['entries']
+        ))
+        return format_html(
+            '<p>{}Rendered in {}ms on {}, the slowest nodes by their own time:</p>'
+            '<table><thead><tr><th>Template</th><th>Line</th><th>Node</th><th>Calls</th><th>Own ms</th><th>Total ms</th></tr></thead>'
+            '<tbody>{}</tbody></table>',
+            f"Stopped: {profile['error']}. " if profile['error'] else '', f"{profile['duration'] * 1000:.1f}",
+            profile['profiled_at'].strftime('%Y-%m-%d %H:%M:%S'), rows,
+        )
+
     def get_urls(self) -> list:
         urls = super(DjDynamicTemplateAdmin, self).get_urls()
-        return [path('template-view/<int:template_id>/', template_view)] + urls
+        if getattr(settings, 'DJ_DYNAMIC_TEMPLATES_ASYNC_VIEWS', False):
+            view = self.apreview_view
+        else:
+            view = self.admin_site.admin_view(self.preview_view, cacheable=True)
+        return [path('template-view/<int:template_id>/', view), path('metrics/', self.admin_site.admin_view(metrics_view))] + urls
+
+    def preview_view(self, request, template_id: int):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        return template_view(request, template_id)
+
+    async def apreview_view(self, request, template_id: int):
+        """
+        preview_view for DJ_DYNAMIC_TEMPLATES_ASYNC_VIEWS. admin_view() wraps views in a sync
+        function, which cannot return a coroutine, so its login check is repeated here.
+        """
+        def check_permission():
+            if not self.admin_site.has_permission(request):
+                return redirect_to_login(request.get_full_path(), reverse('admin:login', current_app=self.admin_site.name))
+            if not self.has_view_permission(request):
+                raise PermissionDenied
+
+        response = await sync_to_async(check_permission)()
+        if response is not None:
+            return response
+        return await atemplate_view(request, template_id)
 
     # @staticmethod
     # def view_template(obj):
@@ -274,17 +511,4 @@ class DjDynamicTemplateAdmin(MarkdownxModelAdmin):
 
     @staticmethod
     def template_status(obj: DjDynamicTemplate) -> str:
-        if obj.template_is_active is False:
-            return "Inactive"
-        elif obj.category.is_directory_exists is False:
-            return "Directory Does Not Exists"
-        elif obj.is_file_exist is False:
-            return "File Does Not Exists"
-        else:
-            with open(obj.file_path, 'r') as file:
-                data = file.read().replace('\r', '')
-            content = obj.content.replace('\r', '')
-            if data == content:
-                return "Synced"
-            else:
-                return "Not Synced"
+        return obj.sync_status
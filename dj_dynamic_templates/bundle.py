@@ -0,0 +1,75 @@
+import json
+import mmap
+import os
+import struct
+import threading
+
+MAGIC = b'DJDTBNDL'
+VERSION = 1
+HEADER = struct.Struct('<8sIQ')
+
+
+def build_bundle(templates) -> bytes:
+    """
+    Pack (loader name, revision id, content) triples into a bundle: a fixed header,
+    a JSON index of offsets, lengths, hashes and revision ids, then the contents back to back.
+    """
+    from .models import content_digest
+
+    index, chunks, offset = {}, [], 0
+    for name, revision, content in templates:
+        data = (content or '').encode('utf-8')
+        index[name] = {'offset': offset, 'length': len(data), 'hash': content_digest(content), 'revision': revision}
+        chunks.append(data)
+        offset += len(data)
+    index_data = json.dumps(index, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return HEADER.pack(MAGIC, VERSION, len(index_data)) + index_data + b''.join(chunks)
+
+
+class TemplateBundle:
+    """Read-only view of a bundle file, served from a memory map."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as file:
+            self.mtime = os.fstat(file.fileno()).st_mtime_ns
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_length = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            self.data.close()
+            raise ValueError(f"'{path}' is not a version {VERSION} template bundle")
+        self.index = json.loads(self.data[HEADER.size:HEADER.size + index_length])
+        self.data_start = HEADER.size + index_length
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def read(self, name: str) -> str:
+        entry = self.index[name]
+        start = self.data_start + entry['offset']
+        return self.data[start:start + entry['length']].decode('utf-8')
+
+    def close(self) -> None:
+        self.data.close()
+
+
+bundles = {}
+bundles_lock = threading.Lock()
+
+
+def get_bundle(path: str) -> TemplateBundle | None:
+    """Return the bundle at path, reopening it only when the file has been replaced, or None when there is none."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    bundle = bundles.get(path)
+    if bundle is None or bundle.mtime != mtime:
+        with bundles_lock:
+            bundle = bundles.get(path)
+            if bundle is None or bundle.mtime != mtime:
+                bundle = bundles[path] = TemplateBundle(path)
+    return bundle
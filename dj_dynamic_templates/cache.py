@@ -0,0 +1,101 @@
+import threading
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+GENERATION_CACHE_KEY = 'dj_dynamic_templates:generation'
+
+
+def get_cache():
+    return caches[getattr(settings, 'DJ_DYNAMIC_TEMPLATES_CACHE_ALIAS', 'default')]
+
+
+def get_generation() -> str:
+    """
+    The shared generation token. A missing key, after a cache restart or eviction, gets a
+    fresh token so every worker sees a change, as it cannot tell whether a bump was lost.
+    """
+    cache = get_cache()
+    generation = cache.get(GENERATION_CACHE_KEY)
+    if generation is None:
+        cache.add(GENERATION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+        generation = cache.get(GENERATION_CACHE_KEY)
+    return generation
+
+
+def bump_generation() -> str:
+    """
+    Replace the shared generation token, telling every worker that some template changed
+    and its name -> revision index must be rebuilt. Tokens are random rather than counted,
+    so a value seen before the key was lost never comes back.
+    """
+    generation = uuid.uuid4().hex
+    get_cache().set(GENERATION_CACHE_KEY, generation, timeout=None)
+    return generation
+
+
+class CompiledTemplateCache:
+    """
+    In-process LRU cache of compiled templates keyed by (category id, template name, revision pk).
+
+    Loader names ("<app>/<category>/<template_name>.html") are mapped to those keys
+    through an index that is dropped whenever the shared generation moves on, so the
+    next lookup re-resolves the active revision while unchanged templates keep their
+    compiled form.
+    """
+
+    def __init__(self, max_size: int | None = None):
+        self._max_size = max_size
+        self.templates = OrderedDict()
+        self.revisions = {}
+        self.generation = None
+        self.lock = threading.Lock()
+
+    @property
+    def max_size(self) -> int:
+        if self._max_size is None:
+            return getattr(settings, 'DJ_DYNAMIC_TEMPLATES_CACHE_SIZE', 500)
+        return self._max_size
+
+    def check_generation(self) -> None:
+        generation = get_generation()
+        if generation != self.generation:
+            with self.lock:
+                self.revisions.clear()
+                self.generation = generation
+
+    def get_revision(self, name: str) -> tuple | None:
+        return self.revisions.get(name)
+
+    def set_revision(self, name: str, key: tuple) -> None:
+        self.revisions[name] = key
+
+    def get(self, key: tuple):
+        with self.lock:
+            template = self.templates.get(key)
+            if template is not None:
+                self.templates.move_to_end(key)
+            return template
+
+    def set(self, key: tuple, template) -> None:
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            self.templates[key] = template
+            self.templates.move_to_end(key)
+            while len(self.templates) > self.max_size:
+                self.templates.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.templates.clear()
+            self.revisions.clear()
+            self.generation = None
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+
+template_cache = CompiledTemplateCache()
@@ -0,0 +1,50 @@
+from django.template import Engine, Origin, Template
+from django.template.loader_tags import ExtendsNode, IncludeNode
+
+from .cache import template_cache
+from .metrics import get_reporter
+
+
+def database_loader(engine: Engine):
+    """The engine's DatabaseLoader, also when it is wrapped in a cached loader, or None."""
+    from .loaders import DatabaseLoader
+
+    loaders = list(engine.template_loaders)
+    while loaders:
+        loader = loaders.pop(0)
+        if isinstance(loader, DatabaseLoader):
+            return loader
+        loaders.extend(getattr(loader, 'loaders', []))
+    return None
+
+
+def compile_template(content: str | None, name: str | None = None) -> Template:
+    """
+    Parse content with the default Django template engine, raising TemplateSyntaxError when it
+    is invalid. A named template gets the origin the DatabaseLoader gives it, so it can share the
+    loader's cache and {% extends %} of the same name skips the database as it does when loaded.
+    """
+    engine = Engine.get_default()
+    origin = Origin(name=name, template_name=name, loader=database_loader(engine)) if name else None
+    return Template(content or '', origin, name, engine)
+
+
+def template_dependencies(template: Template) -> list:
+    """Names of the templates pulled in by {% extends %} and {% include %} with a constant name."""
+    expressions = [node.parent_name for node in template.nodelist.get_nodes_by_type(ExtendsNode)]
+    expressions += [node.template for node in template.nodelist.get_nodes_by_type(IncludeNode)]
+    return sorted({str(expression.var) for expression in expressions if isinstance(expression.var, str) and not expression.filters})
+
+
+def get_compiled_template(obj) -> Template:
+    """Compiled template of the given revision, shared with the DatabaseLoader cache."""
+    content = obj.content or ''
+    key = (obj.category_id, obj.template_name, obj.pk)
+    template = template_cache.get(key)
+    if template is None or template.source != content:
+        get_reporter().increment('compiled_cache_total', result='miss')
+        template = compile_template(content, obj.loader_name)
+        template_cache.set(key, template)
+    else:
+        get_reporter().increment('compiled_cache_total', result='hit')
+    return template
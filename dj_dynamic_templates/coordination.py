@@ -0,0 +1,76 @@
+import os
+import socket
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import DjDynamicTemplateSyncGeneration, DjDynamicTemplateSyncLease
+from .storage import get_storage
+
+
+def sync_target() -> str:
+    """
+    Where this process syncs templates to: DJ_DYNAMIC_TEMPLATES_SYNC_TARGET when set,
+    otherwise the storage's own target, i.e. the node for app directories and the volume
+    for a shared root.
+    """
+    return getattr(settings, 'DJ_DYNAMIC_TEMPLATES_SYNC_TARGET', None) or get_storage().sync_target
+
+
+def lease_owner() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+
+def stale_apps(apps: list, target: str | None = None) -> dict:
+    """The given apps the target has not synced the latest generation of, as {app: (synced, current)}."""
+    target = target or sync_target()
+    current = DjDynamicTemplateSyncGeneration.current(apps)
+    synced = dict(DjDynamicTemplateSyncLease.objects.filter(target=target, app__in=apps).values_list('app', 'generation'))
+    return {app: (synced.get(app, 0), generation) for app, generation in current.items() if synced.get(app, 0) < generation}
+
+
+def claim(apps: list, owner: str, target: str | None = None, force: bool = False, timeout: float | None = None) -> dict:
+    """
+    Take the sync lease of the given apps on the target and return {app: generation} for
+    the apps claimed. Apps already synced at their latest generation are left out unless
+    force is set, and so are apps another worker holds an unexpired lease on: candidates
+    are locked with SELECT ... FOR UPDATE SKIP LOCKED where the database supports it, and
+    the lease is only taken by a conditional update, so two workers never both get it.
+    """
+    target = target or sync_target()
+    if timeout is None:
+        timeout = getattr(settings, 'DJ_DYNAMIC_TEMPLATES_SYNC_LEASE_TIMEOUT', 600)
+    generations = DjDynamicTemplateSyncGeneration.current(apps)
+    DjDynamicTemplateSyncLease.objects.bulk_create(
+        [DjDynamicTemplateSyncLease(target=target, app=app) for app in apps], ignore_conflicts=True
+    )
+    now = timezone.now()
+    available = Q(expires_at__isnull=True) | Q(expires_at__lt=now)
+    with transaction.atomic():
+        leases = DjDynamicTemplateSyncLease.objects.filter(available, target=target, app__in=apps)
+        if connection.features.has_select_for_update_skip_locked:
+            leases = leases.select_for_update(skip_locked=True)
+        candidates = [pk for pk, app, generation in leases.values_list('pk', 'app', 'generation') if force or generation < generations[app]]
+        expires_at = now + timedelta(seconds=timeout)
+        DjDynamicTemplateSyncLease.objects.filter(available, pk__in=candidates).update(owner=owner, expires_at=expires_at)
+    claimed = DjDynamicTemplateSyncLease.objects.filter(pk__in=candidates, owner=owner).values_list('app', flat=True)
+    return {app: generations[app] for app in claimed}
+
+
+def release(claimed: dict, owner: str, target: str | None = None, synced: bool = True) -> None:
+    """
+    Give the leases back, recording the claimed generations as synced unless the sync
+    failed. Leases that expired and were taken over in the meantime are left alone.
+    """
+    target = target or sync_target()
+    leases = DjDynamicTemplateSyncLease.objects.filter(target=target, owner=owner)
+    if not synced:
+        leases.filter(app__in=claimed).update(owner='', expires_at=None)
+        return
+    now = timezone.now()
+    for app, generation in claimed.items():
+        leases.filter(app=app).update(owner='', expires_at=None, generation=generation, synced_at=now)
@@ -1,21 +1,48 @@
 from django.conf import settings
+from functools import cache
 import os
+import site
+import sysconfig
 
 from django import forms
 from .models import *
 
 
-DJANGO_APPS = []
+@cache
+def get_django_apps() -> list:
+    """
+    Installed apps living inside the project (BASE_DIR), as (label, verbose label) choices.
+    Apps installed as packages are left out, also when a virtualenv sits inside BASE_DIR.
+    Computed on first use and kept for the lifetime of the process.
+    """
+    base_dir = os.path.abspath(settings.BASE_DIR)
+    library_paths = {sysconfig.get_path(name) for name in ('stdlib', 'platstdlib', 'purelib', 'platlib')}
+    library_paths = [os.path.abspath(path) for path in library_paths | set(site.getsitepackages()) if path]
+    django_apps = []
+    for app_config in apps.get_app_configs():
+        app_path = os.path.abspath(app_config.path)
+        if any(os.path.commonpath([path, app_path]) == path for path in library_paths):
+            continue
+        if os.path.commonpath([base_dir, app_path]) == base_dir and app_path != base_dir:
+            django_apps.append((app_config.label, app_config.label.replace("_", " ").title()))
+    return sorted(django_apps)
+
+
+def get_app_labels() -> list:
+    return [label for label, _ in get_django_apps()]
+
+
+def __getattr__(name):
+    if name == 'DJANGO_APPS':
+        return get_django_apps()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-for app in os.listdir(settings.BASE_DIR):
-    if os.path.isdir(os.path.join(settings.BASE_DIR, app)) and apps.is_installed(app):
-        DJANGO_APPS.append((app, app.replace("_", " ").title()))
 
 class DjDynamicTemplateCategoryForm(forms.ModelForm):
 
-    app = forms.ChoiceField(choices=DJANGO_APPS, widget=forms.Select())
+    app = forms.ChoiceField(choices=get_django_apps, widget=forms.Select())
 
 
     class Meta:
         model = DjDynamicTemplateCategory
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
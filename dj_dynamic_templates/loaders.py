@@ -0,0 +1,135 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.template import Origin, Template, TemplateDoesNotExist
+from django.template.loaders import cached
+from django.template.loaders.base import Loader
+
+from .bundle import get_bundle
+from .cache import get_generation, template_cache
+from .metrics import get_reporter
+from .models import DjDynamicTemplate
+
+
+class DatabaseLoader(Loader):
+    """
+    Template loader that reads the active DjDynamicTemplate rows directly, so
+    templates can be rendered without syncing them to the filesystem first.
+
+    Templates are addressed as "<app>/<category>/<template_name>.html". Compiled
+    templates are kept in the versioned in-process cache. To wrap it with other loaders
+    in a cached loader, use CachedLoader: django.template.loaders.cached.Loader would keep
+    serving a template after it changes.
+    """
+
+    @staticmethod
+    def split_template_name(template_name: str) -> tuple | None:
+        parts = template_name.split('/')
+        if len(parts) != 3 or not all(parts) or not parts[2].endswith('.html'):
+            return None
+        return parts[0], parts[1], parts[2].removesuffix('.html')
+
+    def get_template_sources(self, template_name):
+        if self.split_template_name(template_name) is not None:
+            yield Origin(name=template_name, template_name=template_name, loader=self)
+
+    @staticmethod
+    def active_templates(app: str, category: str, template_name: str):
+        return DjDynamicTemplate.objects.filter(
+            category__app=app, category__name=category, template_name=template_name, template_is_active=True
+        )
+
+    def get_contents(self, origin) -> str:
+        row = self.active_templates(*self.split_template_name(origin.name)).values_list('content').first()
+        if row is None:
+            raise TemplateDoesNotExist(origin)
+        return row[0] or ''
+
+    def get_template(self, template_name, skip=None):
+        parts = self.split_template_name(template_name)
+        if parts is None:
+            raise TemplateDoesNotExist(template_name)
+        origin = Origin(name=template_name, template_name=template_name, loader=self)
+        if skip is not None and origin in skip:
+            raise TemplateDoesNotExist(template_name, tried=[(origin, 'Skipped to avoid recursion')])
+
+        reporter = get_reporter()
+        template_cache.check_generation()
+        key = template_cache.get_revision(template_name)
+        template = template_cache.get(key) if key else None
+        if template is not None and template.origin.loader is not self:
+            template = None
+        if template is not None:
+            reporter.increment('compiled_cache_total', result='hit')
+        else:
+            row = self.active_templates(*parts).values_list('pk', 'category_id', 'content').first()
+            if row is None:
+                reporter.increment('templates_missing_total', source='loader')
+                raise TemplateDoesNotExist(template_name, tried=[(origin, 'Source does not exist')])
+            pk, category_id, content = row
+            key = (category_id, parts[2], pk)
+            template = template_cache.get(key)
+            if template is None or template.origin.loader is not self or template.source != (content or ''):
+                reporter.increment('compiled_cache_total', result='miss')
+                template = Template(content or '', origin, template_name, self.engine)
+                template_cache.set(key, template)
+            else:
+                reporter.increment('compiled_cache_total', result='revalidated')
+            template_cache.set_revision(template_name, key)
+        return template
+
+    def reset(self) -> None:
+        template_cache.clear()
+
+
+class CachedLoader(cached.Loader):
+    """
+    django.template.loaders.cached.Loader that forgets the templates it cached whenever the
+    shared generation moves on, so it can wrap DatabaseLoader and pick up edits. The wrapped
+    loaders keep their own caches: DatabaseLoader re-resolves revisions by the generation itself.
+    """
+
+    def __init__(self, engine, loaders):
+        super().__init__(engine, loaders)
+        self.generation = None
+
+    def get_template(self, template_name, skip=None):
+        generation = get_generation()
+        if generation != self.generation:
+            self.get_template_cache.clear()
+            self.generation = generation
+        return super().get_template(template_name, skip)
+
+
+class BundleLoader(Loader):
+    """
+    Template loader that serves templates from a bundle written by the export_templates
+    command, reading them from a memory map instead of thousands of small files.
+
+    The bundle path is taken from the loader arguments or the DJ_DYNAMIC_TEMPLATES_BUNDLE
+    setting. The bundle is reopened when the file is replaced, no templates are found while
+    it has not been built, and the loader can be wrapped in django.template.loaders.cached.Loader.
+    """
+
+    def __init__(self, engine, bundle_path: str | None = None):
+        super().__init__(engine)
+        self.bundle_path = bundle_path or getattr(settings, 'DJ_DYNAMIC_TEMPLATES_BUNDLE', None)
+        if not self.bundle_path:
+            raise ImproperlyConfigured('BundleLoader requires a bundle path or the DJ_DYNAMIC_TEMPLATES_BUNDLE setting.')
+
+    @property
+    def bundle(self):
+        return get_bundle(self.bundle_path)
+
+    def get_template_sources(self, template_name):
+        bundle = self.bundle
+        if bundle is not None and template_name in bundle:
+            yield Origin(name=template_name, template_name=template_name, loader=self)
+
+    def get_contents(self, origin) -> str:
+        bundle = self.bundle
+        if bundle is None:
+            raise TemplateDoesNotExist(origin)
+        try:
+            return bundle.read(origin.name)
+        except KeyError:
+            raise TemplateDoesNotExist(origin)
@@ -0,0 +1,88 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+import time
+
+from dj_dynamic_templates.forms import get_app_labels
+from dj_dynamic_templates.models import *
+from dj_dynamic_templates.packing import PLAIN, unpack
+from dj_dynamic_templates.transfer import chunked
+
+
+class Command(BaseCommand):
+    help = "Pack the content of inactive template revisions as compressed snapshots and deltas, and report the space saved"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            '--app',
+            type=str,
+            help='Project app names (defaults to every installed app inside BASE_DIR)',
+            required=False,
+            nargs="+"
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Number of templates (with their whole history) packed per transaction'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the space that would be saved without changing anything'
+        )
+
+    @staticmethod
+    def pack_lineage(revisions: list) -> tuple[list, int, int]:
+        """
+        Pack the plain inactive revisions of one template, given in revision order. Packed
+        revisions are unpacked in memory along the way, so the history is read only once.
+        """
+        contents, packed, before, after = {}, [], 0, 0
+        previous = None
+        for revision in revisions:
+            if revision.content is None and revision.content_encoding:
+                base = contents.get(revision.content_base_id)
+                revision.content = unpack(revision.content_encoding, revision.packed_content, base)
+            contents[revision.pk] = revision.content
+            if not revision.template_is_active and not revision.content_encoding and revision.content:
+                revision.pack_content(previous)
+                before += len(revision.content.encode('utf-8'))
+                after += len(revision.packed_content)
+                packed.append(revision)
+            previous = revision
+        for revision in packed:
+            revision.content = None
+        return packed, before, after
+
+    def handle(self, *args, **options) -> str:
+        options["app"] = options["app"] or get_app_labels()
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be a positive integer")
+        started = time.perf_counter()
+
+        lineages = DjDynamicTemplate.objects.filter(
+            category__app__in=options["app"], template_is_active=False, content_encoding=PLAIN, content__isnull=False
+        ).exclude(content='').values_list('lineage', flat=True).distinct().order_by('lineage')
+        templates = revisions = before = after = 0
+        for chunk in chunked(lineages.iterator(), options['batch_size']):
+            with transaction.atomic():
+                history = {}
+                for revision in DjDynamicTemplate.objects.select_for_update().filter(lineage__in=chunk).order_by('revision'):
+                    history.setdefault(revision.lineage, []).append(revision)
+                packed = []
+                for lineage_revisions in history.values():
+                    lineage_packed, lineage_before, lineage_after = self.pack_lineage(lineage_revisions)
+                    packed += lineage_packed
+                    before += lineage_before
+                    after += lineage_after
+                if not options['dry_run']:
+                    DjDynamicTemplate.objects.bulk_update(packed, ['content', 'content_encoding', 'packed_content', 'content_base'], batch_size=500)
+            templates += len(history)
+            revisions += len(packed)
+
+        saved = before - after
+        self.stdout.write(f"Packed {revisions} revisions of {templates} templates in {time.perf_counter() - started:.2f}s")
+        summary = f"{before:,} bytes -> {after:,} bytes, {saved:,} bytes saved ({saved / before if before else 0:.1%})"
+        if options['dry_run']:
+            return f"Dry run, nothing was changed: {summary}"
+        return f"Successfully compacted the template history: {summary}"
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+import gzip
+
+from dj_dynamic_templates.transfer import dump_templates
+
+
+class Command(BaseCommand):
+    help = "Stream the categories and active templates into a JSON lines file"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            'output',
+            type=str,
+            nargs='?',
+            default='-',
+            help='Path of the JSON lines file, gzip compressed when it ends with .gz (defaults to stdout)'
+        )
+        parser.add_argument(
+            '--app',
+            type=str,
+            help='Only dump templates of these apps',
+            required=False,
+            nargs="+"
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of rows fetched from the database at a time'
+        )
+
+    def handle(self, *args, **options) -> None:
+        output = options['output']
+        if output == '-':
+            count = dump_templates(self.stdout, options['app'], options['chunk_size'])
+        else:
+            opener = gzip.open if output.endswith('.gz') else open
+            with opener(output, 'wt', encoding='utf-8') as file:
+                count = dump_templates(file, options['app'], options['chunk_size'])
+        self.stderr.write(f"Dumped {count} templates")
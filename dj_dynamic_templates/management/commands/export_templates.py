@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+import os
+import time
+
+from dj_dynamic_templates.bundle import build_bundle
+from dj_dynamic_templates.models import *
+from dj_dynamic_templates.storage import atomic_write
+
+
+class Command(BaseCommand):
+    help = "Export the active templates into a single bundle file served by the BundleLoader"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=getattr(settings, 'DJ_DYNAMIC_TEMPLATES_BUNDLE', None),
+            help='Path of the bundle file (defaults to the DJ_DYNAMIC_TEMPLATES_BUNDLE setting)'
+        )
+        parser.add_argument(
+            '--app',
+            type=str,
+            help='Only export templates of these apps',
+            required=False,
+            nargs="+"
+        )
+        parser.add_argument(
+            '--category',
+            type=str,
+            help='Only export templates of these category names',
+            required=False,
+            nargs="+"
+        )
+
+    def handle(self, *args, **options) -> str:
+        if not options['output']:
+            raise CommandError("Provide --output or set DJ_DYNAMIC_TEMPLATES_BUNDLE")
+        started = time.perf_counter()
+
+        queryset = DjDynamicTemplate.objects.filter(template_is_active=True)
+        if options['app']:
+            queryset = queryset.filter(category__app__in=options['app'])
+        if options['category']:
+            queryset = queryset.filter(category__name__in=options['category'])
+        rows = list(queryset.order_by('category__app', 'category__name', 'template_name').values_list(
+            'category__app', 'category__name', 'template_name', 'pk', 'content'
+        ))
+        data = build_bundle(
+            (f'{app}/{category}/{template_name}.html', pk, content)
+            for app, category, template_name, pk, content in rows
+        )
+
+        directory = os.path.dirname(os.path.abspath(options['output']))
+        os.makedirs(directory, exist_ok=True)
+        atomic_write(options['output'], data)
+        self.stdout.write(f"Wrote {len(data)} bytes in {time.perf_counter() - started:.2f}s")
+        return f"Successfully exported {len(rows)} templates into '{options['output']}'"
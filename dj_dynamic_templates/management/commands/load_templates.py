@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+import gzip
+import sys
+
+from dj_dynamic_templates.transfer import load_templates
+
+
+class Command(BaseCommand):
+    help = "Load categories and templates from a JSON lines file written by dump_templates"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            'input',
+            type=str,
+            nargs='?',
+            default='-',
+            help='Path of the JSON lines file, gzip compressed when it ends with .gz (defaults to stdin)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of records written to the database at a time'
+        )
+
+    def handle(self, *args, **options) -> str:
+        source, errors = options['input'], []
+        if source == '-':
+            counts = load_templates(sys.stdin, options['batch_size'], errors=errors)
+        else:
+            opener = gzip.open if source.endswith('.gz') else open
+            with opener(source, 'rt', encoding='utf-8') as file:
+                counts = load_templates(file, options['batch_size'], errors=errors)
+        for name, error in errors:
+            self.stderr.write(f"====> Rejected template '{name}': {error}")
+        summary = (
+            f"{counts['categories']} categories: {counts['created']} templates created, "
+            f"{counts['updated']} updated, {counts['skipped']} skipped"
+        )
+        if errors:
+            raise CommandError(f"{len(errors)} templates do not compile and were not loaded (loaded {summary})")
+        return f"Loaded {summary}"
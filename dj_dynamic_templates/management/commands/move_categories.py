@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+import time
+
+from dj_dynamic_templates.models import *
+from dj_dynamic_templates.relocate import relocate_categories
+from dj_dynamic_templates.storage import get_storage
+
+
+class Command(BaseCommand):
+    help = "Move categories, with their directories and template files, from one app to another"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('from_app', type=str, help='App the categories belong to')
+        parser.add_argument('to_app', type=str, help='App the categories are moved to')
+        parser.add_argument(
+            '--category',
+            type=str,
+            help='Category names (defaults to every category of from_app)',
+            required=False,
+            nargs="+"
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the directories that would be moved without changing anything'
+        )
+
+    def handle(self, *args, **options) -> str:
+        categories = DjDynamicTemplateCategory.objects.filter(app=options['from_app'])
+        if options['category']:
+            categories = categories.filter(name__in=options['category'])
+        categories = list(categories)
+        if not categories:
+            raise CommandError(f"No categories to move in the '{options['from_app']}' app")
+        clashes = DjDynamicTemplateCategory.objects.filter(app=options['to_app'], name__in=[category.name for category in categories])
+        if clashes.exists():
+            raise CommandError(f"Categories already exist in the '{options['to_app']}' app: {', '.join(clashes.values_list('name', flat=True))}")
+        started = time.perf_counter()
+
+        if options['dry_run']:
+            for category in categories:
+                self.stdout.write(f"{category.directory_path} -> {get_storage().directory_path(options['to_app'], category.name)}")
+            return f"Dry run, nothing was changed: {len(categories)} categories would be moved"
+
+        try:
+            relocation = relocate_categories([(category, options['to_app'], category.name) for category in categories])
+        except FileExistsError as error:
+            raise CommandError(f"Directory '{error}' already exists, nothing was moved")
+        for category, error in relocation.failed:
+            self.stderr.write(f"Failed to move '{category}': {error}")
+        self.stdout.write(f"Moved {len(relocation.moved)} directories and created {len(relocation.created)} in {time.perf_counter() - started:.2f}s")
+        if relocation.failed:
+            raise CommandError(f"{len(relocation.failed)} categories could not be moved and were left unchanged")
+        return f"Successfully moved {len(categories)} categories to the '{options['to_app']}' app"
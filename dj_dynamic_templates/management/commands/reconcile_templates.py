@@ -0,0 +1,120 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+import signal
+import threading
+import time
+
+from dj_dynamic_templates.forms import get_app_labels
+from dj_dynamic_templates.reconcile import DirectoryWatcher, Reconciler
+
+
+class Command(BaseCommand):
+    help = "Keep template files in line with the database, repairing missing, modified and orphaned files as they drift"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            '--app',
+            type=str,
+            help='Project app names (defaults to every installed app inside BASE_DIR)',
+            required=False,
+            nargs="+"
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=getattr(settings, 'DJ_DYNAMIC_TEMPLATES_RECONCILE_INTERVAL', 30),
+            help='Seconds between full scans; changes reported by inotify are reconciled in between'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of templates checked and repaired at a time'
+        )
+        parser.add_argument(
+            '--remove-orphans',
+            action='store_true',
+            help='Delete .html files in category directories that have no active template'
+        )
+        parser.add_argument(
+            '--no-inotify',
+            action='store_true',
+            help='Only rely on the periodic scans, even where inotify is available'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run a single full scan and exit'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the drift without touching the filesystem'
+        )
+
+    def log(self, message: str) -> None:
+        self.stdout.write(self.style.WARNING(f"====> {message}"))
+
+    def reconcile(self, reconciler: Reconciler, categories: list) -> None:
+        close_old_connections()
+        started = time.perf_counter()
+        drift = reconciler.run(categories)
+        changes = ", ".join(f"{count} {name}" for name, count in sorted(drift.items()) if count and name != 'checked')
+        if changes or self.verbosity > 1:
+            self.stdout.write(f"Reconciled {len(categories)} categories and {drift['checked']} templates in {time.perf_counter() - started:.2f}s: {changes or 'no drift'}")
+
+    def handle(self, *args, **options) -> str:
+        options["app"] = options["app"] or get_app_labels()
+        self.verbosity = options['verbosity']
+        if options['interval'] <= 0:
+            raise CommandError("--interval must be a positive number")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be a positive integer")
+        reconciler = Reconciler(
+            options["app"], batch_size=options['batch_size'], remove_orphans=options['remove_orphans'],
+            dry_run=options['dry_run'], log=self.log,
+        )
+
+        if options['once']:
+            self.reconcile(reconciler, reconciler.categories())
+        else:
+            self.watch(reconciler, options['interval'], not options['no_inotify'] and DirectoryWatcher.available())
+        counters = reconciler.counters
+        return ", ".join(f"{count} {name}" for name, count in sorted(counters.items())) or "Nothing to reconcile"
+
+    def watch(self, reconciler: Reconciler, interval: float, use_inotify: bool) -> None:
+        stop = threading.Event()
+        # Stop cleanly on SIGTERM from process managers; handlers can only be set from the main thread.
+        handle_signal = threading.current_thread() is threading.main_thread()
+        if handle_signal:
+            previous = signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+        watcher = DirectoryWatcher() if use_inotify else None
+        self.stdout.write(f"Reconciling templates every {interval:g}s{' and on inotify events' if watcher else ''}, press CTRL-C to stop")
+        next_scan = 0
+        try:
+            while not stop.is_set():
+                if time.monotonic() >= next_scan:
+                    categories = reconciler.categories()
+                    self.reconcile(reconciler, categories)
+                    if watcher is not None:
+                        watcher.update(categories)
+                    next_scan = time.monotonic() + interval
+                timeout = max(0.0, min(next_scan - time.monotonic(), 1.0))
+                if watcher is None:
+                    stop.wait(timeout)
+                    continue
+                changed = watcher.read(timeout)
+                if changed is None:
+                    next_scan = 0
+                elif changed:
+                    categories = reconciler.categories(changed)
+                    self.reconcile(reconciler, categories)
+                    watcher.update(categories, prune=False)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if handle_signal:
+                signal.signal(signal.SIGTERM, previous)
+            if watcher is not None:
+                watcher.close()
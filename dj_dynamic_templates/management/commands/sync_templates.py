@@ -1,9 +1,18 @@
+from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.db.models import Exists, OuterRef
 import time
 
-from dj_dynamic_templates.forms import DJANGO_APPS
+from dj_dynamic_templates.coordination import claim, lease_owner, release, stale_apps, sync_target
+from dj_dynamic_templates.forms import get_app_labels
+from dj_dynamic_templates.metrics import get_reporter, measure
 from dj_dynamic_templates.models import *
+from dj_dynamic_templates.signals import templates_synced
+from dj_dynamic_templates.transfer import chunked
+
+WRITTEN, SKIPPED, REMOVED = 'written', 'skipped', 'removed'
+
 
 class Command(BaseCommand):
     help = "Synchronize all templates into project"
@@ -12,24 +21,186 @@ class Command(BaseCommand):
         parser.add_argument(
             '--app',
             type=str,
-            help='Project app names',
+            help='Project app names (defaults to every installed app inside BASE_DIR)',
             required=False,
-            default=list(dict(DJANGO_APPS).keys()),
             nargs="+"
         )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rewrite every template file, even when its content hash already matches'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the files that would be written or removed without touching the filesystem'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of templates loaded from the database and written at a time'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=getattr(settings, 'DJ_DYNAMIC_TEMPLATES_SYNC_WORKERS', None),
+            help='Number of threads writing template files (defaults to the ThreadPoolExecutor default)'
+        )
+        parser.add_argument(
+            '--coordinate',
+            action='store_true',
+            default=getattr(settings, 'DJ_DYNAMIC_TEMPLATES_SYNC_COORDINATION', False),
+            help='Skip apps this node or volume already synced at their latest generation, and take a lease on the '
+                 'others so only one worker per sync target syncs them'
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report the apps not synced at their latest generation on this sync target, failing when there are any'
+        )
+
+    def sync_template(self, obj: DjDynamicTemplate, force: bool = False, dry_run: bool = False) -> str:
+        if not force and obj.is_file_synced:
+            if not dry_run and obj.synced_hash != obj.content_hash:
+                obj.mark_synced(obj.content_hash)
+            if self.verbosity > 1:
+                self.stdout.write(f"====> Template '{obj.template_name}' in the directory '{obj.category.name}' of app '{obj.category.app}' is already up to date. ")
+            return SKIPPED
+        if not dry_run and not obj.create_file():
+            raise FileNotFoundError(f"Directory '{obj.category.directory_path}' does not exist")
+        self.stdout.write(self.style.SUCCESS(f"====> {'Would sync' if dry_run else 'Successfully synced'} template '{obj.template_name}' in the directory '{obj.category.name}' of app '{obj.category.app}' templates directory. "))
+        return WRITTEN
+
+    def remove_template(self, obj: DjDynamicTemplate, dry_run: bool = False) -> str | None:
+        if not obj.is_file_exist:
+            return None
+        if not dry_run:
+            obj.delete_file()
+        self.stdout.write(self.style.WARNING(f"====> {'Would remove' if dry_run else 'Removed'} stale template '{obj.template_name}' in the directory '{obj.category.name}' of app '{obj.category.app}' templates directory. "))
+        return REMOVED
+
+    @staticmethod
+    def stale_templates(apps: list):
+        """Inactive templates whose name no longer has an active revision in their category."""
+        active = DjDynamicTemplate.objects.filter(
+            category=OuterRef('category'), template_name=OuterRef('template_name'), template_is_active=True
+        )
+        return DjDynamicTemplate.objects.select_related('category').filter(
+            category__app__in=apps, template_is_active=False
+        ).exclude(Exists(active)).order_by('id')
 
-    def sync_template(self, obj: DjDynamicTemplate) -> bool:
-        obj.create_file()
-        self.stdout.write(self.style.SUCCESS(f"====> Successfully synced template '{obj.template_name}' in the directory '{obj.category.name}' of app '{obj.category.app}' templates directory. "))
-        return True
+    def make_directories(self, categories) -> list:
+        """Create the missing category directories, returning the (category, error) pairs of those that failed."""
+        categories, errors = list(categories), []
+        for category in categories:
+            try:
+                created = category.make_directory(exists_ok=True)
+            except OSError as error:
+                errors.append((category, error))
+                self.stderr.write(f"====> Failed to create the directory '{category.name}' of app '{category.app}', its templates are skipped: {error}")
+                continue
+            if created:
+                self.stdout.write(self.style.ERROR("-->"), ending=" ")
+                self.stdout.write(self.style.WARNING(f"Directory '{category.name}' is does not exist in template directory of app '{category.app}'."), ending=' ')
+                self.stdout.write(self.style.MIGRATE_HEADING(f"So, Created an new Directory '{category.name}' in template directory of app '{category.app}'"))
+        DjDynamicTemplateCategory.save_sync_state(categories)
+        return errors
+
+    def run_chunk(self, executor, func, chunk: list, counts: dict, errors: list, *args) -> None:
+        futures = {executor.submit(func, template_obj, *args): template_obj for template_obj in chunk}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as error:
+                template_obj = futures[future]
+                errors.append((template_obj, error))
+                self.stderr.write(f"====> Failed to sync template '{template_obj.template_name}' in the directory '{template_obj.category.name}' of app '{template_obj.category.app}': {error}")
+            else:
+                if result is not None:
+                    counts[result] += 1
 
     def handle(self, *args, **options) -> str:
-        for app in options["app"]:
-            with ThreadPoolExecutor() as executor:
-                for template_obj in DjDynamicTemplate.objects.select_related('category').filter(category__app=app, template_is_active=True).order_by('id'):
-                    if template_obj.category.make_directory(exists_ok=True):
-                        self.stdout.write(self.style.ERROR("-->"), ending=" ")
-                        self.stdout.write(self.style.WARNING(f"Directory '{template_obj.category.name}' is does not exist in template directory of app '{template_obj.category.app}'."), ending=' ')
-                        self.stdout.write(self.style.MIGRATE_HEADING(f"So, Created an new Directory '{template_obj.category.name}' in template directory of app '{template_obj.category.app}'"))
-                    executor.submit(self.sync_template, template_obj)
-        return "Successfully synced all templates into respective project app's template directory"
\ No newline at end of file
+        options["app"] = options["app"] or get_app_labels()
+        self.verbosity = options['verbosity']
+        force, dry_run, workers, chunk_size = options['force'], options['dry_run'], options['workers'], options['chunk_size']
+        if workers is not None and workers < 1:
+            raise CommandError("--workers must be a positive integer")
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be a positive integer")
+        if options['check']:
+            return self.check_generations(options["app"])
+        started = time.perf_counter()
+        apps, claimed, owner = options["app"], None, None
+        if options['coordinate'] and not dry_run:
+            owner = lease_owner()
+            claimed = claim(apps, owner, force=force)
+            skipped = sorted(set(apps) - set(claimed))
+            if skipped:
+                self.stdout.write(f"Skipping apps synced at their latest generation or leased by another worker: {', '.join(skipped)}")
+            if not claimed:
+                return f"Nothing to sync on '{sync_target()}': every app is up to date or being synced by another worker"
+            apps = sorted(claimed)
+        apps_label = ','.join(sorted(apps))
+        try:
+            with measure('sync', apps=apps_label):
+                counts, errors, processed = self.sync(apps, force, dry_run, workers, chunk_size)
+        except BaseException:
+            if claimed:
+                release(claimed, owner, synced=False)
+            raise
+        if claimed:
+            release(claimed, owner, synced=not errors)
+
+        elapsed = time.perf_counter() - started
+        processed -= sum(isinstance(obj, DjDynamicTemplate) for obj, _ in errors)
+        reporter = get_reporter()
+        for result in (WRITTEN, SKIPPED, REMOVED):
+            reporter.increment('sync_files_total', counts[result], apps=apps_label, result=result)
+        reporter.increment('sync_files_total', len(errors), apps=apps_label, result='failed')
+        templates_synced.send(sender=self.__class__, apps=apps, counts={**counts, 'failed': len(errors)}, duration=elapsed)
+        summary = f"{counts[WRITTEN]} written, {counts[SKIPPED]} skipped, {counts[REMOVED]} removed"
+        self.stdout.write(f"Processed {processed} templates in {elapsed:.2f}s ({processed / elapsed if elapsed else 0:.1f} templates/s)")
+        if errors:
+            raise CommandError(f"{len(errors)} templates or category directories failed to sync ({summary})")
+        if dry_run:
+            return f"Dry run, nothing was changed: {summary}"
+        return f"Successfully synced all templates into respective project app's template directory: {summary}"
+
+    def check_generations(self, apps: list) -> str:
+        target = sync_target()
+        stale = stale_apps(apps, target)
+        for app, (synced, current) in sorted(stale.items()):
+            self.stdout.write(f"====> App '{app}' is synced at generation {synced}, the latest is {current}")
+        if stale:
+            raise CommandError(f"{len(stale)} apps are not synced at their latest generation on '{target}'")
+        return f"Every app is synced at its latest generation on '{target}'"
+
+    def sync(self, apps: list, force: bool, dry_run: bool, workers: int | None, chunk_size: int) -> tuple[dict, list, int]:
+        errors = []
+        if not dry_run:
+            errors = self.make_directories(DjDynamicTemplateCategory.objects.filter(
+                app__in=apps, djdynamictemplate__template_is_active=True
+            ).distinct())
+
+        templates = DjDynamicTemplate.objects.select_related('category').filter(category__app__in=apps, template_is_active=True).exclude(
+            category__in=[category for category, _ in errors]
+        ).order_by('id')
+        stale = self.stale_templates(apps).defer('content')
+        counts = {WRITTEN: 0, SKIPPED: 0, REMOVED: 0}
+        processed, removed_paths = 0, set()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for chunk in chunked(templates.iterator(chunk_size=chunk_size), chunk_size):
+                self.run_chunk(executor, self.sync_template, chunk, counts, errors, force, dry_run)
+                if not dry_run:
+                    DjDynamicTemplate.save_sync_state(chunk)
+                processed += len(chunk)
+            for chunk in chunked(stale.iterator(chunk_size=chunk_size), chunk_size):
+                chunk = [template_obj for template_obj in chunk if template_obj.file_path not in removed_paths]
+                removed_paths.update(template_obj.file_path for template_obj in chunk)
+                self.run_chunk(executor, self.remove_template, chunk, counts, errors, dry_run)
+                if not dry_run:
+                    DjDynamicTemplate.save_sync_state(chunk)
+                processed += len(chunk)
+
+        return counts, errors, processed
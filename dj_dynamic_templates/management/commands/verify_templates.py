@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+import time
+
+from dj_dynamic_templates.forms import get_app_labels
+from dj_dynamic_templates.models import *
+from dj_dynamic_templates.storage import get_storage
+
+
+class Command(BaseCommand):
+    help = "Refresh the sync-state index of templates and category directories from the filesystem"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            '--app',
+            type=str,
+            help='Project app names (defaults to every installed app inside BASE_DIR)',
+            required=False,
+            nargs="+"
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=getattr(settings, 'DJ_DYNAMIC_TEMPLATES_SYNC_WORKERS', None),
+            help='Number of threads checking template files (defaults to the ThreadPoolExecutor default)'
+        )
+
+    def handle(self, *args, **options) -> str:
+        options["app"] = options["app"] or get_app_labels()
+        workers = options['workers']
+        if workers is not None and workers < 1:
+            raise CommandError("--workers must be a positive integer")
+        started = time.perf_counter()
+
+        categories = list(DjDynamicTemplateCategory.objects.filter(app__in=options["app"]))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(DjDynamicTemplateCategory.verify_directory, categories))
+        DjDynamicTemplateCategory.save_sync_state(categories)
+
+        templates = list(DjDynamicTemplate.objects.select_related('category').filter(category__app__in=options["app"], template_is_active=True))
+        stats = get_storage().stat_many(template_obj.file_path for template_obj in templates)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda template_obj: template_obj.verify_file(stats.get(template_obj.file_path)), templates))
+        DjDynamicTemplate.save_sync_state(templates)
+
+        statuses = Counter(template_obj.sync_status for template_obj in templates)
+        self.stdout.write(f"Verified {len(categories)} categories and {len(templates)} templates in {time.perf_counter() - started:.2f}s")
+        return ", ".join(f"{count} {status}" for status, count in sorted(statuses.items())) or "No templates to verify"
@@ -0,0 +1,163 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connection
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+
+def format_labels(labels) -> str:
+    def escape(value) -> str:
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ','.join(f'{key}="{escape(value)}"' for key, value in labels)
+
+
+def format_sample(name: str, labels, value) -> str:
+    return f'{name}{{{format_labels(labels)}}} {value}' if labels else f'{name} {value}'
+
+
+class BaseReporter:
+    """
+    Receives the counters and timings of the sync and render paths. measure() skips timing
+    and query counting when enabled is false, so the default costs a no-op call per event.
+    """
+
+    enabled = True
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        raise NotImplementedError
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        raise NotImplementedError
+
+
+class NullReporter(BaseReporter):
+    """The default: drops everything."""
+
+    enabled = False
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        pass
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        pass
+
+
+class LoggingReporter(BaseReporter):
+    """Writes every counter and timing as a log record."""
+
+    def __init__(self, logger: str = 'dj_dynamic_templates.metrics', level: str | int = 'INFO'):
+        self.logger = logging.getLogger(logger)
+        self.level = logging.getLevelName(level) if isinstance(level, str) else level
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        self.logger.log(self.level, '%s{%s} +%s', name, format_labels(sorted(labels.items())), value)
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        self.logger.log(self.level, '%s{%s} %.6f', name, format_labels(sorted(labels.items())), value)
+
+
+class PrometheusReporter(BaseReporter):
+    """
+    Aggregates counters and histograms in process and renders them in the Prometheus text
+    exposition format, served by views.metrics_view. Each worker process keeps its own values.
+    """
+
+    DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, namespace: str = 'dj_dynamic_templates', buckets: tuple | None = None):
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets or self.DEFAULT_BUCKETS))
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] += value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {'buckets': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            histogram['buckets'][index] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def render(self) -> str:
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, {**value, 'buckets': list(value['buckets'])}) for key, value in self.histograms.items())
+        lines, typed = [], set()
+        for (name, labels), value in counters:
+            metric = f'{self.namespace}_{name}'
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f'# TYPE {metric} counter')
+            lines.append(format_sample(metric, labels, f'{value:g}'))
+        for (name, labels), histogram in histograms:
+            metric = f'{self.namespace}_{name}'
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f'# TYPE {metric} histogram')
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), histogram['buckets']):
+                cumulative += count
+                lines.append(format_sample(f'{metric}_bucket', (*labels, ('le', bound)), cumulative))
+            lines.append(format_sample(f'{metric}_sum', labels, f'{histogram["sum"]:g}'))
+            lines.append(format_sample(f'{metric}_count', labels, histogram['count']))
+        return '\n'.join(lines) + '\n'
+
+
+@cache
+def get_reporter() -> BaseReporter:
+    """
+    Metrics reporter selected by DJ_DYNAMIC_TEMPLATES_METRICS, a dict with a 'BACKEND' dotted
+    path and optional 'OPTIONS' passed to its constructor.
+    """
+    config = getattr(settings, 'DJ_DYNAMIC_TEMPLATES_METRICS', None) or {}
+    backend = import_string(config.get('BACKEND', 'dj_dynamic_templates.metrics.NullReporter'))
+    return backend(**{key.lower(): value for key, value in config.get('OPTIONS', {}).items()})
+
+
+@receiver(setting_changed)
+def reset_reporter(*, setting, **kwargs) -> None:
+    if setting == 'DJ_DYNAMIC_TEMPLATES_METRICS':
+        get_reporter.cache_clear()
+
+
+@contextmanager
+def measure(operation: str, **labels):
+    """
+    Time the block as <operation>_seconds and count the database queries it runs as
+    <operation>_queries_total. Nothing is measured while the reporter is disabled.
+    """
+    reporter = get_reporter()
+    if not reporter.enabled:
+        yield
+        return
+    queries = 0
+
+    def count_queries(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        with connection.execute_wrapper(count_queries):
+            yield
+    finally:
+        reporter.observe(f'{operation}_seconds', time.perf_counter() - started, **labels)
+        reporter.increment(f'{operation}_queries_total', queries, **labels)
@@ -0,0 +1,27 @@
+import hashlib
+
+from django.db import migrations, models
+
+
+def populate_content_hash(apps, schema_editor):
+    DjDynamicTemplate = apps.get_model('dj_dynamic_templates', 'DjDynamicTemplate')
+    templates = DjDynamicTemplate.objects.using(schema_editor.connection.alias).only('pk', 'content')
+    for template in templates.iterator():
+        template.content_hash = hashlib.sha256((template.content or '').encode('utf-8')).hexdigest()
+        template.save(update_fields=['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dj_dynamic_templates', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='djdynamictemplate',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', editable=False, help_text='SHA-256 digest of the template content. This field is automatically computed whenever the template is saved and is used to skip unchanged files while syncing.', max_length=64, verbose_name='Content Hash'),
+        ),
+        migrations.RunPython(populate_content_hash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dj_dynamic_templates', '0002_djdynamictemplate_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='djdynamictemplatecategory',
+            name='directory_exists',
+            field=models.BooleanField(blank=True, editable=False, help_text='Whether the category directory existed when it was last created, removed or verified. This field is maintained by the sync paths so the admin does not have to stat every directory.', null=True, verbose_name='Directory Exists'),
+        ),
+        migrations.AddField(
+            model_name='djdynamictemplate',
+            name='synced_hash',
+            field=models.CharField(blank=True, default='', editable=False, help_text='SHA-256 digest of the template file as it was last written or verified. It is empty when the file was missing.', max_length=64, verbose_name='Synced Hash'),
+        ),
+        migrations.AddField(
+            model_name='djdynamictemplate',
+            name='synced_size',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, help_text='Size in bytes of the template file when it was last written or verified.', null=True, verbose_name='Synced Size'),
+        ),
+        migrations.AddField(
+            model_name='djdynamictemplate',
+            name='synced_mtime',
+            field=models.FloatField(blank=True, editable=False, help_text='Modification time of the template file when it was last written or verified.', null=True, verbose_name='Synced Modification Time'),
+        ),
+        migrations.AddField(
+            model_name='djdynamictemplate',
+            name='synced_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='The date and time when the template file was last written, removed or verified.', null=True, verbose_name='Synced at'),
+        ),
+    ]
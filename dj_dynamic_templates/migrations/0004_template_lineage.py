@@ -0,0 +1,74 @@
+import uuid
+
+from django.db import migrations, models
+
+
+def backfill_lineage(apps, schema_editor):
+    DjDynamicTemplate = apps.get_model('dj_dynamic_templates', 'DjDynamicTemplate')
+    templates = DjDynamicTemplate.objects.using(schema_editor.connection.alias)
+    parents = dict(templates.order_by('pk').values_list('pk', 'revision_of_id'))
+    resolved = {}
+
+    def resolve(pk):
+        chain = []
+        while pk is not None and pk not in resolved:
+            chain.append(pk)
+            pk = parents.get(pk)
+            if pk in chain:
+                # Break cycles left by hand-edited data by starting a new lineage.
+                pk = None
+        lineage, depth = resolved[pk] if pk is not None else (uuid.uuid4(), 0)
+        for pk in reversed(chain):
+            depth += 1
+            resolved[pk] = (lineage, depth)
+
+    for pk in parents:
+        resolve(pk)
+
+    # Several rows can be revisions of the same one, so number each lineage by depth, then pk,
+    # rather than by depth alone: revisions stay unique and come after the one they are based on.
+    lineages = {}
+    for pk, (lineage, depth) in resolved.items():
+        lineages.setdefault(lineage, []).append((depth, pk))
+    numbered = {}
+    for lineage, members in lineages.items():
+        for revision, (_, pk) in enumerate(sorted(members), start=1):
+            numbered[pk] = (lineage, revision)
+
+    batch = []
+    for pk, (lineage, revision) in numbered.items():
+        batch.append(DjDynamicTemplate(pk=pk, lineage=lineage, revision=revision))
+        if len(batch) == 500:
+            templates.bulk_update(batch, ['lineage', 'revision'])
+            batch = []
+    templates.bulk_update(batch, ['lineage', 'revision'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dj_dynamic_templates', '0003_sync_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='djdynamictemplate',
+            name='lineage',
+            field=models.UUIDField(editable=False, null=True, verbose_name='Lineage'),
+        ),
+        migrations.AddField(
+            model_name='djdynamictemplate',
+            name='revision',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Position of this record in the revision history of the template, starting at 1.', verbose_name='Revision'),
+        ),
+        migrations.RunPython(backfill_lineage, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='djdynamictemplate',
+            name='lineage',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, help_text='Identifier shared by every revision of the same template. This field is automatically copied from the previous revision when a new revision is created.', verbose_name='Lineage'),
+        ),
+        migrations.AddConstraint(
+            model_name='djdynamictemplate',
+            constraint=models.UniqueConstraint(fields=('lineage', 'revision'), name='unique_template_lineage_revision'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dj_dynamic_templates', '0004_template_lineage'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='djdynamictemplate',
+            index=models.Index(condition=models.Q(('template_is_active', True)), fields=['category'], name='dj_tpl_active_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='djdynamictemplate',
+            index=models.Index(fields=['category', 'template_name', '-created_at'], name='dj_tpl_cat_name_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='djdynamictemplate',
+            index=models.Index(condition=models.Q(('template_is_active', True)), fields=['-created_at'], name='dj_tpl_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='djdynamictemplate',
+            index=models.Index(fields=['-created_at'], name='dj_tpl_created_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+import hashlib
+
+from django.db import migrations, models
+from django.template import TemplateSyntaxError
+
+
+def compile_existing(apps, schema_editor):
+    from dj_dynamic_templates.compiler import compile_template, template_dependencies
+
+    DjDynamicTemplate = apps.get_model('dj_dynamic_templates', 'DjDynamicTemplate')
+    templates = DjDynamicTemplate.objects.using(schema_editor.connection.alias)
+    batch = []
+    for template in templates.only('pk', 'content').iterator(chunk_size=500):
+        try:
+            compiled = compile_template(template.content)
+        except TemplateSyntaxError:
+            template.compiled_hash, template.dependencies = '', []
+        else:
+            template.compiled_hash = hashlib.sha256((template.content or '').encode('utf-8')).hexdigest()
+            template.dependencies = template_dependencies(compiled)
+        batch.append(template)
+        if len(batch) == 500:
+            templates.bulk_update(batch, ['compiled_hash', 'dependencies'])
+            batch = []
+    templates.bulk_update(batch, ['compiled_hash', 'dependencies'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dj_dynamic_templates', '0005_active_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='djdynamictemplate',
+            name='compiled_hash',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Content hash of the last revision content that compiled without errors. It is empty when the content has not been compiled or contains template syntax errors.', max_length=64, verbose_name='Compiled Hash'),
+        ),
+        migrations.AddField(
+            model_name='djdynamictemplate',
+            name='dependencies',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='Names of the templates referenced by {% extends %} and {% include %} tags in the content. This field is automatically populated when the template is saved.', verbose_name='Dependencies'),
+        ),
+        migrations.RunPython(compile_existing, migrations.RunPython.noop),
+    ]
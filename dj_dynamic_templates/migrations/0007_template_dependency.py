@@ -0,0 +1,44 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_dependency_edges(apps, schema_editor):
+    DjDynamicTemplate = apps.get_model('dj_dynamic_templates', 'DjDynamicTemplate')
+    DjDynamicTemplateDependency = apps.get_model('dj_dynamic_templates', 'DjDynamicTemplateDependency')
+    alias = schema_editor.connection.alias
+    edges = []
+    for pk, dependencies in DjDynamicTemplate.objects.using(alias).exclude(dependencies=[]).values_list('pk', 'dependencies').iterator(chunk_size=500):
+        edges.extend(DjDynamicTemplateDependency(template_id=pk, name=name) for name in dependencies if len(name) <= 255)
+        if len(edges) >= 500:
+            DjDynamicTemplateDependency.objects.using(alias).bulk_create(edges)
+            edges = []
+    DjDynamicTemplateDependency.objects.using(alias).bulk_create(edges)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dj_dynamic_templates', '0006_compiled_dependencies'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DjDynamicTemplateDependency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(db_index=True, help_text='Name of the template referenced by {% extends %} or {% include %}, as passed to the template loaders.', max_length=255, verbose_name='Dependency Name')),
+                ('template', models.ForeignKey(help_text='The template revision whose content extends or includes another template.', on_delete=django.db.models.deletion.CASCADE, related_name='dependency_edges', to='dj_dynamic_templates.djdynamictemplate', verbose_name='Template')),
+            ],
+            options={
+                'verbose_name': 'Dj Dynamic Template Dependency',
+                'verbose_name_plural': 'Dj Dynamic Template Dependencies',
+                'db_table': 'dj_dynamic_template_dependency',
+                'managed': True,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='djdynamictemplatedependency',
+            constraint=models.UniqueConstraint(fields=('template', 'name'), name='unique_template_dependency'),
+        ),
+        migrations.RunPython(backfill_dependency_edges, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dj_dynamic_templates', '0007_template_dependency'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='djdynamictemplate',
+            name='content_encoding',
+            field=models.CharField(blank=True, choices=[('', 'Plain'), ('zlib', 'Compressed'), ('delta', 'Delta')], default='', editable=False, help_text='How the content of this revision is stored. Inactive revisions are kept compressed, or as a delta against the previous revision, in the packed content and their content column is emptied.', max_length=8, verbose_name='Content Encoding'),
+        ),
+        migrations.AddField(
+            model_name='djdynamictemplate',
+            name='packed_content',
+            field=models.BinaryField(blank=True, editable=False, help_text='Compressed content, or compressed delta, of an inactive revision.', null=True, verbose_name='Packed Content'),
+        ),
+        migrations.AddField(
+            model_name='djdynamictemplate',
+            name='content_base',
+            field=models.ForeignKey(blank=True, editable=False, help_text='The revision the delta in the packed content applies to.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='dj_dynamic_templates.djdynamictemplate', verbose_name='Content Base'),
+        ),
+    ]
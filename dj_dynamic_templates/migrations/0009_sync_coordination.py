@@ -0,0 +1,48 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dj_dynamic_templates', '0008_packed_revisions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DjDynamicTemplateSyncGeneration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('app', models.CharField(help_text='The app whose templates this generation counts changes of.', max_length=100, unique=True, verbose_name='App')),
+                ('generation', models.BigIntegerField(default=0, help_text='Advanced in the same transaction as every change to the active templates or categories of the app, so a sync target can tell whether it has synced the latest state with one query.', verbose_name='Generation')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='The date and time of the last change to the app.', verbose_name='Updated at')),
+            ],
+            options={
+                'verbose_name': 'Dj Dynamic Template Sync Generation',
+                'verbose_name_plural': 'Dj Dynamic Template Sync Generations',
+                'db_table': 'dj_dynamic_template_sync_generation',
+                'managed': True,
+            },
+        ),
+        migrations.CreateModel(
+            name='DjDynamicTemplateSyncLease',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target', models.CharField(help_text='The node or shared volume the templates are synced to, see DJ_DYNAMIC_TEMPLATES_SYNC_TARGET.', max_length=255, verbose_name='Sync Target')),
+                ('app', models.CharField(help_text='The app whose templates are synced to the target.', max_length=100, verbose_name='App')),
+                ('generation', models.BigIntegerField(default=0, help_text='The generation of the app the target was last completely synced at.', verbose_name='Synced Generation')),
+                ('owner', models.CharField(blank=True, default='', help_text='The worker currently syncing the app to the target, if any.', max_length=255, verbose_name='Lease Owner')),
+                ('expires_at', models.DateTimeField(blank=True, help_text='Until when the owner holds the lease. An expired lease can be taken over by another worker.', null=True, verbose_name='Lease Expires at')),
+                ('synced_at', models.DateTimeField(blank=True, help_text='The date and time of the last complete sync of the app to the target.', null=True, verbose_name='Synced at')),
+            ],
+            options={
+                'verbose_name': 'Dj Dynamic Template Sync Lease',
+                'verbose_name_plural': 'Dj Dynamic Template Sync Leases',
+                'db_table': 'dj_dynamic_template_sync_lease',
+                'managed': True,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='djdynamictemplatesynclease',
+            constraint=models.UniqueConstraint(fields=('target', 'app'), name='unique_sync_lease_target_app'),
+        ),
+    ]
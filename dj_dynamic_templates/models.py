@@ -1,11 +1,35 @@
 from django.conf import settings
 from django.apps import apps
 from django.utils.translation import gettext_lazy as _
-import os
-import shutil
-from django.db import models, IntegrityError
+import hashlib
+import time
+import uuid
+from asgiref.sync import sync_to_async
+from django.db import models, transaction, IntegrityError
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
 from django.core.exceptions import ValidationError
+from django.template import Context, RequestContext, TemplateSyntaxError
 from django.db.models.functions import Now
+from django.utils import timezone
+
+from .cache import bump_generation, template_cache
+from .compiler import compile_template, get_compiled_template, template_dependencies
+from .metrics import get_reporter
+from .packing import DELTA, PLAIN, pack, unpack
+from .sandbox import sandbox
+from .signals import dynamic_template_rendered, template_file_written
+from .storage import get_storage
+
+
+def combine_hashes(hashes: list) -> str:
+    if len(hashes) == 1:
+        return hashes[0]
+    return hashlib.sha256('\n'.join(sorted(hashes)).encode('utf-8')).hexdigest()
+
+
+def content_digest(content: str | None) -> str:
+    return hashlib.sha256((content or '').encode('utf-8')).hexdigest()
 
 
 class DjDynamicTemplateCategory(models.Model):
@@ -51,36 +75,91 @@ class DjDynamicTemplateCategory(models.Model):
                     "This field is automatically populated with the user making the modification.")
     )
 
+    directory_exists = models.BooleanField(
+        verbose_name=_('Directory Exists'), null=True, blank=True, editable=False,
+        help_text=_("Whether the category directory existed when it was last created, removed or verified. "
+                    "This field is maintained by the sync paths so the admin does not have to stat every directory.")
+    )
+
     def __str__(self):
         return f'{self.app} - {self.name}'
 
+    def save(self, *args, **kwargs) -> None:
+        previous = None
+        if self.pk is not None and (kwargs.get('update_fields') is None or {'app', 'name'} & set(kwargs['update_fields'])):
+            previous = self.__class__.objects.filter(pk=self.pk).values_list('app', 'name').first()
+        super().save(*args, **kwargs)
+        if previous is not None and previous != (self.app, self.name):
+            DjDynamicTemplateSyncGeneration.bump([previous[0], self.app], using=self._state.db)
+        transaction.on_commit(bump_generation, using=kwargs.get('using'))
+
     @property
     def directory_path(self):
-        return os.path.join(settings.BASE_DIR, self.app, 'templates', self.name)
+        return get_storage().directory_path(self.app, self.name)
 
     @property
     def is_directory_exists(self) -> bool:
-        return os.path.exists(self.directory_path)
+        return get_storage().exists(self.directory_path)
 
     @property
     def files_in_dir(self) -> list:
-        if self.is_directory_exists:
-            return os.listdir(self.directory_path)
-        else:
-            return list()
+        return [entry.name for entry in self.list_files()]
+
+    def list_files(self, search: str | None = None) -> list:
+        """
+        The files of the category directory as storage DirEntry tuples, sorted by name and
+        optionally filtered by a case-insensitive part of the name. A missing directory lists
+        no files.
+        """
+        try:
+            entries = get_storage().scandir(self.directory_path)
+        except FileNotFoundError:
+            return []
+        if search:
+            search = search.casefold()
+            entries = [entry for entry in entries if search in entry.name.casefold()]
+        return entries
+
+    def active_file_names(self, names=None) -> set:
+        """
+        The file names, among the given ones or all of them, that belong to an active template
+        of this category, in one query. Other files in the directory are orphans.
+        """
+        active = self.djdynamictemplate_set.filter(template_is_active=True)
+        if names is not None:
+            template_names = [name.removesuffix('.html') for name in names if name.endswith('.html')]
+            if not template_names:
+                return set()
+            active = active.filter(template_name__in=template_names)
+        return {f'{name}.html' for name in active.values_list('template_name', flat=True)}
 
     def make_directory(self, exists_ok=False) -> bool:
-        if not self.is_directory_exists:
-            os.makedirs(self.directory_path, exist_ok=exists_ok)
-            return True
-        return False
+        created = get_storage().make_directory(self.directory_path, exists_ok=exists_ok)
+        self.directory_exists = True
+        return created
 
     def remove_directory(self) -> bool:
-        if self.is_directory_exists:
-            shutil.rmtree(self.directory_path, ignore_errors=True)
-            return True
-        else:
-            return False
+        self.directory_exists = False
+        return get_storage().remove_directory(self.directory_path)
+
+    async def ais_directory_exists(self) -> bool:
+        return await sync_to_async(lambda: self.is_directory_exists, thread_sensitive=False)()
+
+    async def afiles_in_dir(self) -> list:
+        return await sync_to_async(lambda: self.files_in_dir, thread_sensitive=False)()
+
+    def verify_directory(self) -> None:
+        self.directory_exists = self.is_directory_exists
+
+    @classmethod
+    def save_sync_state(cls, categories) -> None:
+        """
+        Persist the directory state recorded on the given instances in one bulk update.
+        Directory operations only set attributes, so they stay safe to run in worker threads.
+        """
+        categories = [category for category in categories if category.pk is not None]
+        if categories:
+            cls.objects.bulk_update(categories, ['directory_exists'], batch_size=500)
 
 
     class Meta:
@@ -138,47 +217,451 @@ class DjDynamicTemplate(models.Model):
                     "It indicates the previous template revision that this record is based on.")
     )
 
+    lineage = models.UUIDField(
+        verbose_name=_('Lineage'), default=uuid.uuid4, editable=False,
+        help_text=_("Identifier shared by every revision of the same template. "
+                    "This field is automatically copied from the previous revision when a new revision is created.")
+    )
+    revision = models.PositiveIntegerField(
+        verbose_name=_('Revision'), default=1, editable=False,
+        help_text=_("Position of this record in the revision history of the template, starting at 1.")
+    )
+
     created_at = models.DateTimeField(
         verbose_name=_('Created at'), db_default=Now(), editable=False,
         help_text=_("The date and time when this template was created. "
                     "This field is automatically set to the current date and time when the record is first created.")
     )
 
+    content_hash = models.CharField(
+        verbose_name=_('Content Hash'), max_length=64, blank=True, default='', editable=False,
+        help_text=_("SHA-256 digest of the template content. "
+                    "This field is automatically computed whenever the template is saved and is used to skip unchanged files while syncing.")
+    )
+
+    compiled_hash = models.CharField(
+        verbose_name=_('Compiled Hash'), max_length=64, blank=True, default='', editable=False,
+        help_text=_("Content hash of the last revision content that compiled without errors. "
+                    "It is empty when the content has not been compiled or contains template syntax errors.")
+    )
+
+    dependencies = models.JSONField(
+        verbose_name=_('Dependencies'), default=list, blank=True, editable=False,
+        help_text=_("Names of the templates referenced by {% extends %} and {% include %} tags in the content. "
+                    "This field is automatically populated when the template is saved.")
+    )
+
+    content_encoding = models.CharField(
+        verbose_name=_('Content Encoding'), max_length=8, blank=True, default='', editable=False,
+        choices=[('', _('Plain')), ('zlib', _('Compressed')), ('delta', _('Delta'))],
+        help_text=_("How the content of this revision is stored. Inactive revisions are kept compressed, or as a delta "
+                    "against the previous revision, in the packed content and their content column is emptied.")
+    )
+    packed_content = models.BinaryField(
+        verbose_name=_('Packed Content'), null=True, blank=True, editable=False,
+        help_text=_("Compressed content, or compressed delta, of an inactive revision.")
+    )
+    content_base = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+', verbose_name=_('Content Base'),
+        help_text=_("The revision the delta in the packed content applies to.")
+    )
+
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, editable=False, verbose_name=_('Created by'),
         help_text=_("The user who created this template. "
                     "This field is automatically populated with the user who initially created the record.")
     )
 
+    synced_hash = models.CharField(
+        verbose_name=_('Synced Hash'), max_length=64, blank=True, default='', editable=False,
+        help_text=_("SHA-256 digest of the template file as it was last written or verified. "
+                    "It is empty when the file was missing.")
+    )
+    synced_size = models.PositiveBigIntegerField(
+        verbose_name=_('Synced Size'), null=True, blank=True, editable=False,
+        help_text=_("Size in bytes of the template file when it was last written or verified.")
+    )
+    synced_mtime = models.FloatField(
+        verbose_name=_('Synced Modification Time'), null=True, blank=True, editable=False,
+        help_text=_("Modification time of the template file when it was last written or verified.")
+    )
+    synced_at = models.DateTimeField(
+        verbose_name=_('Synced at'), null=True, blank=True, editable=False,
+        help_text=_("The date and time when the template file was last written, removed or verified.")
+    )
+
     def clean(self) -> None:
         if self.pk and self.category:
             if self.__class__.objects.filter(template_name=self.template_name, category=self.category, template_is_active=True).exclude(pk=self.pk).exists():
                 raise ValidationError({'template_name': f'The template with name "{self.template_name}" already exists in the Category {self.category.name} of App {self.category.app}'})
+        try:
+            self.compile()
+        except TemplateSyntaxError as error:
+            raise ValidationError({'content': f'Invalid template syntax: {error}'})
+
+    def compile(self):
+        """
+        Parse the content, recording its dependencies and the hash that compiled. The parsed
+        template is kept on the instance so save() can hand it to the compiled-template cache.
+        """
+        content_hash = content_digest(self.content)
+        compiled = getattr(self, '_compiled', None)
+        if compiled is None or compiled[0] != content_hash:
+            name = self.loader_name if self.__class__.category.is_cached(self) else None
+            template = compile_template(self.content, name)
+            self._compiled = compiled = (content_hash, template)
+            self.compiled_hash, self.dependencies = content_hash, template_dependencies(template)
+        return compiled[1]
+
+    def cache_compiled(self) -> None:
+        compiled = getattr(self, '_compiled', None)
+        if compiled is not None and compiled[0] == self.content_hash and self.pk is not None:
+            template_cache.set((self.category_id, self.template_name, self.pk), compiled[1])
 
     @property
     def file_path(self) -> str:
-        return self.category.directory_path + f'/{self.template_name}.html'
+        return get_storage().file_path(self.category.app, self.category.name, self.template_name)
+
+    @property
+    def loader_name(self) -> str:
+        return f'{self.category.app}/{self.category.name}/{self.template_name}.html'
 
     @property
     def is_file_exist(self) -> bool:
-        return os.path.exists(self.file_path)
+        return get_storage().exists(self.file_path)
+
+    @property
+    def is_file_synced(self) -> bool:
+        """
+        Whether the template file already holds the current content. The file size is
+        compared first, so only files of the right length are read and hashed.
+        """
+        storage = get_storage()
+        stat = storage.stat(self.file_path)
+        if stat is None or stat.size != len((self.content or '').encode('utf-8')):
+            return False
+        return storage.digest(self.file_path) == content_digest(self.content)
+
+    @property
+    def sync_status(self) -> str:
+        """File status read from the sync-state index, without touching the filesystem."""
+        if self.template_is_active is False:
+            return "Inactive"
+        elif self.category.directory_exists is False:
+            return "Directory Does Not Exists"
+        elif self.synced_at is None:
+            return "Not Verified"
+        elif not self.synced_hash:
+            return "File Does Not Exists"
+        elif self.synced_hash == self.content_hash:
+            return "Synced"
+        else:
+            return "Not Synced"
+
+    def mark_synced(self, file_hash: str | None = None, stat=False) -> None:
+        """Record the current state of the template file on the instance."""
+        storage = get_storage()
+        if stat is False:
+            stat = storage.stat(self.file_path)
+        if stat is None:
+            self.synced_hash, self.synced_size, self.synced_mtime = '', None, None
+        else:
+            self.synced_hash = file_hash if file_hash is not None else storage.digest(self.file_path)
+            self.synced_size, self.synced_mtime = stat.size, stat.mtime
+        self.synced_at = timezone.now()
+
+    def verify_file(self, stat=False) -> None:
+        """
+        Refresh the sync state, hashing the file only when its size or mtime moved.
+        A stat already fetched through the storage's stat_many can be passed in.
+        """
+        if stat is False:
+            stat = get_storage().stat(self.file_path)
+        if stat is not None and self.synced_hash and (stat.size, stat.mtime) == (self.synced_size, self.synced_mtime):
+            self.synced_at = timezone.now()
+            return
+        self.mark_synced(stat=stat)
+
+    @classmethod
+    def save_sync_state(cls, templates) -> None:
+        """
+        Persist the sync state recorded on the given instances in one bulk update.
+        File operations only set attributes, so they stay safe to run in worker threads.
+        """
+        templates = [template for template in templates if template.pk is not None]
+        if templates:
+            cls.objects.bulk_update(templates, ['synced_hash', 'synced_size', 'synced_mtime', 'synced_at'], batch_size=500)
 
     def create_file(self) -> bool:
         if self.category.is_directory_exists:
-            file = open(f'{self.file_path}', 'w')
-            file.write(self.content)
-            file.close()
+            started = time.perf_counter()
+            get_storage().write(self.file_path, self.content or '')
+            self.mark_synced(content_digest(self.content))
+            duration = time.perf_counter() - started
+            get_reporter().observe('file_write_seconds', duration, app=self.category.app)
+            template_file_written.send(sender=self.__class__, instance=self, duration=duration)
             return True
         else:
             return False
 
     def delete_file(self) -> bool:
-        if self.is_file_exist:
-            os.remove(self.file_path)
+        if get_storage().delete(self.file_path):
+            self.mark_synced(stat=None)
             return True
         else:
             return False
 
+    def history(self):
+        """
+        Every revision of this template, newest first, in a single query. The content of
+        packed revisions is None until unpack_content() is called on them.
+        """
+        return self.__class__.objects.select_related('category').filter(lineage=self.lineage).order_by('-revision')
+
+    def rollback(self, user=None) -> 'DjDynamicTemplate':
+        """
+        Reactivate this revision in place of the active one of its lineage and, once the
+        transaction commits, atomically rewrite its file and remove the replaced one.
+        """
+        with transaction.atomic(using=self._state.db):
+            revisions = {
+                revision.pk: revision for revision in
+                self.__class__.objects.select_for_update().select_related('category').filter(lineage=self.lineage)
+            }
+            replaced = [revision for revision in revisions.values() if revision.template_is_active and revision.pk != self.pk]
+            for revision in replaced:
+                revision.template_is_active = False
+            self.__class__.objects.bulk_update(replaced, ['template_is_active'])
+            target = revisions[self.pk]
+            target.template_is_active = True
+            target.save(update_fields=['template_is_active'])
+            transaction.on_commit(lambda: target.sync_rollback(replaced), using=self._state.db)
+        self.template_is_active = True
+        return target
+
+    def sync_rollback(self, replaced: list) -> None:
+        for revision in replaced:
+            if revision.file_path != self.file_path:
+                revision.delete_file()
+        self.create_file()
+        self.__class__.save_sync_state([self, *replaced])
+
+    @classmethod
+    def active_by_loader_names(cls, names):
+        """Active templates addressed by the given "<app>/<category>/<template_name>.html" names."""
+        query = models.Q()
+        for name in names:
+            parts = name.split('/')
+            if len(parts) == 3 and parts[2].endswith('.html'):
+                query |= models.Q(category__app=parts[0], category__name=parts[1], template_name=parts[2].removesuffix('.html'))
+        if not query:
+            return cls.objects.none()
+        return cls.objects.filter(query, template_is_active=True)
+
+    def dependents(self, recursive: bool = True) -> list:
+        """
+        Active templates that extend or include this one, walking the dependency table one
+        query per level so a change to a base layout reaches its whole subtree.
+        """
+        found, frontier = {}, {self.loader_name}
+        while frontier:
+            templates = self.__class__.objects.select_related('category').filter(
+                template_is_active=True, dependency_edges__name__in=frontier
+            ).exclude(pk__in=[self.pk, *found]).distinct()
+            frontier = set()
+            for template in templates:
+                found[template.pk] = template
+                frontier.add(template.loader_name)
+            if not recursive:
+                break
+        return list(found.values())
+
+    def dependency_hash(self, max_depth: int = 10) -> str:
+        """
+        Hash of this template's content and of every active template it extends or includes,
+        so anything derived from its rendered output can be keyed on the whole tree.
+        """
+        hashes, seen, frontier = [self.content_hash or content_digest(self.content)], {self.loader_name}, set(self.dependencies)
+        for _ in range(max_depth):
+            frontier -= seen
+            if not frontier:
+                break
+            seen |= frontier
+            rows = self.active_by_loader_names(frontier).values_list('category__app', 'category__name', 'template_name', 'content_hash', 'dependencies')
+            frontier = set()
+            for app, category, template_name, content_hash, dependencies in rows:
+                hashes.append(f'{app}/{category}/{template_name}.html:{content_hash}')
+                frontier.update(dependencies)
+        return combine_hashes(hashes)
+
+    async def adependency_hash(self, max_depth: int = 10) -> str:
+        """dependency_hash() through the async ORM."""
+        await self.aload_category()
+        hashes, seen, frontier = [self.content_hash or content_digest(self.content)], {self.loader_name}, set(self.dependencies)
+        for _ in range(max_depth):
+            frontier -= seen
+            if not frontier:
+                break
+            seen |= frontier
+            rows = self.active_by_loader_names(frontier).values_list('category__app', 'category__name', 'template_name', 'content_hash', 'dependencies')
+            frontier = set()
+            async for app, category, template_name, content_hash, dependencies in rows:
+                hashes.append(f'{app}/{category}/{template_name}.html:{content_hash}')
+                frontier.update(dependencies)
+        return combine_hashes(hashes)
+
+    def save_dependency_edges(self) -> None:
+        self.dependency_edges.all().delete()
+        DjDynamicTemplateDependency.objects.bulk_create(
+            DjDynamicTemplateDependency(template=self, name=name) for name in self.dependencies if len(name) <= 255
+        )
+
+    def render(self, context: dict | None = None, request=None) -> str:
+        """Render this revision with the shared compiled template, through RequestContext when a request is given."""
+        started = time.perf_counter()
+        template = get_compiled_template(self)
+        content = template.render(RequestContext(request, context) if request is not None else Context(context))
+        duration = time.perf_counter() - started
+        get_reporter().observe('render_seconds', duration, app=self.category.app)
+        dynamic_template_rendered.send(sender=self.__class__, instance=self, duration=duration)
+        return content
+
+    def render_sandboxed(self, context: dict | None = None, request=None, limits=None, profile=None) -> str:
+        """
+        render() under the limits of DJ_DYNAMIC_TEMPLATES_SANDBOX, or the given RenderLimits, for
+        content authored by admin users. Raises TemplateLimitExceeded as soon as the render goes
+        over one, and records the node timings into profile when a RenderProfile is given.
+        """
+        with sandbox(limits, profile):
+            return self.render(context, request)
+
+    @classmethod
+    async def aget_active(cls, name: str) -> 'DjDynamicTemplate | None':
+        """Active template addressed by its "<app>/<category>/<template_name>.html" name, through the async ORM."""
+        return await cls.active_by_loader_names([name]).select_related('category').afirst()
+
+    async def arender(self, context: dict | None = None, request=None, sandboxed: bool = False) -> str:
+        """
+        render() for async views, or render_sandboxed() when sandboxed. Rendering may load the
+        templates it extends or includes through the database loader, so it runs in the thread
+        Django keeps for sync ORM calls, one render at a time across the process.
+        """
+        await self.aload_category()
+        return await sync_to_async(self.render_sandboxed if sandboxed else self.render)(context, request)
+
+    async def aload_category(self) -> None:
+        if not self.__class__.category.is_cached(self):
+            self.category = await DjDynamicTemplateCategory.objects.aget(pk=self.category_id)
+
+    async def ais_file_synced(self) -> bool:
+        await self.aload_category()
+        return await sync_to_async(lambda: self.is_file_synced, thread_sensitive=False)()
+
+    async def acreate_file(self) -> bool:
+        """create_file() with the filesystem work offloaded to the thread pool; persist with asave_sync_state()."""
+        await self.aload_category()
+        return await sync_to_async(self.create_file, thread_sensitive=False)()
+
+    async def adelete_file(self) -> bool:
+        await self.aload_category()
+        return await sync_to_async(self.delete_file, thread_sensitive=False)()
+
+    @classmethod
+    async def asave_sync_state(cls, templates) -> None:
+        await sync_to_async(cls.save_sync_state)(templates)
+
+    def unpack_content(self) -> str | None:
+        """
+        Restore the content of a packed revision from the snapshot and deltas it is based on,
+        read in a single query, and return it. Plain revisions are returned as they are.
+        """
+        if not self.content_encoding or self.content is not None:
+            return self.content
+        revisions = {revision.pk: revision for revision in self.__class__.objects.filter(
+            lineage=self.lineage, revision__lt=self.revision
+        ).only('pk', 'content', 'content_encoding', 'packed_content', 'content_base_id')}
+        chain, revision = [], self
+        while revision.content is None and revision.content_encoding == DELTA:
+            chain.append(revision)
+            if revision.content_base_id not in revisions:
+                raise ValueError(f"Base revision {revision.content_base_id} of template revision {revision.pk} is missing")
+            revision = revisions[revision.content_base_id]
+        content = revision.content
+        if content is None and revision.content_encoding:
+            content = unpack(revision.content_encoding, revision.packed_content)
+        for revision in reversed(chain):
+            content = unpack(DELTA, revision.packed_content, content or '')
+        if self.content_hash and content_digest(content) != self.content_hash:
+            raise ValueError(f"Unpacked content of template revision {self.pk} does not match its content hash")
+        self.content = content
+        return content
+
+    def pack_content(self, base: 'DjDynamicTemplate | None' = None) -> None:
+        """
+        Fill the packed content from the current content: a delta against base, the unpacked
+        previous revision, unless a full snapshot is due every DJ_DYNAMIC_TEMPLATES_SNAPSHOT_INTERVAL
+        revisions or the delta would not be smaller. The content attribute is left untouched.
+        """
+        interval = getattr(settings, 'DJ_DYNAMIC_TEMPLATES_SNAPSHOT_INTERVAL', 10)
+        if base is not None and (interval <= 1 or (self.revision - 1) % interval == 0 or base.content is None):
+            base = None
+        self.content_encoding, self.packed_content = pack(self.content or '', base.content if base is not None else None)
+        self.content_base = base if self.content_encoding == DELTA else None
+
+    def rebase_dependents(self, content_hash: str | None = None) -> None:
+        """
+        Turn the deltas based on this revision into full snapshots, before it is deleted or,
+        when the new content_hash is given, before its content changes in place.
+        """
+        if self.pk is None:
+            return
+        dependents = self.__class__.objects.filter(content_base_id=self.pk)
+        if content_hash is not None:
+            dependents = dependents.exclude(content_base__content_hash=content_hash)
+        dependents = list(dependents)
+        for dependent in dependents:
+            dependent.unpack_content()
+            dependent.pack_content()
+        self.__class__.objects.bulk_update(dependents, ['content_encoding', 'packed_content', 'content_base'])
+
+    def save(self, *args, **kwargs) -> None:
+        if self.pk is None and self.revision_of is not None:
+            self.lineage = self.revision_of.lineage
+            self.revision = self.__class__.objects.filter(lineage=self.lineage).aggregate(latest=models.Max('revision'))['latest'] + 1
+        self.unpack_content()
+        self.content_hash = content_digest(self.content)
+        if kwargs.get('update_fields') is None or {'content', 'template_is_active'} & set(kwargs['update_fields']):
+            self.rebase_dependents(self.content_hash)
+            if self.template_is_active is False and self.content and getattr(settings, 'DJ_DYNAMIC_TEMPLATES_PACK_REVISIONS', True):
+                base = self.__class__.objects.filter(lineage=self.lineage, revision__lt=self.revision).order_by('-revision').first()
+                if base is not None:
+                    base.unpack_content()
+                self.pack_content(base)
+            else:
+                self.content_encoding, self.packed_content, self.content_base = PLAIN, None, None
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'content', 'content_encoding', 'packed_content', 'content_base'}
+        if kwargs.get('update_fields') is None or 'content' in kwargs['update_fields']:
+            try:
+                self.compile()
+            except TemplateSyntaxError:
+                self._compiled, self.compiled_hash, self.dependencies = None, '', []
+        if kwargs.get('update_fields') is not None and 'content' in kwargs['update_fields']:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'content_hash', 'compiled_hash', 'dependencies'}
+        content = self.content
+        if self.content_encoding:
+            self.content = None
+        try:
+            super().save(*args, **kwargs)
+        finally:
+            self.content = content
+        if kwargs.get('update_fields') is None or 'content' in kwargs['update_fields']:
+            self.save_dependency_edges()
+        if kwargs.get('update_fields') is None or {'content', 'template_is_active', 'template_name', 'category'} & set(kwargs['update_fields']):
+            DjDynamicTemplateSyncGeneration.bump([self.category.app], using=self._state.db)
+        transaction.on_commit(bump_generation, using=kwargs.get('using'))
+        transaction.on_commit(self.cache_compiled, using=kwargs.get('using'))
+
     def __str__(self):
         return f'{self.category.app} - {self.category.name} - {self.template_name}'
 
@@ -194,7 +677,14 @@ class DjDynamicTemplate(models.Model):
                 violation_error_code='DUPLICATE_TEMPLATE_IN_APP_CATEGORY',
                 violation_error_message=_('A template with the same name already exists in this category. '
                                           'Please choose a different name or deactivate the existing template.')
-            )
+            ),
+            models.UniqueConstraint(fields=('lineage', 'revision'), name='unique_template_lineage_revision'),
+        ]
+        indexes = [
+            models.Index(fields=('category',), condition=models.Q(template_is_active=True), name='dj_tpl_active_category_idx'),
+            models.Index(fields=('category', 'template_name', '-created_at'), name='dj_tpl_cat_name_created_idx'),
+            models.Index(fields=('-created_at',), condition=models.Q(template_is_active=True), name='dj_tpl_active_created_idx'),
+            models.Index(fields=('-created_at',), name='dj_tpl_created_idx'),
         ]
         permissions = (
             ('can_view_inactive_templates', 'Can view the Inactive Templates'),
@@ -205,3 +695,134 @@ class DjDynamicTemplate(models.Model):
         db_table = 'dj_dynamic_template'
         verbose_name = _(db_table.replace("_", " ").title())
         verbose_name_plural = verbose_name.replace("Template", "Templates")
+
+
+class DjDynamicTemplateDependency(models.Model):
+
+    template = models.ForeignKey(
+        DjDynamicTemplate, on_delete=models.CASCADE, related_name='dependency_edges', verbose_name=_('Template'),
+        help_text=_("The template revision whose content extends or includes another template.")
+    )
+    name = models.CharField(
+        verbose_name=_('Dependency Name'), max_length=255, db_index=True,
+        help_text=_("Name of the template referenced by {% extends %} or {% include %}, as passed to the template loaders.")
+    )
+
+    def __str__(self):
+        return f'{self.template} -> {self.name}'
+
+
+    class Meta:
+        managed = apps.is_installed("dj_dynamic_templates")
+        constraints = [
+            models.UniqueConstraint(fields=('template', 'name'), name='unique_template_dependency'),
+        ]
+        db_table = 'dj_dynamic_template_dependency'
+        verbose_name = _(db_table.replace("_", " ").title())
+        verbose_name_plural = verbose_name.replace("Dependency", "Dependencies")
+
+
+class DjDynamicTemplateSyncGeneration(models.Model):
+
+    app = models.CharField(
+        verbose_name=_('App'), max_length=100, unique=True,
+        help_text=_("The app whose templates this generation counts changes of.")
+    )
+    generation = models.BigIntegerField(
+        verbose_name=_('Generation'), default=0,
+        help_text=_("Advanced in the same transaction as every change to the active templates or categories of the app, "
+                    "so a sync target can tell whether it has synced the latest state with one query.")
+    )
+    updated_at = models.DateTimeField(
+        verbose_name=_('Updated at'), auto_now=True,
+        help_text=_("The date and time of the last change to the app.")
+    )
+
+    def __str__(self):
+        return f'{self.app} - {self.generation}'
+
+    @classmethod
+    def bump(cls, apps, using: str | None = None) -> None:
+        """Advance the generation of the given apps, creating their rows on first use."""
+        apps = sorted(set(apps))
+        if not apps:
+            return
+        manager = cls.objects.db_manager(using)
+        changes = {'generation': models.F('generation') + 1, 'updated_at': timezone.now()}
+        if manager.filter(app__in=apps).update(**changes) < len(apps):
+            missing = set(apps) - set(manager.filter(app__in=apps).values_list('app', flat=True))
+            manager.bulk_create([cls(app=app) for app in missing], ignore_conflicts=True)
+            manager.filter(app__in=missing).update(**changes)
+
+    @classmethod
+    def current(cls, apps) -> dict:
+        """Generation of every given app, 0 for apps that never changed."""
+        generations = dict(cls.objects.filter(app__in=apps).values_list('app', 'generation'))
+        return {app: generations.get(app, 0) for app in apps}
+
+
+    class Meta:
+        managed = apps.is_installed("dj_dynamic_templates")
+        db_table = 'dj_dynamic_template_sync_generation'
+        verbose_name = _(db_table.replace("_", " ").title())
+        verbose_name_plural = verbose_name.replace("Generation", "Generations")
+
+
+class DjDynamicTemplateSyncLease(models.Model):
+
+    target = models.CharField(
+        verbose_name=_('Sync Target'), max_length=255,
+        help_text=_("The node or shared volume the templates are synced to, see DJ_DYNAMIC_TEMPLATES_SYNC_TARGET.")
+    )
+    app = models.CharField(
+        verbose_name=_('App'), max_length=100,
+        help_text=_("The app whose templates are synced to the target.")
+    )
+    generation = models.BigIntegerField(
+        verbose_name=_('Synced Generation'), default=0,
+        help_text=_("The generation of the app the target was last completely synced at.")
+    )
+    owner = models.CharField(
+        verbose_name=_('Lease Owner'), max_length=255, blank=True, default='',
+        help_text=_("The worker currently syncing the app to the target, if any.")
+    )
+    expires_at = models.DateTimeField(
+        verbose_name=_('Lease Expires at'), null=True, blank=True,
+        help_text=_("Until when the owner holds the lease. An expired lease can be taken over by another worker.")
+    )
+    synced_at = models.DateTimeField(
+        verbose_name=_('Synced at'), null=True, blank=True,
+        help_text=_("The date and time of the last complete sync of the app to the target.")
+    )
+
+    def __str__(self):
+        return f'{self.target} - {self.app} - {self.generation}'
+
+
+    class Meta:
+        managed = apps.is_installed("dj_dynamic_templates")
+        constraints = [
+            models.UniqueConstraint(fields=('target', 'app'), name='unique_sync_lease_target_app'),
+        ]
+        db_table = 'dj_dynamic_template_sync_lease'
+        verbose_name = _(db_table.replace("_", " ").title())
+        verbose_name_plural = verbose_name.replace("Lease", "Leases")
+
+
+@receiver(pre_delete, sender=DjDynamicTemplate)
+def rebase_deleted_revision(sender, instance: DjDynamicTemplate, **kwargs) -> None:
+    instance.rebase_dependents()
+
+
+
+# Receivers rather than delete() overrides, as QuerySet.delete(), e.g. the admin's delete action, skips those.
+@receiver(post_delete, sender=DjDynamicTemplateCategory)
+def invalidate_deleted_category(sender, instance: DjDynamicTemplateCategory, using, **kwargs) -> None:
+    DjDynamicTemplateSyncGeneration.bump([instance.app], using=using)
+    transaction.on_commit(bump_generation, using=using)
+
+
+@receiver(post_delete, sender=DjDynamicTemplate)
+def invalidate_deleted_template(sender, instance: DjDynamicTemplate, using, **kwargs) -> None:
+    DjDynamicTemplateSyncGeneration.bump([instance.category.app], using=using)
+    transaction.on_commit(bump_generation, using=using)
@@ -0,0 +1,49 @@
+import json
+import zlib
+from difflib import SequenceMatcher
+
+PLAIN, COMPRESSED, DELTA = '', 'zlib', 'delta'
+
+
+def diff(base: str, content: str) -> list:
+    """
+    Line delta turning base into content: [start, end] pairs copy base lines, strings
+    are inserted as they are.
+    """
+    base_lines, lines = base.splitlines(keepends=True), content.splitlines(keepends=True)
+    delta = []
+    for tag, base_start, base_end, start, end in SequenceMatcher(None, base_lines, lines, autojunk=False).get_opcodes():
+        if tag == 'equal':
+            delta.append([base_start, base_end])
+        elif start != end:
+            delta.append(''.join(lines[start:end]))
+    return delta
+
+
+def patch(base: str, delta: list) -> str:
+    base_lines = base.splitlines(keepends=True)
+    return ''.join(part if isinstance(part, str) else ''.join(base_lines[part[0]:part[1]]) for part in delta)
+
+
+def pack(content: str, base: str | None = None) -> tuple[str, bytes]:
+    """
+    Encoding and payload of content: a compressed delta against base when one is given
+    and it comes out smaller, otherwise the compressed content itself.
+    """
+    snapshot = zlib.compress(content.encode('utf-8'), 9)
+    if base is None:
+        return COMPRESSED, snapshot
+    delta = zlib.compress(json.dumps(diff(base, content), separators=(',', ':')).encode('utf-8'), 9)
+    if len(delta) < len(snapshot):
+        return DELTA, delta
+    return COMPRESSED, snapshot
+
+
+def unpack(encoding: str, payload: bytes, base: str | None = None) -> str:
+    if encoding == COMPRESSED:
+        return zlib.decompress(payload).decode('utf-8')
+    if encoding == DELTA:
+        if base is None:
+            raise ValueError("A delta needs the content of its base revision to be unpacked")
+        return patch(base, json.loads(zlib.decompress(payload)))
+    raise ValueError(f"Unknown content encoding {encoding!r}")
@@ -0,0 +1,211 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from collections import Counter
+
+from .cache import get_cache
+from .models import DjDynamicTemplate, DjDynamicTemplateCategory
+from .storage import LocalTemplateStorage, get_storage
+from .transfer import chunked
+
+RECONCILE_STATS_KEY = 'dj_dynamic_templates:reconcile'
+MISSING, MODIFIED, ORPHANED = 'missing', 'modified', 'orphaned'
+
+
+def get_reconcile_stats() -> dict:
+    """Counters published by the last reconcile_templates pass, shared through the cache framework."""
+    return get_cache().get(RECONCILE_STATS_KEY) or {}
+
+
+class Reconciler:
+    """
+    Compares category directories with the active templates in the database and repairs
+    the drift in batches. Missing and modified files are rewritten from the database;
+    ".html" files without an active template are reported as orphaned and only removed
+    with remove_orphans. Files are hashed only when their size or mtime left the
+    sync-state index, so an unchanged tree costs one stat per file.
+    """
+
+    def __init__(self, apps: list, batch_size: int = 500, remove_orphans: bool = False, dry_run: bool = False, log=None):
+        self.apps = apps
+        self.batch_size = batch_size
+        self.remove_orphans = remove_orphans
+        self.dry_run = dry_run
+        self.log = log or (lambda message: None)
+        self.counters = Counter()
+
+    def categories(self, pks=None) -> list:
+        categories = DjDynamicTemplateCategory.objects.filter(app__in=self.apps)
+        if pks is not None:
+            categories = categories.filter(pk__in=pks)
+        return list(categories.order_by('id'))
+
+    def run(self, categories: list) -> Counter:
+        """Reconcile the given categories, add the outcome to the counters and publish them."""
+        started = time.perf_counter()
+        drift = self.reconcile(categories)
+        self.counters += drift
+        self.counters['passes'] += 1
+        get_cache().set(RECONCILE_STATS_KEY, {
+            **self.counters, 'last_pass_at': time.time(), 'last_pass_seconds': time.perf_counter() - started,
+        }, timeout=None)
+        return drift
+
+    def reconcile(self, categories: list) -> Counter:
+        storage = get_storage()
+        drift = Counter()
+        paths = {category.directory_path: category for category in categories}
+        exists = storage.map(storage.exists, list(paths))[0]
+        for path, category in paths.items():
+            category.directory_exists = exists.get(path, False)
+        needed = set(DjDynamicTemplateCategory.objects.filter(
+            pk__in=[category.pk for category in categories if not category.directory_exists],
+            djdynamictemplate__template_is_active=True,
+        ).values_list('pk', flat=True))
+        for category in categories:
+            if category.pk in needed:
+                self.log(f"Directory '{category.name}' of app '{category.app}' is missing")
+                drift['directories'] += 1
+                if not self.dry_run:
+                    category.make_directory(exists_ok=True)
+        if not self.dry_run:
+            DjDynamicTemplateCategory.save_sync_state(categories)
+
+        listing = storage.listdir_many(paths)
+        files = {category.pk: {name for name in listing.get(path, []) if name.endswith('.html')} for path, category in paths.items()}
+        templates = DjDynamicTemplate.objects.select_related('category').defer('content').filter(
+            category__in=categories, template_is_active=True
+        ).order_by('id')
+        for chunk in chunked(templates.iterator(chunk_size=self.batch_size), self.batch_size):
+            for template_obj in chunk:
+                files[template_obj.category_id].discard(f'{template_obj.template_name}.html')
+            drift += self.repair(chunk)
+
+        orphans = [
+            storage.file_path(category.app, category.name, name.removesuffix('.html'))
+            for category in categories for name in sorted(files[category.pk])
+        ]
+        for path in orphans:
+            self.log(f"Orphaned file '{path}' has no active template")
+        drift[ORPHANED] += len(orphans)
+        if orphans and self.remove_orphans and not self.dry_run:
+            failed = storage.delete_many(orphans)
+            drift['removed'] += len(orphans) - len(failed)
+            drift['errors'] += len(failed)
+        return drift
+
+    def repair(self, templates: list) -> Counter:
+        storage = get_storage()
+        drift = Counter(checked=len(templates))
+        stats = storage.stat_many(template_obj.file_path for template_obj in templates)
+        missing, suspect = [], []
+        for template_obj in templates:
+            stat = stats.get(template_obj.file_path)
+            if stat is None:
+                missing.append(template_obj)
+            elif template_obj.synced_hash != template_obj.content_hash or (stat.size, stat.mtime) != (template_obj.synced_size, template_obj.synced_mtime):
+                suspect.append(template_obj)
+
+        digests = storage.map(lambda template_obj: storage.digest(template_obj.file_path), suspect)[0]
+        verified, modified = [], []
+        for template_obj in suspect:
+            if digests.get(template_obj) == template_obj.content_hash:
+                template_obj.mark_synced(digests[template_obj], stats[template_obj.file_path])
+                verified.append(template_obj)
+            else:
+                modified.append(template_obj)
+        for template_obj in missing:
+            self.log(f"Template file '{template_obj.file_path}' is missing")
+        for template_obj in modified:
+            self.log(f"Template file '{template_obj.file_path}' was modified outside the database")
+        drift[MISSING], drift[MODIFIED] = len(missing), len(modified)
+        if self.dry_run:
+            return drift
+
+        broken = missing + modified
+        contents = dict(DjDynamicTemplate.objects.filter(pk__in=[template_obj.pk for template_obj in broken]).values_list('pk', 'content'))
+        for template_obj in broken:
+            template_obj.content = contents.get(template_obj.pk)
+        written, failed = storage.map(lambda template_obj: template_obj.create_file(), broken)
+        repaired = [template_obj for template_obj, created in written.items() if created]
+        for template_obj, error in failed.items():
+            self.log(f"Failed to repair '{template_obj.file_path}': {error}")
+        drift['repaired'] += len(repaired)
+        drift['errors'] += len(failed)
+        DjDynamicTemplate.save_sync_state(verified + repaired)
+        return drift
+
+
+class DirectoryWatcher:
+    """
+    inotify watches on category directories, reporting which categories changed. Linux only,
+    through libc, and only meaningful for storages backed by the local filesystem.
+    """
+
+    IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE = 0x2, 0x4, 0x8
+    IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x40, 0x80, 0x100, 0x200
+    IN_DELETE_SELF, IN_MOVE_SELF, IN_Q_OVERFLOW, IN_IGNORED, IN_ONLYDIR = 0x400, 0x800, 0x4000, 0x8000, 0x1000000
+    MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+    EVENT = struct.Struct('iIII')
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        self.watches = {}
+        self.paths = {}
+
+    @classmethod
+    def available(cls) -> bool:
+        return sys.platform.startswith('linux') and isinstance(get_storage(), LocalTemplateStorage)
+
+    def update(self, categories: list, prune: bool = True) -> None:
+        """Watch the existing directories of the given categories and, with prune, drop the watches of the others."""
+        wanted = {category.directory_path: category.pk for category in categories if category.directory_exists}
+        for path in set(self.paths) - set(wanted) if prune else ():
+            self.libc.inotify_rm_watch(self.fd, self.paths.pop(path))
+        for path, pk in wanted.items():
+            if path in self.paths:
+                continue
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+            if wd >= 0:
+                self.paths[path] = wd
+                self.watches[wd] = pk
+
+    def read(self, timeout: float, delay: float = 0.1) -> set | None:
+        """
+        Category ids with changes, waiting up to timeout seconds for the first event and then
+        delay seconds to coalesce bursts. None means the queue overflowed and everything must
+        be rescanned.
+        """
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return set()
+        time.sleep(delay)
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+                offset += self.EVENT.size + length
+                if mask & self.IN_Q_OVERFLOW:
+                    return None
+                if wd in self.watches:
+                    changed.add(self.watches[wd])
+                if mask & self.IN_IGNORED:
+                    pk = self.watches.pop(wd, None)
+                    self.paths = {path: watch for path, watch in self.paths.items() if watch != wd}
+                    if pk is not None:
+                        changed.add(pk)
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
@@ -0,0 +1,89 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import bump_generation
+from .models import DjDynamicTemplateCategory, DjDynamicTemplateSyncGeneration
+from .storage import get_storage
+
+
+class Relocation:
+    """
+    Outcome of relocate_categories, filled in once the directories have been moved:
+    moved and created hold categories, failed holds (category, error) pairs whose
+    database change has been reverted.
+    """
+
+    def __init__(self, moves: list):
+        self.moves = moves
+        self.moved = []
+        self.created = []
+        self.failed = []
+        self.done = False
+
+
+def relocate_categories(moves, user=None, on_complete=None, using=None) -> Relocation:
+    """
+    Move categories to a new (app, name) and carry their directories, and the template files
+    in them, along. moves is an iterable of (category, app, name).
+
+    The rows are updated in one transaction, which fails without changing anything when a
+    destination directory already exists. The directories are moved in parallel once that
+    transaction, or the one it is nested in, commits: the files keep their content and
+    mtime, so the sync state stays valid without re-syncing. Categories whose directory
+    could not be moved get their old app and name back. A category without a directory
+    gets an empty one. on_complete is called with the Relocation when it is done.
+    """
+    storage = get_storage()
+    planned = []
+    try:
+        with transaction.atomic(using=using):
+            now = timezone.now()
+            for category, app, name in moves:
+                old_path = category.directory_path
+                old = (category.app, category.name)
+                category.app, category.name = app, name
+                planned.append((category, old, old_path))
+                if category.directory_path != old_path and storage.exists(category.directory_path):
+                    raise FileExistsError(category.directory_path)
+                category.last_updated_at = now
+                if user is not None:
+                    category.last_updated_by = user
+            fields = ['app', 'name', 'last_updated_at'] + (['last_updated_by'] if user is not None else [])
+            DjDynamicTemplateCategory.objects.using(using).bulk_update([category for category, _, _ in planned], fields, batch_size=500)
+            DjDynamicTemplateSyncGeneration.bump({category.app for category, _, _ in planned} | {app for _, (app, _), _ in planned}, using=using)
+            relocation = Relocation([(category, old_path, category.directory_path) for category, _, old_path in planned])
+            previous = {category: old for category, old, _ in planned}
+            transaction.on_commit(lambda: move_directories(relocation, previous, on_complete, using), using=using)
+    except BaseException:
+        for category, (app, name), _ in planned:
+            category.app, category.name = app, name
+        raise
+    return relocation
+
+
+def move_directories(relocation: Relocation, previous: dict, on_complete=None, using=None) -> None:
+    storage = get_storage()
+    moves = [(category, old_path, new_path) for category, old_path, new_path in relocation.moves if old_path != new_path]
+    results, errors = storage.map(lambda move: storage.move_directory(move[1], move[2]), moves)
+    missing = [move[0] for move, moved in results.items() if not moved]
+    created, failed = storage.map(lambda category: category.make_directory(exists_ok=True), missing)
+    errors.update({(category, None, None): error for category, error in failed.items()})
+
+    relocation.moved = [move[0] for move, moved in results.items() if moved]
+    relocation.created = list(created)
+    relocation.failed = [(move[0], error) for move, error in errors.items()]
+    for category in relocation.moved + relocation.created:
+        category.directory_exists = True
+    DjDynamicTemplateCategory.save_sync_state(relocation.moved + relocation.created)
+    if relocation.failed:
+        reverted = [category for category, _ in relocation.failed]
+        apps = {category.app for category in reverted}
+        for category in reverted:
+            category.app, category.name = previous[category]
+        with transaction.atomic(using=using):
+            DjDynamicTemplateCategory.objects.using(using).bulk_update(reverted, ['app', 'name'], batch_size=500)
+            DjDynamicTemplateSyncGeneration.bump(apps | {category.app for category in reverted}, using=using)
+    bump_generation()
+    relocation.done = True
+    if on_complete is not None:
+        on_complete(relocation)
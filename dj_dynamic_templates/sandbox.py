@@ -0,0 +1,203 @@
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.template.base import Node, TextNode
+from django.template.defaulttags import ForNode
+from django.template.loader_tags import ExtendsNode, IncludeNode
+from django.utils import timezone
+
+from .cache import get_cache
+from .metrics import get_reporter
+
+RenderLimits = namedtuple('RenderLimits', ['timeout', 'max_output', 'max_iterations', 'max_include_depth'])
+ProfileEntry = namedtuple('ProfileEntry', ['template', 'line', 'node', 'calls', 'total', 'own'])
+
+PROFILE_CACHE_KEY = 'dj_dynamic_templates:profile:{pk}:{content_hash}'
+DEFAULT_LIMITS = RenderLimits(timeout=2.0, max_output=5_000_000, max_iterations=100_000, max_include_depth=10)
+
+active_sandbox = ContextVar('dj_dynamic_templates_sandbox', default=None)
+install_lock = threading.Lock()
+original_render_annotated = Node.render_annotated
+
+
+class TemplateLimitExceeded(RuntimeError):
+    """Raised from inside a sandboxed render as soon as one of its limits is exceeded."""
+
+    def __init__(self, limit: str, message: str):
+        super().__init__(message)
+        self.limit = limit
+
+
+def get_limits() -> RenderLimits:
+    """Limits from DJ_DYNAMIC_TEMPLATES_SANDBOX, a dict of TIMEOUT, MAX_OUTPUT, MAX_ITERATIONS and MAX_INCLUDE_DEPTH."""
+    config = getattr(settings, 'DJ_DYNAMIC_TEMPLATES_SANDBOX', None) or {}
+    return DEFAULT_LIMITS._replace(**{key.lower(): value for key, value in config.items()})
+
+
+def render_annotated(node: Node, context) -> str:
+    sandbox = active_sandbox.get()
+    if sandbox is None:
+        return original_render_annotated(node, context)
+    return sandbox.render(node, context)
+
+
+def render_text_annotated(node: TextNode, context) -> str:
+    sandbox = active_sandbox.get()
+    if sandbox is None:
+        return node.s
+    return sandbox.render(node, context)
+
+
+def install() -> None:
+    """
+    Route node rendering through the active sandbox; done once, on first use, so plain renders
+    pay nothing before. TextNode overrides render_annotated, so it is patched on its own.
+    """
+    with install_lock:
+        if Node.render_annotated is not render_annotated:
+            Node.render_annotated = render_annotated
+        if TextNode.render_annotated is not render_text_annotated:
+            TextNode.render_annotated = render_text_annotated
+
+
+class RenderProfile:
+    """Calls, inclusive and own time of every node rendered, keyed by template, line and tag."""
+
+    def __init__(self):
+        self.entries = {}
+        self.duration = 0.0
+
+    @staticmethod
+    def describe(node: Node) -> tuple:
+        origin = getattr(node, 'origin', None)
+        template = (getattr(origin, 'template_name', None) or getattr(origin, 'name', None) or '') if origin else ''
+        token = getattr(node, 'token', None)
+        if token is None:
+            return template, None, type(node).__name__
+        contents = ' '.join(token.contents.split())
+        if token.token_type.name == 'TEXT':
+            label = 'text'
+        elif token.token_type.name == 'VAR':
+            label = f'{{{{ {contents[:80]} }}}}'
+        else:
+            label = f'{{% {contents[:80]} %}}'
+        return template, token.lineno, label
+
+    def add(self, node: Node, total: float, own: float) -> None:
+        key = self.describe(node)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.entries[key] = [1, total, own]
+        else:
+            entry[0] += 1
+            entry[1] += total
+            entry[2] += own
+
+    def slowest(self, count: int = 10) -> list:
+        """The nodes that took the most time of their own, i.e. excluding the nodes nested in them."""
+        entries = [ProfileEntry(*key, *values) for key, values in self.entries.items()]
+        return sorted(entries, key=lambda entry: entry.own, reverse=True)[:count]
+
+
+class Sandbox:
+    """
+    Enforces the limits of one render. Checks run as every node starts rendering: a single
+    node that is slow on its own, e.g. a filter over a huge value, is only caught once it
+    returns. Output is counted in characters, on the nodes that produce it themselves.
+    """
+
+    def __init__(self, limits: RenderLimits, profile: RenderProfile | None = None):
+        self.limits = limits
+        self.profile = profile
+        self.deadline = time.perf_counter() + limits.timeout if limits.timeout else None
+        self.output = 0
+        self.iterations = 0
+        self.depth = 0
+        self.loop_heads = set()
+        self.nested = []
+
+    def exceeded(self, limit: str, message: str):
+        get_reporter().increment('render_limit_exceeded_total', limit=limit)
+        raise TemplateLimitExceeded(limit, message)
+
+    def enter(self, node: Node) -> None:
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            self.exceeded('timeout', f"Rendering took longer than {self.limits.timeout}s")
+        if id(node) in self.loop_heads:
+            self.iterations += 1
+            if self.limits.max_iterations and self.iterations > self.limits.max_iterations:
+                self.exceeded('iterations', f"Loops ran more than {self.limits.max_iterations} iterations")
+        if isinstance(node, ForNode) and node.nodelist_loop:
+            self.loop_heads.add(id(node.nodelist_loop[0]))
+        if isinstance(node, IncludeNode):
+            self.depth += 1
+            if self.limits.max_include_depth and self.depth > self.limits.max_include_depth:
+                self.exceeded('include_depth', f"Includes are nested more than {self.limits.max_include_depth} levels deep")
+
+    @staticmethod
+    def produces_output(node: Node) -> bool:
+        if isinstance(node, (IncludeNode, ExtendsNode)):
+            return False
+        return not any(getattr(node, name, None) for name in node.child_nodelists)
+
+    def render(self, node: Node, context) -> str:
+        self.enter(node)
+        started = time.perf_counter()
+        self.nested.append(0.0)
+        try:
+            output = original_render_annotated(node, context)
+        finally:
+            total = time.perf_counter() - started
+            nested = self.nested.pop()
+            if self.nested:
+                self.nested[-1] += total
+            if isinstance(node, IncludeNode):
+                self.depth -= 1
+            if self.profile is not None:
+                self.profile.add(node, total, total - nested)
+        if self.produces_output(node):
+            self.output += len(output)
+            if self.limits.max_output and self.output > self.limits.max_output:
+                self.exceeded('output', f"Rendering produced more than {self.limits.max_output} characters")
+        return output
+
+
+@contextmanager
+def sandbox(limits: RenderLimits | None = None, profile: RenderProfile | None = None):
+    """
+    Render templates under resource limits within the block, in this thread or task only,
+    optionally recording a RenderProfile:
+
+        with sandbox(profile=profile):
+            content = template.render(context)
+    """
+    install()
+    token = active_sandbox.set(Sandbox(limits or get_limits(), profile))
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        active_sandbox.reset(token)
+        if profile is not None:
+            profile.duration += time.perf_counter() - started
+
+
+def save_profile(template, profile: RenderProfile, error: Exception | None = None, count: int = 25) -> None:
+    """Keep the slowest nodes of a profiled render of this revision, for as long as its content is unchanged."""
+    get_cache().set(PROFILE_CACHE_KEY.format(pk=template.pk, content_hash=template.content_hash), {
+        'entries': [tuple(entry) for entry in profile.slowest(count)],
+        'duration': profile.duration,
+        'profiled_at': timezone.now(),
+        'error': str(error) if error is not None else None,
+    }, timeout=None)
+
+
+def get_profile(template) -> dict | None:
+    profile = get_cache().get(PROFILE_CACHE_KEY.format(pk=template.pk, content_hash=template.content_hash))
+    if profile is not None:
+        profile['entries'] = [ProfileEntry(*entry) for entry in profile['entries']]
+    return profile
@@ -0,0 +1,10 @@
+from django.dispatch import Signal
+
+# Sent by DjDynamicTemplate.create_file with instance and duration (seconds), possibly from a worker thread.
+template_file_written = Signal()
+
+# Sent by the sync_templates command with apps, counts ({'written', 'skipped', 'removed', 'failed'}) and duration.
+templates_synced = Signal()
+
+# Sent by DjDynamicTemplate.render with instance and duration, for previews and arender() alike.
+dynamic_template_rendered = Signal()
@@ -0,0 +1,454 @@
+import errno
+import hashlib
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+FileStat = namedtuple('FileStat', ['size', 'mtime'])
+DirEntry = namedtuple('DirEntry', ['name', 'size', 'mtime'])
+
+
+def file_digest(file_path: str) -> str:
+    with open(file_path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def atomic_write(file_path: str, content: str | bytes, fsync: bool | None = None) -> None:
+    """
+    Write content to a temporary file next to file_path and move it into place with
+    os.replace, so readers see either the old or the new file and never a partial one.
+    """
+    if fsync is None:
+        fsync = getattr(settings, 'DJ_DYNAMIC_TEMPLATES_FSYNC', False)
+    directory, name = os.path.split(file_path)
+    directory = directory or os.curdir
+    fd, temp_path = tempfile.mkstemp(prefix=f'.{name}.', suffix='.tmp', dir=directory)
+    try:
+        if isinstance(content, bytes):
+            file = os.fdopen(fd, 'wb')
+        else:
+            file = os.fdopen(fd, 'w', encoding='utf-8', newline='')
+        with file:
+            file.write(content)
+            if fsync:
+                file.flush()
+                os.fsync(file.fileno())
+        try:
+            os.chmod(temp_path, os.stat(file_path).st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(temp_path, 0o644)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    if fsync and hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class BaseTemplateStorage:
+    """
+    Where category directories and template files live. Subclasses implement the single
+    file operations; the batch operations run them in a thread pool and return the
+    failures keyed by path, so callers can report them in one go.
+    """
+
+    def __init__(self, workers: int | None = None):
+        self.workers = workers if workers is not None else getattr(settings, 'DJ_DYNAMIC_TEMPLATES_SYNC_WORKERS', None)
+
+    @property
+    def sync_target(self) -> str:
+        """Identifies where the files end up, so nodes writing to the same place share one sync lease."""
+        return f'{socket.gethostname()}:{type(self).__name__}'
+
+    def directory_path(self, app: str, category: str) -> str:
+        raise NotImplementedError
+
+    def file_path(self, app: str, category: str, template_name: str) -> str:
+        return os.path.join(self.directory_path(app, category), f'{template_name}.html')
+
+    def exists(self, path: str) -> bool:
+        raise NotImplementedError
+
+    def listdir(self, path: str) -> list:
+        raise NotImplementedError
+
+    def scandir(self, path: str) -> list:
+        """The files directly inside path as DirEntry(name, size, mtime), sorted by name."""
+        entries = []
+        for name in self.listdir(path):
+            stat = self.stat(os.path.join(path, name))
+            if stat is not None:
+                entries.append(DirEntry(name, stat.size, stat.mtime))
+        return sorted(entries)
+
+    def make_directory(self, path: str, exists_ok: bool = False) -> bool:
+        raise NotImplementedError
+
+    def remove_directory(self, path: str) -> bool:
+        raise NotImplementedError
+
+    def rename(self, old_path: str, new_path: str) -> None:
+        raise NotImplementedError
+
+    def move_directory(self, old_path: str, new_path: str) -> bool:
+        """
+        Move a whole directory, failing with FileExistsError when new_path exists and leaving
+        old_path untouched on any failure. Returns False when there was nothing to move.
+        """
+        if self.exists(new_path):
+            raise FileExistsError(new_path)
+        try:
+            self.rename(old_path, new_path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def stat(self, path: str) -> FileStat | None:
+        raise NotImplementedError
+
+    def read(self, path: str) -> bytes:
+        raise NotImplementedError
+
+    def write(self, path: str, content: str) -> None:
+        raise NotImplementedError
+
+    def delete(self, path: str) -> bool:
+        raise NotImplementedError
+
+    def digest(self, path: str) -> str:
+        return hashlib.sha256(self.read(path)).hexdigest()
+
+    def map(self, func, items: list) -> tuple[dict, dict]:
+        """Apply func to every item and return ({item: result}, {item: error})."""
+        def call(item):
+            try:
+                return item, func(item), None
+            except Exception as error:
+                return item, None, error
+
+        if len(items) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                outcomes = list(executor.map(call, items))
+        else:
+            outcomes = [call(item) for item in items]
+        return (
+            {item: result for item, result, error in outcomes if error is None},
+            {item: error for item, _, error in outcomes if error is not None},
+        )
+
+    def write_many(self, files: dict) -> dict:
+        return self.map(lambda path: self.write(path, files[path]), list(files))[1]
+
+    def delete_many(self, paths) -> dict:
+        return self.map(self.delete, list(paths))[1]
+
+    def stat_many(self, paths) -> dict:
+        return self.map(self.stat, list(paths))[0]
+
+    def listdir_many(self, paths) -> dict:
+        return self.map(lambda path: self.listdir(path) if self.exists(path) else [], list(paths))[0]
+
+
+class LocalTemplateStorage(BaseTemplateStorage):
+    """Keeps templates in the 'templates' directory of their app, as the package always has."""
+
+    def __init__(self, workers: int | None = None, listing_cache_size: int | None = None):
+        super().__init__(workers)
+        if listing_cache_size is None:
+            listing_cache_size = getattr(settings, 'DJ_DYNAMIC_TEMPLATES_LISTING_CACHE_SIZE', 256)
+        self.listing_cache_size = listing_cache_size
+        self.listings = OrderedDict()
+        self.listings_lock = threading.Lock()
+
+    @staticmethod
+    def app_path(app: str) -> str:
+        """
+        Directory of a project app, which may be nested below BASE_DIR. Any other label maps to
+        BASE_DIR/<app>, so a category named after an installed package never writes into it.
+        """
+        from .forms import get_app_labels
+
+        if app in get_app_labels():
+            return apps.get_app_config(app).path
+        return os.path.join(settings.BASE_DIR, app)
+
+    @property
+    def sync_target(self) -> str:
+        return f'{socket.gethostname()}:{os.path.abspath(settings.BASE_DIR)}'
+
+    def directory_path(self, app: str, category: str) -> str:
+        return os.path.join(self.app_path(app), 'templates', category)
+
+    def exists(self, path: str) -> bool:
+        return os.path.exists(path)
+
+    def listdir(self, path: str) -> list:
+        return os.listdir(path)
+
+    def scandir(self, path: str) -> list:
+        """
+        One os.scandir pass, which gets the names, sizes and mtimes without a stat call per
+        file on most platforms. Listings are cached per directory and reused while the mtime
+        of the directory is unchanged; creating, replacing (as atomic_write does) or removing
+        a file changes it, editing a file in place does not.
+        """
+        version = os.stat(path).st_mtime_ns
+        with self.listings_lock:
+            cached = self.listings.get(path)
+            if cached is not None and cached[0] == version:
+                self.listings.move_to_end(path)
+                return cached[1]
+        entries = []
+        with os.scandir(path) as iterator:
+            for entry in iterator:
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append(DirEntry(entry.name, stat.st_size, stat.st_mtime))
+        entries.sort()
+        if self.listing_cache_size:
+            with self.listings_lock:
+                self.listings[path] = (version, entries)
+                self.listings.move_to_end(path)
+                while len(self.listings) > self.listing_cache_size:
+                    self.listings.popitem(last=False)
+        return entries
+
+    def make_directory(self, path: str, exists_ok: bool = False) -> bool:
+        if not os.path.exists(path):
+            os.makedirs(path, exist_ok=exists_ok)
+            return True
+        return False
+
+    def remove_directory(self, path: str) -> bool:
+        if os.path.exists(path):
+            shutil.rmtree(path, ignore_errors=True)
+            return True
+        return False
+
+    def rename(self, old_path: str, new_path: str) -> None:
+        os.rename(old_path, new_path)
+
+    def move_directory(self, old_path: str, new_path: str) -> bool:
+        """
+        A single os.rename when both paths are on the same filesystem. Across filesystems
+        the files are copied in parallel into a staging directory next to new_path, which
+        is renamed into place once complete before old_path is removed, so new_path never
+        holds a partial copy.
+        """
+        if os.path.exists(new_path):
+            raise FileExistsError(new_path)
+        if not os.path.isdir(old_path):
+            return False
+        parent, name = os.path.split(new_path)
+        os.makedirs(parent, exist_ok=True)
+        try:
+            os.rename(old_path, new_path)
+            return True
+        except OSError as error:
+            if error.errno != errno.EXDEV:
+                raise
+        staging = tempfile.mkdtemp(prefix=f'.{name}.', suffix='.tmp', dir=parent)
+        try:
+            shutil.copystat(old_path, staging)
+            names = self.listdir(old_path)
+            directories = [name for name in names if os.path.isdir(os.path.join(old_path, name))]
+            for directory in directories:
+                shutil.copytree(os.path.join(old_path, directory), os.path.join(staging, directory))
+            files = [name for name in names if name not in directories]
+            failed = self.map(lambda name: shutil.copy2(os.path.join(old_path, name), os.path.join(staging, name)), files)[1]
+            if failed:
+                raise next(iter(failed.values()))
+            os.rename(staging, new_path)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        shutil.rmtree(old_path, ignore_errors=True)
+        return True
+
+    def stat(self, path: str) -> FileStat | None:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return FileStat(stat.st_size, stat.st_mtime)
+
+    def read(self, path: str) -> bytes:
+        with open(path, 'rb') as file:
+            return file.read()
+
+    def write(self, path: str, content: str) -> None:
+        atomic_write(path, content)
+
+    def delete(self, path: str) -> bool:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def digest(self, path: str) -> str:
+        return file_digest(path)
+
+
+class SharedDirectoryTemplateStorage(LocalTemplateStorage):
+    """
+    Keeps templates under a single root, e.g. a volume shared by every node, laid out as
+    "<root>/<app>/<category>/<template_name>.html". Adding the root to the DIRS of the
+    template engine makes the files resolvable by their loader names.
+    """
+
+    def __init__(self, root: str | None = None, workers: int | None = None, listing_cache_size: int | None = None):
+        super().__init__(workers, listing_cache_size)
+        if not root:
+            raise ImproperlyConfigured("SharedDirectoryTemplateStorage requires a 'root' option.")
+        self.root = os.fspath(root)
+
+    @property
+    def sync_target(self) -> str:
+        return f'shared:{os.path.abspath(self.root)}'
+
+    def directory_path(self, app: str, category: str) -> str:
+        return os.path.join(self.root, app, category)
+
+    def make_directory(self, path: str, exists_ok: bool = False) -> bool:
+        # Several nodes may create the same directory on a shared volume at once.
+        if not os.path.exists(path):
+            os.makedirs(path, exist_ok=True)
+            return True
+        return False
+
+
+class InMemoryTemplateStorage(BaseTemplateStorage):
+    """Keeps directories and files in a dict, for tests and benchmarks."""
+
+    root = '/dj_dynamic_templates'
+
+    def __init__(self, workers: int | None = None):
+        super().__init__(workers)
+        self.directories = set()
+        self.files = {}
+        self.lock = threading.Lock()
+
+    @property
+    def sync_target(self) -> str:
+        return f'memory:{socket.gethostname()}:{os.getpid()}:{id(self)}'
+
+    def directory_path(self, app: str, category: str) -> str:
+        return f'{self.root}/{app}/{category}'
+
+    def file_path(self, app: str, category: str, template_name: str) -> str:
+        return f'{self.directory_path(app, category)}/{template_name}.html'
+
+    def exists(self, path: str) -> bool:
+        return path in self.directories or path in self.files
+
+    def listdir(self, path: str) -> list:
+        if path not in self.directories:
+            raise FileNotFoundError(path)
+        prefix = f'{path}/'
+        return sorted({name[len(prefix):].split('/')[0] for name in [*self.files, *self.directories] if name.startswith(prefix)})
+
+    def scandir(self, path: str) -> list:
+        if path not in self.directories:
+            raise FileNotFoundError(path)
+        prefix = f'{path}/'
+        return sorted(
+            DirEntry(name[len(prefix):], len(content), mtime)
+            for name, (content, mtime) in list(self.files.items())
+            if name.startswith(prefix) and '/' not in name[len(prefix):]
+        )
+
+    def make_directory(self, path: str, exists_ok: bool = False) -> bool:
+        with self.lock:
+            if path in self.directories:
+                return False
+            self.directories.add(path)
+            return True
+
+    def remove_directory(self, path: str) -> bool:
+        prefix = f'{path}/'
+        with self.lock:
+            if path not in self.directories:
+                return False
+            self.directories = {name for name in self.directories if name != path and not name.startswith(prefix)}
+            self.files = {name: value for name, value in self.files.items() if not name.startswith(prefix)}
+            return True
+
+    def rename(self, old_path: str, new_path: str) -> None:
+        old_prefix, new_prefix = f'{old_path}/', f'{new_path}/'
+        with self.lock:
+            if old_path not in self.directories:
+                raise FileNotFoundError(old_path)
+            if new_path in self.directories:
+                raise FileExistsError(new_path)
+            self.directories = {
+                new_path + name[len(old_path):] if name == old_path or name.startswith(old_prefix) else name
+                for name in self.directories
+            }
+            self.files = {
+                new_prefix + name[len(old_prefix):] if name.startswith(old_prefix) else name: value
+                for name, value in self.files.items()
+            }
+
+    def stat(self, path: str) -> FileStat | None:
+        entry = self.files.get(path)
+        if entry is None:
+            return None
+        return FileStat(len(entry[0]), entry[1])
+
+    def read(self, path: str) -> bytes:
+        try:
+            return self.files[path][0]
+        except KeyError:
+            raise FileNotFoundError(path)
+
+    def write(self, path: str, content: str) -> None:
+        if path.rsplit('/', 1)[0] not in self.directories:
+            raise FileNotFoundError(path)
+        with self.lock:
+            self.files[path] = ((content or '').encode('utf-8'), time.time())
+
+    def delete(self, path: str) -> bool:
+        with self.lock:
+            return self.files.pop(path, None) is not None
+
+
+@cache
+def get_storage() -> BaseTemplateStorage:
+    """
+    Storage backend selected by DJ_DYNAMIC_TEMPLATES_STORAGE, a dict with a 'BACKEND' dotted
+    path and optional 'OPTIONS' passed to its constructor.
+    """
+    config = getattr(settings, 'DJ_DYNAMIC_TEMPLATES_STORAGE', None) or {}
+    backend = import_string(config.get('BACKEND', 'dj_dynamic_templates.storage.LocalTemplateStorage'))
+    return backend(**{key.lower(): value for key, value in config.get('OPTIONS', {}).items()})
+
+
+@receiver(setting_changed)
+def reset_storage(*, setting, **kwargs) -> None:
+    if setting in ('DJ_DYNAMIC_TEMPLATES_STORAGE', 'DJ_DYNAMIC_TEMPLATES_SYNC_WORKERS', 'DJ_DYNAMIC_TEMPLATES_LISTING_CACHE_SIZE'):
+        get_storage.cache_clear()
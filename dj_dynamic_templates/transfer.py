@@ -0,0 +1,147 @@
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.template import TemplateSyntaxError
+
+from .cache import bump_generation
+from .models import DjDynamicTemplate, DjDynamicTemplateCategory, DjDynamicTemplateDependency, DjDynamicTemplateSyncGeneration, content_digest
+
+CATEGORY_FIELDS = ('app', 'name', 'description')
+TEMPLATE_FIELDS = ('category__app', 'category__name', 'template_name', 'content', 'content_hash')
+
+
+def chunked(iterable, size: int):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def dump_templates(file, apps: list | None = None, chunk_size: int = 500) -> int:
+    """
+    Write the categories and active templates as JSON lines, streaming rows from the
+    database in chunks so memory stays flat regardless of the size of the catalog.
+    """
+    categories = DjDynamicTemplateCategory.objects.order_by('app', 'name')
+    templates = DjDynamicTemplate.objects.filter(template_is_active=True).order_by('category__app', 'category__name', 'template_name')
+    if apps:
+        categories = categories.filter(app__in=apps)
+        templates = templates.filter(category__app__in=apps)
+
+    for row in categories.values(*CATEGORY_FIELDS).iterator(chunk_size=chunk_size):
+        file.write(json.dumps({'type': 'category', **row}) + '\n')
+    count = 0
+    for row in templates.values_list(*TEMPLATE_FIELDS).iterator(chunk_size=chunk_size):
+        app, category, template_name, content, content_hash = row
+        file.write(json.dumps({
+            'type': 'template', 'app': app, 'category': category, 'template_name': template_name,
+            'content': content, 'content_hash': content_hash or content_digest(content),
+        }) + '\n')
+        count += 1
+    return count
+
+
+def load_templates(file, batch_size: int = 500, user=None, errors: list | None = None) -> dict:
+    """
+    Read JSON lines written by dump_templates in batches. Missing categories and templates
+    are bulk created; templates whose content changed get a new active revision linked to
+    the one it replaces, and identical ones are skipped. Templates that do not compile are
+    rejected, counted as invalid and, when errors is given, appended to it as (name, error).
+    """
+    counts = {'categories': 0, 'created': 0, 'updated': 0, 'skipped': 0, 'invalid': 0}
+    category_ids = {}
+    records = (json.loads(line) for line in file if line.strip())
+    for batch in chunked(records, batch_size):
+        with transaction.atomic():
+            changes = counts['created'] + counts['updated']
+            load_categories([record for record in batch if record['type'] == 'category'], category_ids, counts, user)
+            load_template_batch([record for record in batch if record['type'] == 'template'], category_ids, counts, user, errors)
+            if counts['created'] + counts['updated'] > changes:
+                DjDynamicTemplateSyncGeneration.bump(record['app'] for record in batch if record['type'] == 'template')
+    if counts['categories'] or counts['created'] or counts['updated']:
+        transaction.on_commit(bump_generation)
+    return counts
+
+
+def load_categories(records: list, category_ids: dict, counts: dict, user=None) -> None:
+    keys = {(record['app'], record['name']): record for record in records}
+    missing = set(keys) - set(category_ids)
+    if not missing:
+        return
+    for pk, app, name in DjDynamicTemplateCategory.objects.filter(
+        app__in={app for app, _ in missing}, name__in={name for _, name in missing}
+    ).values_list('pk', 'app', 'name'):
+        category_ids[(app, name)] = pk
+    created = DjDynamicTemplateCategory.objects.bulk_create([
+        DjDynamicTemplateCategory(
+            app=app, name=name, description=keys[(app, name)].get('description'), created_by=user, last_updated_by=user
+        )
+        for app, name in sorted(set(keys) - set(category_ids))
+    ])
+    for category in created:
+        category_ids[(category.app, category.name)] = category.pk
+    counts['categories'] += len(created)
+
+
+def load_template_batch(records: list, category_ids: dict, counts: dict, user=None, errors: list | None = None) -> None:
+    load_categories(
+        [{'app': record['app'], 'name': record['category']} for record in records if (record['app'], record['category']) not in category_ids],
+        category_ids, counts, user
+    )
+    records = {(category_ids[(record['app'], record['category'])], record['template_name']): record for record in records}
+    existing = {
+        (template.category_id, template.template_name): template
+        for template in DjDynamicTemplate.objects.filter(
+            template_is_active=True,
+            category_id__in={category_id for category_id, _ in records},
+            template_name__in={template_name for _, template_name in records},
+        ).only('pk', 'category_id', 'template_name', 'content', 'content_hash', 'lineage', 'revision')
+    }
+
+    latest = dict(
+        DjDynamicTemplate.objects.filter(lineage__in={template.lineage for template in existing.values()})
+        .values('lineage').annotate(latest=Max('revision')).values_list('lineage', 'latest')
+    )
+    replaced, created = [], []
+    for (category_id, template_name), record in records.items():
+        content = record.get('content')
+        content_hash = content_digest(content)
+        current = existing.get((category_id, template_name))
+        if current is not None and current.content_hash == content_hash:
+            counts['skipped'] += 1
+            continue
+        template = DjDynamicTemplate(
+            category_id=category_id, template_name=template_name, content=content, content_hash=content_hash,
+            revision_of=current, created_by=user,
+        )
+        if current is not None:
+            template.lineage, template.revision = current.lineage, latest[current.lineage] + 1
+        try:
+            template.compile()
+        except TemplateSyntaxError as error:
+            counts['invalid'] += 1
+            if errors is not None:
+                errors.append((f"{record['app']}/{record['category']}/{template_name}.html", error))
+            continue
+        if current is not None:
+            current.template_is_active = False
+            replaced.append(current)
+        created.append(template)
+    fields = ['template_is_active']
+    if getattr(settings, 'DJ_DYNAMIC_TEMPLATES_PACK_REVISIONS', True):
+        # Packed as snapshots, so no other revision has to be read and unpacked here.
+        for template in replaced:
+            if template.content:
+                template.pack_content()
+                template.content = None
+        fields += ['content', 'content_encoding', 'packed_content', 'content_base']
+    DjDynamicTemplate.objects.bulk_update(replaced, fields)
+    DjDynamicTemplate.objects.bulk_create(created)
+    DjDynamicTemplateDependency.objects.bulk_create(
+        DjDynamicTemplateDependency(template=template, name=name)
+        for template in created for name in template.dependencies if len(name) <= 255
+    )
+    counts['updated'] += len(replaced)
+    counts['created'] += len(created) - len(replaced)
@@ -1,13 +1,112 @@
-from django.shortcuts import render
-from django.template.exceptions import TemplateDoesNotExist
-from django.http import HttpResponse
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
 
+from .cache import get_cache
+from .metrics import get_reporter, measure
 from .models import DjDynamicTemplate
+from .sandbox import TemplateLimitExceeded
+
+RENDER_CACHE_KEY = 'dj_dynamic_templates:render:{pk}:{content_hash}'
+
+
+def template_response(response, etag: str) -> HttpResponse:
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def limit_exceeded_response(error: TemplateLimitExceeded) -> HttpResponse:
+    return HttpResponse(f"<h1>Template rendering stopped: {error}</h1>", status=500)
+
 
-# Create your views here.
 def template_view(request, template_id: int):
-    try:
-        return render(request, DjDynamicTemplate.objects.get(id=template_id).file_path)
-    except TemplateDoesNotExist:
-        return HttpResponse("<h1>Template file Does not Exist...!", status=404)
+    """
+    Render a template revision straight from the database. Responses carry a strong ETag
+    derived from the revision and the content hashes of its extends/include tree, so a
+    change to a base layout is picked up and revalidation is otherwise answered with 304
+    without rendering. When DJ_DYNAMIC_TEMPLATES_RENDER_CACHE_TIMEOUT is set, templates are
+    rendered without request context and the output is kept in the cache framework. With
+    DJ_DYNAMIC_TEMPLATES_SANDBOX_PREVIEWS, previews are rendered under the sandbox limits.
+    """
+    reporter = get_reporter()
+    with measure('view'):
+        obj = DjDynamicTemplate.objects.select_related('category').filter(id=template_id).first()
+        if obj is None:
+            reporter.increment('templates_missing_total', source='view')
+            return HttpResponse("<h1>Template Does not Exist...!", status=404)
+
+        obj.unpack_content()
+        content_hash = obj.dependency_hash()
+        etag = f'"{obj.pk}-{content_hash}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            timeout = getattr(settings, 'DJ_DYNAMIC_TEMPLATES_RENDER_CACHE_TIMEOUT', None)
+            render = obj.render_sandboxed if getattr(settings, 'DJ_DYNAMIC_TEMPLATES_SANDBOX_PREVIEWS', False) else obj.render
+            try:
+                if timeout is None:
+                    content = render(request=request)
+                else:
+                    cache_key = RENDER_CACHE_KEY.format(pk=obj.pk, content_hash=content_hash)
+                    content = get_cache().get(cache_key)
+                    reporter.increment('render_cache_total', result='miss' if content is None else 'hit')
+                    if content is None:
+                        content = render()
+                        get_cache().set(cache_key, content, timeout=timeout)
+            except TemplateLimitExceeded as error:
+                return limit_exceeded_response(error)
+            response = HttpResponse(content)
+        else:
+            reporter.increment('view_not_modified_total')
+        return template_response(response, etag)
+
+
+async def atemplate_view(request, template_id: int):
+    """
+    template_view for ASGI deployments: the lookups go through the async ORM and cache API, and
+    rendering runs off the event loop in the thread Django keeps for sync database access, so
+    previews don't block other requests but render one at a time.
+    """
+    reporter = get_reporter()
+    with measure('view'):
+        obj = await DjDynamicTemplate.objects.select_related('category').filter(id=template_id).afirst()
+        if obj is None:
+            reporter.increment('templates_missing_total', source='view')
+            return HttpResponse("<h1>Template Does not Exist...!", status=404)
+
+        if obj.content_encoding:
+            await sync_to_async(obj.unpack_content)()
+        content_hash = await obj.adependency_hash()
+        etag = f'"{obj.pk}-{content_hash}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            timeout = getattr(settings, 'DJ_DYNAMIC_TEMPLATES_RENDER_CACHE_TIMEOUT', None)
+            sandboxed = getattr(settings, 'DJ_DYNAMIC_TEMPLATES_SANDBOX_PREVIEWS', False)
+            try:
+                if timeout is None:
+                    content = await obj.arender(request=request, sandboxed=sandboxed)
+                else:
+                    cache_key = RENDER_CACHE_KEY.format(pk=obj.pk, content_hash=content_hash)
+                    content = await get_cache().aget(cache_key)
+                    reporter.increment('render_cache_total', result='miss' if content is None else 'hit')
+                    if content is None:
+                        content = await obj.arender(sandboxed=sandboxed)
+                        await get_cache().aset(cache_key, content, timeout=timeout)
+            except TemplateLimitExceeded as error:
+                return limit_exceeded_response(error)
+            response = HttpResponse(content)
+        else:
+            reporter.increment('view_not_modified_total')
+        return template_response(response, etag)
+
 
+def metrics_view(request):
+    """
+    Metrics of the PrometheusReporter in the text exposition format. The admin serves it
+    to staff users; mount it in the project URLconf to let Prometheus scrape it directly.
+    """
+    reporter = get_reporter()
+    if not hasattr(reporter, 'render'):
+        raise Http404("DJ_DYNAMIC_TEMPLATES_METRICS does not use a reporter that can be exposed")
+    return HttpResponse(reporter.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+"""
+Run the test suite against tests.settings:
+
+    python runtests.py [test labels]
+"""
+import os
+import shutil
+import sys
+
+import django
+from django.conf import settings
+from django.test.utils import get_runner
+
+
+def main() -> int:
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+    django.setup()
+    os.environ['DJ_DYNAMIC_TEMPLATES_TESTS_BASE_DIR'] = settings.BASE_DIR
+    runner = get_runner(settings)(verbosity=1)
+    try:
+        failures = runner.run_tests(sys.argv[1:] or ['tests'])
+    finally:
+        shutil.rmtree(settings.BASE_DIR, ignore_errors=True)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Settings for the test suite: a SQLite database file and template directories inside a temporary
+BASE_DIR, and the in-memory template storage.
+"""
+import os
+import tempfile
+
+# Spawned worker processes import these settings again and reuse the directory of the test run.
+BASE_DIR = os.environ.get('DJ_DYNAMIC_TEMPLATES_TESTS_BASE_DIR') or tempfile.mkdtemp(prefix='dj_dynamic_templates_tests_')
+
+SECRET_KEY = 'dj-dynamic-templates-tests'
+DEBUG = False
+ALLOWED_HOSTS = ['testserver']
+USE_TZ = True
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'dj_dynamic_templates',
+]
+
+MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+]
+
+ROOT_URLCONF = 'benchmarks.urls'
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+    }
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+            'loaders': [
+                'dj_dynamic_templates.loaders.DatabaseLoader',
+                'django.template.loaders.app_directories.Loader',
+            ],
+        },
+    },
+]
+
+DJ_DYNAMIC_TEMPLATES_STORAGE = {'BACKEND': 'dj_dynamic_templates.storage.InMemoryTemplateStorage'}
+
+STATIC_URL = '/static/'
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from dj_dynamic_templates.models import DjDynamicTemplate, DjDynamicTemplateCategory
+from dj_dynamic_templates.storage import get_storage
+
+CHANGELIST = '/admin/dj_dynamic_templates/djdynamictemplate/'
+
+
+class TemplateActionTests(TestCase):
+
+    def setUp(self):
+        get_storage.cache_clear()
+        self.addCleanup(get_storage.cache_clear)
+        self.storage = get_storage()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        self.category = DjDynamicTemplateCategory.objects.create(app='pages', name='home')
+        self.templates = [
+            DjDynamicTemplate.objects.create(category=self.category, template_name=f'page{index}', content=f'Page {index}')
+            for index in range(7)
+        ]
+
+    def run_action(self, action: str, templates: list) -> list:
+        response = self.client.post(CHANGELIST, {'action': action, '_selected_action': [obj.pk for obj in templates]})
+        self.assertEqual(response.status_code, 302)
+        return [str(message) for message in get_messages(response.wsgi_request)]
+
+    def test_sync_reports_one_message_per_outcome(self):
+        messages = self.run_action('sync_templates', self.templates)
+        self.assertEqual(messages, [
+            "Directory does not exist so, 'home' directory has been created in the 'templates' directory of the 'pages' app.",
+            "Successfully synced 7 templates: 'page6', 'page5', 'page4', 'page3', 'page2' and 2 more",
+        ])
+        for obj in self.templates:
+            self.assertEqual(self.storage.read(obj.file_path), obj.content.encode())
+        self.assertTrue(DjDynamicTemplateCategory.objects.get(pk=self.category.pk).directory_exists)
+
+    def test_sync_reports_failures_together(self):
+        write = self.storage.write
+
+        def failing_write(path, content):
+            if path.endswith(('page1.html', 'page2.html')):
+                raise PermissionError('read-only')
+            return write(path, content)
+
+        with mock.patch.object(self.storage, 'write', failing_write):
+            messages = self.run_action('sync_templates', self.templates[:3])
+        self.assertIn("Successfully synced template 'page0' into 'home' directory of App 'pages' template's directory", messages)
+        self.assertIn("Failed to sync 2 templates: 'page2 (read-only)', 'page1 (read-only)'", messages)
+
+    def test_delete_reports_deleted_and_missing(self):
+        self.category.make_directory()
+        for obj in self.templates[:2]:
+            obj.create_file()
+        messages = self.run_action('delete_templates', self.templates[:3])
+        self.assertEqual(messages, [
+            "Successfully deleted 2 template files: 'page1', 'page0'",
+            "Template File does not exist for template page2 to delete it...!",
+        ])
+        self.assertFalse(self.storage.exists(self.templates[0].file_path))
+
+    def test_sync_loads_selection_in_bounded_queries(self):
+        with CaptureQueriesContext(connection) as few:
+            self.run_action('sync_templates', self.templates[:2])
+        with CaptureQueriesContext(connection) as many:
+            self.run_action('sync_templates', self.templates)
+        self.assertEqual(len(few), len(many))
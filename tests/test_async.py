@@ -0,0 +1,54 @@
+from django.test import TestCase
+
+from dj_dynamic_templates.models import DjDynamicTemplate, DjDynamicTemplateCategory
+from dj_dynamic_templates.storage import get_storage
+
+
+class AsyncTemplateTests(TestCase):
+
+    def setUp(self):
+        get_storage.cache_clear()
+        self.addCleanup(get_storage.cache_clear)
+        self.category = DjDynamicTemplateCategory.objects.create(app='pages', name='home')
+        self.base = DjDynamicTemplate.objects.create(category=self.category, template_name='base', content='<h1>{% block title %}{% endblock %}</h1>')
+        self.page = DjDynamicTemplate.objects.create(
+            category=self.category, template_name='index', content='{% extends "pages/home/base.html" %}{% block title %}Hello {{ name }}{% endblock %}',
+        )
+        self.dependency_hash = self.page.dependency_hash()
+
+    async def test_get_active(self):
+        template = await DjDynamicTemplate.aget_active('pages/home/index.html')
+        self.assertEqual(template.pk, self.page.pk)
+        self.assertTrue(DjDynamicTemplate.category.is_cached(template))
+        self.assertIsNone(await DjDynamicTemplate.aget_active('pages/home/missing.html'))
+
+    async def test_render_loads_parents_from_database(self):
+        template = await DjDynamicTemplate.objects.aget(pk=self.page.pk)
+        self.assertEqual(await template.arender({'name': 'World'}), '<h1>Hello World</h1>')
+        self.assertEqual(await template.arender({'name': 'Sandbox'}, sandboxed=True), '<h1>Hello Sandbox</h1>')
+        self.assertTrue(DjDynamicTemplate.category.is_cached(template))
+
+    async def test_dependency_hash_matches_sync(self):
+        template = await DjDynamicTemplate.objects.aget(pk=self.page.pk)
+        self.assertEqual(await template.adependency_hash(), self.dependency_hash)
+        self.assertNotEqual(await template.adependency_hash(), await self.base.adependency_hash())
+
+    async def test_file_operations(self):
+        template = await DjDynamicTemplate.objects.aget(pk=self.page.pk)
+        self.assertFalse(DjDynamicTemplate.category.is_cached(template))
+        await template.aload_category()
+        self.assertFalse(await template.category.ais_directory_exists())
+        self.category.make_directory()
+        self.assertTrue(await template.category.ais_directory_exists())
+        self.assertFalse(await template.ais_file_synced())
+
+        self.assertTrue(await template.acreate_file())
+        await DjDynamicTemplate.asave_sync_state([template])
+        self.assertTrue(await template.ais_file_synced())
+        self.assertEqual(await template.category.afiles_in_dir(), ['index.html'])
+        stored = await DjDynamicTemplate.objects.select_related('category').aget(pk=template.pk)
+        self.assertEqual(stored.sync_status, 'Synced')
+
+        self.assertTrue(await template.adelete_file())
+        self.assertFalse(await template.adelete_file())
+        self.assertEqual(await template.category.afiles_in_dir(), [])
@@ -0,0 +1,37 @@
+from django.test import SimpleTestCase
+
+from dj_dynamic_templates.cache import CompiledTemplateCache, bump_generation, get_cache, get_generation
+
+
+class GenerationTests(SimpleTestCase):
+
+    def setUp(self):
+        get_cache().clear()
+        self.addCleanup(get_cache().clear)
+        self.cache = CompiledTemplateCache(max_size=10)
+
+    def indexed(self) -> bool:
+        self.cache.check_generation()
+        return self.cache.get_revision('pages/home/index.html') is not None
+
+    def test_bump_drops_index(self):
+        self.cache.check_generation()
+        self.cache.set_revision('pages/home/index.html', (1, 'index', 1))
+        self.assertTrue(self.indexed())
+        bump_generation()
+        self.assertFalse(self.indexed())
+
+    def test_generation_never_repeats_after_cache_restart(self):
+        bump_generation()
+        self.cache.check_generation()
+        self.cache.set_revision('pages/home/index.html', (1, 'index', 1))
+        get_cache().clear()
+        bump_generation()
+        self.assertFalse(self.indexed())
+
+    def test_lost_generation_drops_index(self):
+        self.cache.check_generation()
+        self.cache.set_revision('pages/home/index.html', (1, 'index', 1))
+        get_cache().clear()
+        self.assertFalse(self.indexed())
+        self.assertEqual(get_generation(), get_generation())
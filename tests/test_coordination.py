@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from dj_dynamic_templates.coordination import claim, release, stale_apps
+from dj_dynamic_templates.models import DjDynamicTemplateSyncGeneration, DjDynamicTemplateSyncLease
+
+TARGET = 'node-1'
+
+
+class ClaimTests(TestCase):
+
+    def setUp(self):
+        DjDynamicTemplateSyncGeneration.bump(['accounts', 'billing'])
+
+    def test_claim_is_exclusive(self):
+        self.assertEqual(claim(['accounts', 'billing'], 'first', TARGET), {'accounts': 1, 'billing': 1})
+        self.assertEqual(claim(['accounts', 'billing'], 'second', TARGET), {})
+        self.assertEqual(claim(['accounts', 'billing'], 'second', TARGET, force=True), {})
+        # Leases are per target.
+        self.assertEqual(claim(['accounts'], 'second', 'node-2'), {'accounts': 1})
+
+    def test_release_records_synced_generation(self):
+        claimed = claim(['accounts', 'billing'], 'first', TARGET)
+        release(claimed, 'first', TARGET)
+        self.assertEqual(stale_apps(['accounts', 'billing'], TARGET), {})
+        self.assertEqual(claim(['accounts', 'billing'], 'second', TARGET), {})
+        self.assertEqual(claim(['accounts'], 'second', TARGET, force=True), {'accounts': 1})
+
+        DjDynamicTemplateSyncGeneration.bump(['billing'])
+        self.assertEqual(stale_apps(['accounts', 'billing'], TARGET), {'billing': (1, 2)})
+        self.assertEqual(claim(['billing'], 'third', TARGET), {'billing': 2})
+
+    def test_failed_sync_releases_without_recording(self):
+        claimed = claim(['accounts'], 'first', TARGET)
+        release(claimed, 'first', TARGET, synced=False)
+        self.assertEqual(stale_apps(['accounts'], TARGET), {'accounts': (0, 1)})
+        self.assertEqual(claim(['accounts'], 'second', TARGET), {'accounts': 1})
+
+    def test_expired_lease_is_taken_over(self):
+        claimed = claim(['accounts'], 'first', TARGET, timeout=60)
+        DjDynamicTemplateSyncLease.objects.filter(target=TARGET, app='accounts').update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(claim(['accounts'], 'second', TARGET), {'accounts': 1})
+        # The first worker finishing late leaves the lease of the second alone.
+        release(claimed, 'first', TARGET)
+        lease = DjDynamicTemplateSyncLease.objects.get(target=TARGET, app='accounts')
+        self.assertEqual((lease.owner, lease.generation), ('second', 0))
@@ -0,0 +1,23 @@
+import os
+import sys
+
+from django.test import SimpleTestCase, override_settings
+
+from dj_dynamic_templates.forms import get_django_apps
+
+
+class DjangoAppsTests(SimpleTestCase):
+
+    def setUp(self):
+        get_django_apps.cache_clear()
+        self.addCleanup(get_django_apps.cache_clear)
+
+    def test_project_apps(self):
+        project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        with override_settings(BASE_DIR=project_dir):
+            self.assertEqual(get_django_apps(), [('dj_dynamic_templates', 'Dj Dynamic Templates')])
+
+    def test_installed_packages_are_left_out(self):
+        # As with a virtualenv inside BASE_DIR, the installed apps lie below it.
+        with override_settings(BASE_DIR=sys.prefix):
+            self.assertEqual(get_django_apps(), [])
@@ -0,0 +1,115 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.admin import site
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from dj_dynamic_templates.models import DjDynamicTemplate, DjDynamicTemplateCategory
+from dj_dynamic_templates.storage import LocalTemplateStorage, get_storage
+
+
+class ListingCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        base_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(base_dir.cleanup)
+        settings = override_settings(BASE_DIR=base_dir.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.storage = LocalTemplateStorage(listing_cache_size=2)
+        self.directories = [self.storage.directory_path('pages', name) for name in ('home', 'blog', 'shop')]
+        for directory in self.directories:
+            self.storage.make_directory(directory)
+        self.storage.write(os.path.join(self.directories[0], 'index.html'), 'Hello')
+        scandir = mock.patch('dj_dynamic_templates.storage.os.scandir', wraps=os.scandir)
+        self.scans = scandir.start()
+        self.addCleanup(scandir.stop)
+
+    def names(self, directory: str) -> list:
+        return [entry.name for entry in self.storage.scandir(directory)]
+
+    def test_unchanged_directory_is_listed_once(self):
+        self.assertEqual(self.names(self.directories[0]), ['index.html'])
+        self.assertEqual(self.names(self.directories[0]), ['index.html'])
+        self.assertEqual(self.scans.call_count, 1)
+
+    def test_created_replaced_and_removed_files_refresh_the_listing(self):
+        home = self.directories[0]
+        self.names(home)
+        self.storage.write(os.path.join(home, 'about.html'), 'About')
+        self.assertEqual(self.names(home), ['about.html', 'index.html'])
+        self.storage.write(os.path.join(home, 'index.html'), 'Hello again')
+        self.assertEqual([entry.size for entry in self.storage.scandir(home)], [5, 11])
+        self.storage.delete(os.path.join(home, 'about.html'))
+        self.assertEqual(self.names(home), ['index.html'])
+        self.assertEqual(self.scans.call_count, 4)
+
+    def test_least_recently_used_listing_is_evicted(self):
+        home, blog, shop = self.directories
+        self.names(home)
+        self.names(blog)
+        self.names(home)
+        self.names(shop)
+        self.assertEqual(list(self.storage.listings), [home, shop])
+        self.names(blog)
+        self.assertEqual(self.scans.call_count, 4)
+
+    def test_cache_can_be_disabled(self):
+        storage = LocalTemplateStorage(listing_cache_size=0)
+        storage.scandir(self.directories[0])
+        storage.scandir(self.directories[0])
+        self.assertEqual((self.scans.call_count, storage.listings), (2, {}))
+
+    def test_missing_directory(self):
+        with self.assertRaises(FileNotFoundError):
+            self.storage.scandir(self.storage.directory_path('pages', 'missing'))
+
+
+class CategoryFilesViewTests(TestCase):
+
+    def setUp(self):
+        get_storage.cache_clear()
+        self.addCleanup(get_storage.cache_clear)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        self.category = DjDynamicTemplateCategory.objects.create(app='pages', name='home')
+        self.category.make_directory()
+        for index in range(5):
+            DjDynamicTemplate.objects.create(category=self.category, template_name=f'page{index}', content='Hello').create_file()
+        for name in ('old.html', 'notes.txt'):
+            get_storage().write(os.path.join(self.category.directory_path, name), 'Orphan')
+        self.url = reverse('admin:dj_dynamic_templates_djdynamictemplatecategory_files', args=[self.category.pk])
+        patcher = mock.patch.object(site._registry[DjDynamicTemplateCategory], 'files_per_page', 3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def listed(self, response) -> list:
+        return [(entry.name, active) for entry, _, active in response.context['files']]
+
+    def test_pages(self):
+        response = self.client.get(self.url, {'p': 2})
+        self.assertEqual(self.listed(response), [('page1.html', True), ('page2.html', True), ('page3.html', True)])
+        self.assertEqual(response.context['page'].paginator.count, 7)
+
+    def test_search_and_status(self):
+        response = self.client.get(self.url, {'q': 'PAGE1'})
+        self.assertEqual(self.listed(response), [('page1.html', True)])
+        response = self.client.get(self.url, {'status': 'orphan'})
+        self.assertEqual(self.listed(response), [('notes.txt', False), ('old.html', False)])
+
+    def test_page_is_matched_in_one_query(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(4):
+            self.client.get(self.url, {'p': 2})
+
+    def test_missing_directory_lists_no_files(self):
+        self.category.remove_directory()
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['page'].paginator.count, 0)
+        self.assertContains(response, 'No files.')
+
+    def test_requires_permission(self):
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
@@ -0,0 +1,109 @@
+import os
+
+from django.conf import settings
+from django.template import Context, Engine, TemplateDoesNotExist, engines
+from django.test import SimpleTestCase, TestCase
+
+from dj_dynamic_templates.bundle import build_bundle
+from dj_dynamic_templates.cache import template_cache
+from dj_dynamic_templates.models import DjDynamicTemplate, DjDynamicTemplateCategory, DjDynamicTemplateSyncGeneration
+
+
+class DatabaseLoaderTests(TestCase):
+
+    def setUp(self):
+        template_cache.clear()
+        self.addCleanup(template_cache.clear)
+
+    def render(self, name: str, context: dict | None = None) -> str:
+        return engines['django'].get_template(name).render(context)
+
+    def test_renders_active_revision(self):
+        category = DjDynamicTemplateCategory.objects.create(app='pages', name='home')
+        with self.captureOnCommitCallbacks(execute=True):
+            template = DjDynamicTemplate.objects.create(category=category, template_name='index', content='Hello {{ name }}')
+        self.assertEqual(self.render('pages/home/index.html', {'name': 'world'}), 'Hello world')
+        with self.captureOnCommitCallbacks(execute=True):
+            template.content = 'Bye {{ name }}'
+            template.save()
+        self.assertEqual(self.render('pages/home/index.html', {'name': 'world'}), 'Bye world')
+
+    def test_missing_template(self):
+        with self.assertRaises(TemplateDoesNotExist):
+            self.render('pages/home/missing.html')
+        with self.assertRaises(TemplateDoesNotExist):
+            self.render('not-a-database-name.html')
+
+    def test_override_extends_file_template_of_same_name(self):
+        name = 'admin/includes/object_delete_summary.html'
+        context = {'model_count': [('users', 2)]}
+        category = DjDynamicTemplateCategory.objects.create(app='admin', name='includes')
+        with self.captureOnCommitCallbacks(execute=True):
+            template = DjDynamicTemplate.objects.create(
+                category=category, template_name='object_delete_summary', content=f"{{% extends '{name}' %}}"
+            )
+        # save() handed its compiled template to the cache the loader reads from.
+        self.assertIn('<li>Users: 2</li>', self.render(name, context))
+
+        template_cache.clear()
+        self.assertIn('<li>Users: 2</li>', template.render(context))
+        self.assertIn('<li>Users: 2</li>', self.render(name, context))
+
+    def test_queryset_delete_invalidates(self):
+        category = DjDynamicTemplateCategory.objects.create(app='pages', name='home')
+        with self.captureOnCommitCallbacks(execute=True):
+            DjDynamicTemplate.objects.create(category=category, template_name='index', content='Hello')
+        self.assertEqual(self.render('pages/home/index.html'), 'Hello')
+        generation = DjDynamicTemplateSyncGeneration.current(['pages'])['pages']
+        with self.captureOnCommitCallbacks(execute=True):
+            DjDynamicTemplate.objects.filter(category=category).delete()
+        self.assertGreater(DjDynamicTemplateSyncGeneration.current(['pages'])['pages'], generation)
+        with self.assertRaises(TemplateDoesNotExist):
+            self.render('pages/home/index.html')
+
+
+class BundleLoaderTests(SimpleTestCase):
+
+    def setUp(self):
+        self.path = os.path.join(settings.BASE_DIR, 'templates.bundle')
+        self.engine = Engine(loaders=[('dj_dynamic_templates.loaders.BundleLoader', self.path)])
+
+    def test_missing_bundle(self):
+        with self.assertRaises(TemplateDoesNotExist):
+            self.engine.get_template('pages/home/index.html')
+
+    def test_serves_bundle(self):
+        with open(self.path, 'wb') as bundle:
+            bundle.write(build_bundle([('pages/home/index.html', 1, 'Hello {{ name }}')]))
+        self.addCleanup(os.remove, self.path)
+        self.assertEqual(self.engine.get_template('pages/home/index.html').render(Context({'name': 'world'})), 'Hello world')
+        with self.assertRaises(TemplateDoesNotExist):
+            self.engine.get_template('pages/home/missing.html')
+
+
+class CachedLoaderTests(TestCase):
+
+    def setUp(self):
+        template_cache.clear()
+        self.addCleanup(template_cache.clear)
+        self.engine = Engine(loaders=[('dj_dynamic_templates.loaders.CachedLoader', [
+            'dj_dynamic_templates.loaders.DatabaseLoader', 'django.template.loaders.app_directories.Loader',
+        ])], app_dirs=False)
+
+    def render(self, name: str) -> str:
+        return self.engine.get_template(name).render(Context({'name': 'world'}))
+
+    def test_picks_up_edits(self):
+        category = DjDynamicTemplateCategory.objects.create(app='pages', name='home')
+        with self.captureOnCommitCallbacks(execute=True):
+            template = DjDynamicTemplate.objects.create(category=category, template_name='index', content='Hello {{ name }}')
+        self.assertEqual(self.render('pages/home/index.html'), 'Hello world')
+        self.assertIs(self.engine.get_template('pages/home/index.html'), self.engine.get_template('pages/home/index.html'))
+        with self.captureOnCommitCallbacks(execute=True):
+            template.content = 'Bye {{ name }}'
+            template.save()
+        self.assertEqual(self.render('pages/home/index.html'), 'Bye world')
+        with self.captureOnCommitCallbacks(execute=True):
+            template.delete()
+        with self.assertRaises(TemplateDoesNotExist):
+            self.render('pages/home/index.html')
@@ -0,0 +1,51 @@
+from django.template import TemplateDoesNotExist
+from django.test import TestCase
+
+from dj_dynamic_templates.mail import MailRenderer, html_to_text
+from dj_dynamic_templates.models import DjDynamicTemplate, DjDynamicTemplateCategory
+
+WELCOME = (
+    '<html><head><title>Welcome, {{ name }}</title><style>p { color: red; }</style></head>'
+    '<body><p>Hello {{ name }} &amp; friends</p>\n\n\n\n<p>Message {{ index }}</p></body></html>'
+)
+
+
+class MailRendererTests(TestCase):
+
+    def setUp(self):
+        category = DjDynamicTemplateCategory.objects.create(app='accounts', name='emails')
+        DjDynamicTemplate.objects.create(category=category, template_name='welcome', content=WELCOME)
+        self.contexts = [{'name': f'User {index}', 'index': index} for index in range(23)]
+
+    def test_render_derives_subject_and_text(self):
+        message = MailRenderer('accounts/emails/welcome.html').render({'name': 'Ada', 'index': 1})
+        self.assertEqual(message.subject, 'Welcome, Ada')
+        self.assertEqual(message.text, 'Hello Ada & friends\n\nMessage 1')
+        self.assertIn('<p>Hello Ada &amp; friends</p>', message.html)
+
+    def test_render_with_subject_and_text_templates(self):
+        renderer = MailRenderer('accounts/emails/welcome.html', subject='Hi   {{ name }}\n', text='Dear {{ name }} & co')
+        message = renderer.render({'name': '<Ada>', 'index': 1})
+        self.assertEqual((message.subject, message.text), ('Hi <Ada>', 'Dear <Ada> & co'))
+
+    def test_missing_template(self):
+        with self.assertRaises(TemplateDoesNotExist):
+            MailRenderer('accounts/emails/missing.html')
+
+    def test_render_many_keeps_order(self):
+        messages = list(MailRenderer('accounts/emails/welcome.html').render_many(iter(self.contexts), chunk_size=5))
+        self.assertEqual([message.context for message in messages], self.contexts)
+        self.assertEqual([message.subject for message in messages], [f'Welcome, User {index}' for index in range(23)])
+
+    def test_render_many_keeps_order_across_process_pool(self):
+        renderer = MailRenderer('accounts/emails/welcome.html', subject='#{{ index }}')
+        expected = [renderer.render(context) for context in self.contexts]
+        messages = list(renderer.render_many(iter(self.contexts), workers=2, chunk_size=3))
+        self.assertEqual(messages, expected)
+
+    def test_build_email(self):
+        renderer = MailRenderer('accounts/emails/welcome.html')
+        email = renderer.build_email(renderer.render({'name': 'Ada', 'index': 1}), to=['ada@example.com'], from_email='no-reply@example.com')
+        self.assertEqual((email.subject, email.to, email.from_email), ('Welcome, Ada', ['ada@example.com'], 'no-reply@example.com'))
+        self.assertEqual(email.body, html_to_text(email.alternatives[0][0]))
+        self.assertEqual(email.alternatives[0][1], 'text/html')
@@ -0,0 +1,121 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from dj_dynamic_templates.metrics import LoggingReporter, NullReporter, PrometheusReporter, get_reporter, measure
+from dj_dynamic_templates.models import DjDynamicTemplate, DjDynamicTemplateCategory
+from dj_dynamic_templates.signals import dynamic_template_rendered, template_file_written, templates_synced
+from dj_dynamic_templates.storage import get_storage
+
+PROMETHEUS = {'BACKEND': 'dj_dynamic_templates.metrics.PrometheusReporter', 'OPTIONS': {'BUCKETS': (0.1, 1)}}
+
+
+class ReporterTests(SimpleTestCase):
+
+    def test_prometheus_render(self):
+        reporter = PrometheusReporter(buckets=(1, 0.1))
+        reporter.increment('sync_files_total', 3, apps='pages', result='written')
+        reporter.increment('sync_files_total', 2, apps='pages', result='written')
+        reporter.observe('render_seconds', 0.05, app='pages')
+        reporter.observe('render_seconds', 0.5, app='pages')
+        reporter.observe('render_seconds', 5, app='pages')
+        self.assertEqual(reporter.render().splitlines(), [
+            '# TYPE dj_dynamic_templates_sync_files_total counter',
+            'dj_dynamic_templates_sync_files_total{apps="pages",result="written"} 5',
+            '# TYPE dj_dynamic_templates_render_seconds histogram',
+            'dj_dynamic_templates_render_seconds_bucket{app="pages",le="0.1"} 1',
+            'dj_dynamic_templates_render_seconds_bucket{app="pages",le="1"} 2',
+            'dj_dynamic_templates_render_seconds_bucket{app="pages",le="+Inf"} 3',
+            'dj_dynamic_templates_render_seconds_sum{app="pages"} 5.55',
+            'dj_dynamic_templates_render_seconds_count{app="pages"} 3',
+        ])
+
+    def test_prometheus_escapes_label_values(self):
+        reporter = PrometheusReporter(namespace='templates')
+        reporter.increment('missing_total', template='a"b\\c\nd')
+        self.assertIn('templates_missing_total{template="a\\"b\\\\c\\nd"} 1', reporter.render())
+
+    def test_logging_reporter(self):
+        reporter = LoggingReporter(level='DEBUG')
+        with self.assertLogs('dj_dynamic_templates.metrics', 'DEBUG') as logs:
+            reporter.increment('sync_files_total', 2, result='written', apps='pages')
+            reporter.observe('render_seconds', 0.25, app='pages')
+        self.assertEqual(logs.output, [
+            'DEBUG:dj_dynamic_templates.metrics:sync_files_total{apps="pages",result="written"} +2',
+            'DEBUG:dj_dynamic_templates.metrics:render_seconds{app="pages"} 0.250000',
+        ])
+
+    def test_get_reporter_from_settings(self):
+        self.assertIsInstance(get_reporter(), NullReporter)
+        with override_settings(DJ_DYNAMIC_TEMPLATES_METRICS=PROMETHEUS):
+            reporter = get_reporter()
+            self.assertIsInstance(reporter, PrometheusReporter)
+            self.assertEqual(reporter.buckets, (0.1, 1))
+            self.assertIs(get_reporter(), reporter)
+        self.assertIsInstance(get_reporter(), NullReporter)
+
+
+@override_settings(DJ_DYNAMIC_TEMPLATES_METRICS=PROMETHEUS)
+class InstrumentationTests(TestCase):
+
+    def setUp(self):
+        get_storage.cache_clear()
+        self.addCleanup(get_storage.cache_clear)
+        get_reporter.cache_clear()
+        self.addCleanup(get_reporter.cache_clear)
+        self.reporter = get_reporter()
+        self.category = DjDynamicTemplateCategory.objects.create(app='pages', name='home')
+        self.template = DjDynamicTemplate.objects.create(category=self.category, template_name='index', content='Hello')
+
+    def connect(self, signal) -> list:
+        received = []
+
+        def handler(sender, **kwargs):
+            received.append(kwargs)
+        signal.connect(handler)
+        self.addCleanup(signal.disconnect, handler)
+        return received
+
+    def test_measure_counts_queries(self):
+        with measure('lookup', app='pages'):
+            list(DjDynamicTemplate.objects.all())
+            list(DjDynamicTemplateCategory.objects.all())
+        self.assertEqual(self.reporter.counters[('lookup_queries_total', (('app', 'pages'),))], 2)
+        self.assertEqual(self.reporter.histograms[('lookup_seconds', (('app', 'pages'),))]['count'], 1)
+
+    def test_measure_is_a_no_op_when_disabled(self):
+        with override_settings(DJ_DYNAMIC_TEMPLATES_METRICS=None), self.assertNumQueries(1), measure('lookup'):
+            list(DjDynamicTemplate.objects.all())
+        self.assertEqual((self.reporter.counters, self.reporter.histograms), ({}, {}))
+
+    def test_render_reports_and_signals(self):
+        received = self.connect(dynamic_template_rendered)
+        self.assertEqual(self.template.render(), 'Hello')
+        self.assertEqual([kwargs['instance'] for kwargs in received], [self.template])
+        self.assertEqual(self.reporter.histograms[('render_seconds', (('app', 'pages'),))]['count'], 1)
+
+    def test_sync_reports_and_signals(self):
+        written = self.connect(template_file_written)
+        synced = self.connect(templates_synced)
+        call_command('sync_templates', '--app', 'pages', stdout=StringIO())
+        self.assertEqual([kwargs['instance'].pk for kwargs in written], [self.template.pk])
+        self.assertEqual(len(synced), 1)
+        self.assertEqual(synced[0]['apps'], ['pages'])
+        self.assertEqual(synced[0]['counts'], {'written': 1, 'skipped': 0, 'removed': 0, 'failed': 0})
+        self.assertEqual(self.reporter.counters[('sync_files_total', (('apps', 'pages'), ('result', 'written')))], 1)
+        self.assertEqual(self.reporter.histograms[('file_write_seconds', (('app', 'pages'),))]['count'], 1)
+
+    def test_metrics_view(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        self.template.render()
+        response = self.client.get('/admin/dj_dynamic_templates/djdynamictemplate/metrics/')
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        self.assertContains(response, 'dj_dynamic_templates_render_seconds_count{app="pages"} 1')
+        with override_settings(DJ_DYNAMIC_TEMPLATES_METRICS=None):
+            self.assertEqual(self.client.get('/admin/dj_dynamic_templates/djdynamictemplate/metrics/').status_code, 404)
+
+    def test_metrics_view_requires_staff(self):
+        response = self.client.get('/admin/dj_dynamic_templates/djdynamictemplate/metrics/')
+        self.assertEqual(response.status_code, 302)
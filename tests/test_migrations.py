@@ -0,0 +1,29 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.db import connection
+from django.test import TestCase
+
+from dj_dynamic_templates.models import DjDynamicTemplate, DjDynamicTemplateCategory
+
+backfill_lineage = import_module('dj_dynamic_templates.migrations.0004_template_lineage').backfill_lineage
+
+
+class BackfillLineageTests(TestCase):
+
+    def test_branched_revisions(self):
+        category = DjDynamicTemplateCategory.objects.create(app='pages', name='home')
+        root = DjDynamicTemplate.objects.create(category=category, template_name='index', content='a', template_is_active=False)
+        first = DjDynamicTemplate.objects.create(category=category, template_name='index', content='b', revision_of=root, template_is_active=False)
+        second = DjDynamicTemplate.objects.create(category=category, template_name='index', content='c', revision_of=root, template_is_active=False)
+        last = DjDynamicTemplate.objects.create(category=category, template_name='index', content='d', revision_of=first)
+        other = DjDynamicTemplate.objects.create(category=category, template_name='other', content='e')
+
+        backfill_lineage(apps, SimpleNamespace(connection=connection))
+
+        rows = dict(DjDynamicTemplate.objects.values_list('pk', 'lineage'))
+        revisions = dict(DjDynamicTemplate.objects.values_list('pk', 'revision'))
+        self.assertEqual(len({rows[root.pk], rows[first.pk], rows[second.pk], rows[last.pk]}), 1)
+        self.assertNotEqual(rows[other.pk], rows[root.pk])
+        self.assertEqual([revisions[template.pk] for template in (root, first, second, last, other)], [1, 2, 3, 4, 1])
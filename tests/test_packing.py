@@ -0,0 +1,92 @@
+from django.test import SimpleTestCase, TestCase
+
+from dj_dynamic_templates.models import DjDynamicTemplate, DjDynamicTemplateCategory
+from dj_dynamic_templates.packing import COMPRESSED, DELTA, PLAIN, pack, unpack
+from dj_dynamic_templates.storage import get_storage
+
+BASE = ''.join(f'<p>{{{{ line{number} }}}} – paragraph {number}</p>\n' for number in range(100))
+
+
+class PackTests(SimpleTestCase):
+
+    def test_round_trip(self):
+        for content in ['', 'no newline', 'é ü – 漢字\n', BASE]:
+            with self.subTest(content=content[:20]):
+                encoding, payload = pack(content)
+                self.assertEqual(encoding, COMPRESSED)
+                self.assertEqual(unpack(encoding, payload), content)
+
+    def test_delta_round_trip(self):
+        for content in [BASE.replace('paragraph 50', 'line 50'), BASE + 'last line without newline', BASE[:len(BASE) // 2]]:
+            with self.subTest(content=content[-20:]):
+                encoding, payload = pack(content, BASE)
+                self.assertEqual(encoding, DELTA)
+                self.assertEqual(unpack(encoding, payload, BASE), content)
+
+    def test_unrelated_content_is_not_a_delta(self):
+        encoding, payload = pack('something else entirely\n', BASE)
+        self.assertEqual(encoding, COMPRESSED)
+        self.assertEqual(unpack(encoding, payload), 'something else entirely\n')
+
+    def test_delta_needs_base(self):
+        encoding, payload = pack(BASE + 'more\n', BASE)
+        with self.assertRaises(ValueError):
+            unpack(encoding, payload)
+
+
+class RevisionPackingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = DjDynamicTemplateCategory.objects.create(app='pages', name='packing')
+
+    def setUp(self):
+        get_storage.cache_clear()
+        self.addCleanup(get_storage.cache_clear)
+        self.category.make_directory()
+        self.revisions = [DjDynamicTemplate.objects.create(category=self.category, template_name='index', content=BASE)]
+        for number in range(1, 4):
+            self.revise(BASE.replace(f'paragraph {number}<', f'changed {number}<'))
+
+    def revise(self, content: str) -> DjDynamicTemplate:
+        previous = self.revisions[-1]
+        previous.template_is_active = False
+        previous.save()
+        revision = DjDynamicTemplate.objects.create(category=self.category, template_name='index', content=content, revision_of=previous)
+        self.revisions.append(revision)
+        return revision
+
+    def stored(self, revision: DjDynamicTemplate) -> DjDynamicTemplate:
+        return DjDynamicTemplate.objects.get(pk=revision.pk)
+
+    def test_inactive_revisions_are_packed(self):
+        encodings = [self.stored(revision).content_encoding for revision in self.revisions]
+        self.assertEqual(encodings, [COMPRESSED, DELTA, DELTA, PLAIN])
+        for revision in self.revisions:
+            stored = self.stored(revision)
+            self.assertEqual(stored.content is None, stored.content_encoding != PLAIN)
+            self.assertEqual(stored.unpack_content(), revision.content)
+
+    def test_delete_delta_base(self):
+        self.stored(self.revisions[1]).delete()
+        stored = self.stored(self.revisions[2])
+        self.assertNotEqual(stored.content_base_id, self.revisions[1].pk)
+        self.assertEqual(stored.unpack_content(), self.revisions[2].content)
+
+    def test_bulk_delete_delta_bases(self):
+        DjDynamicTemplate.objects.filter(pk__in=[self.revisions[0].pk, self.revisions[1].pk]).delete()
+        self.assertEqual(self.stored(self.revisions[2]).unpack_content(), self.revisions[2].content)
+
+    def test_rollback(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            restored = self.stored(self.revisions[1]).rollback()
+        self.assertTrue(restored.template_is_active)
+        self.assertTrue(restored.is_file_synced)
+        active = DjDynamicTemplate.objects.get(lineage=restored.lineage, template_is_active=True)
+        self.assertEqual(active.pk, self.revisions[1].pk)
+        self.assertEqual(active.content_encoding, PLAIN)
+        self.assertEqual(active.content, self.revisions[1].content)
+        replaced = self.stored(self.revisions[-1])
+        self.assertFalse(replaced.template_is_active)
+        self.assertEqual(replaced.unpack_content(), self.revisions[-1].content)
+        self.assertEqual([self.stored(revision).unpack_content() for revision in self.revisions], [revision.content for revision in self.revisions])
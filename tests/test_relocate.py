@@ -0,0 +1,63 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from dj_dynamic_templates.models import DjDynamicTemplate, DjDynamicTemplateCategory
+from dj_dynamic_templates.relocate import relocate_categories
+from dj_dynamic_templates.storage import get_storage
+
+
+class RelocateTests(TestCase):
+
+    def setUp(self):
+        get_storage.cache_clear()
+        self.addCleanup(get_storage.cache_clear)
+        self.storage = get_storage()
+        self.categories = []
+        for name in ('home', 'blog'):
+            category = DjDynamicTemplateCategory.objects.create(app='pages', name=name)
+            category.make_directory()
+            DjDynamicTemplate.objects.create(category=category, template_name='index', content=name).create_file()
+            self.categories.append(category)
+
+    def stored(self, category: DjDynamicTemplateCategory) -> tuple:
+        return DjDynamicTemplateCategory.objects.values_list('app', 'name').get(pk=category.pk)
+
+    def test_moves_directories(self):
+        home, blog = self.categories
+        with self.captureOnCommitCallbacks(execute=True):
+            relocation = relocate_categories([(home, 'shop', 'home'), (blog, 'shop', 'news')])
+        self.assertTrue(relocation.done)
+        self.assertCountEqual(relocation.moved, [home, blog])
+        self.assertEqual([self.stored(home), self.stored(blog)], [('shop', 'home'), ('shop', 'news')])
+        self.assertEqual(self.storage.read(f'{self.storage.directory_path("shop", "news")}/index.html'), b'blog')
+        self.assertFalse(self.storage.exists(self.storage.directory_path('pages', 'blog')))
+
+    def test_existing_destination_changes_nothing(self):
+        home, blog = self.categories
+        self.storage.make_directory(self.storage.directory_path('shop', 'news'))
+        with self.assertRaises(FileExistsError):
+            relocate_categories([(home, 'shop', 'home'), (blog, 'shop', 'news')])
+        self.assertEqual([(home.app, home.name), (blog.app, blog.name)], [('pages', 'home'), ('pages', 'blog')])
+        self.assertEqual([self.stored(home), self.stored(blog)], [('pages', 'home'), ('pages', 'blog')])
+        self.assertTrue(self.storage.exists(self.storage.directory_path('pages', 'home')))
+
+    def test_failed_move_is_reverted(self):
+        home, blog = self.categories
+        rename = self.storage.rename
+        blog_path = self.storage.directory_path('pages', 'blog')
+
+        def failing_rename(old_path, new_path):
+            if old_path == blog_path:
+                raise PermissionError(old_path)
+            rename(old_path, new_path)
+
+        with mock.patch.object(self.storage, 'rename', failing_rename), self.captureOnCommitCallbacks(execute=True):
+            relocation = relocate_categories([(home, 'shop', 'home'), (blog, 'shop', 'blog')])
+        self.assertEqual(relocation.moved, [home])
+        self.assertEqual([category for category, _ in relocation.failed], [blog])
+        self.assertIsInstance(relocation.failed[0][1], PermissionError)
+        self.assertEqual([self.stored(home), self.stored(blog)], [('shop', 'home'), ('pages', 'blog')])
+        self.assertEqual((blog.app, blog.name), ('pages', 'blog'))
+        self.assertEqual(self.storage.read(f'{blog_path}/index.html'), b'blog')
+        self.assertFalse(self.storage.exists(self.storage.directory_path('shop', 'blog')))
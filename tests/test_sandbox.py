@@ -0,0 +1,57 @@
+from django.test import TestCase
+
+from dj_dynamic_templates.models import DjDynamicTemplate, DjDynamicTemplateCategory
+from dj_dynamic_templates.sandbox import RenderLimits, RenderProfile, TemplateLimitExceeded
+
+
+class SandboxTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = DjDynamicTemplateCategory.objects.create(app='pages', name='sandbox')
+
+    def template(self, name: str, content: str) -> DjDynamicTemplate:
+        return DjDynamicTemplate.objects.create(category=self.category, template_name=name, content=content)
+
+    def test_renders_like_render(self):
+        template = self.template('list', '<ul>{% for item in items %}<li>{{ item }}</li>{% endfor %}</ul>')
+        context = {'items': range(5)}
+        self.assertEqual(template.render_sandboxed(context), template.render(context))
+
+    def test_text_only_loop_counts_iterations(self):
+        template = self.template('text', '{% for i in items %}<p>static text</p>{% endfor %}')
+        with self.assertRaises(TemplateLimitExceeded) as raised:
+            template.render_sandboxed({'items': range(100_000)}, limits=RenderLimits(0, 0, 100, 0))
+        self.assertEqual(raised.exception.limit, 'iterations')
+
+    def test_text_only_loop_counts_output(self):
+        template = self.template('text', '{% for i in items %}<p>static text</p>{% endfor %}')
+        with self.assertRaises(TemplateLimitExceeded) as raised:
+            template.render_sandboxed({'items': range(100_000)}, limits=RenderLimits(0, 1000, 0, 0))
+        self.assertEqual(raised.exception.limit, 'output')
+
+    def test_include_depth(self):
+        template = self.template('recursive', "x{% include 'pages/sandbox/recursive.html' %}")
+        with self.assertRaises(TemplateLimitExceeded) as raised:
+            template.render_sandboxed(limits=RenderLimits(0, 0, 0, 5))
+        self.assertEqual(raised.exception.limit, 'include_depth')
+
+    def test_timeout(self):
+        template = self.template('slow', '{% for i in items %}{% for j in items %}{{ j }}{% endfor %}{% endfor %}')
+        with self.assertRaises(TemplateLimitExceeded) as raised:
+            template.render_sandboxed({'items': range(10_000)}, limits=RenderLimits(0.01, 0, 0, 0))
+        self.assertEqual(raised.exception.limit, 'timeout')
+
+    def test_plain_render_is_not_limited(self):
+        template = self.template('text', '{% for i in items %}<p>static text</p>{% endfor %}')
+        template.render_sandboxed(limits=RenderLimits(0, 0, 0, 0))
+        self.assertEqual(len(template.render({'items': range(1000)})), 18_000)
+
+    def test_profile(self):
+        template = self.template('profiled', '{% for i in items %}<b>{{ i }}</b>{% endfor %}')
+        profile = RenderProfile()
+        template.render_sandboxed({'items': range(10)}, profile=profile)
+        entries = {entry.node: entry for entry in profile.slowest(10)}
+        self.assertEqual(entries['{{ i }}'].calls, 10)
+        self.assertEqual(entries['text'].calls, 20)
+        self.assertEqual(entries['{% for i in items %}'].calls, 1)
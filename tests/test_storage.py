@@ -0,0 +1,97 @@
+import os
+import tempfile
+
+from django.apps import apps
+from django.test import SimpleTestCase, override_settings
+
+from dj_dynamic_templates.forms import get_django_apps
+from dj_dynamic_templates.storage import FileStat, InMemoryTemplateStorage, LocalTemplateStorage
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LocalTemplateStorageTests(SimpleTestCase):
+
+    def setUp(self):
+        get_django_apps.cache_clear()
+        self.addCleanup(get_django_apps.cache_clear)
+
+    @override_settings(BASE_DIR=PROJECT_DIR)
+    def test_project_app_path(self):
+        storage = LocalTemplateStorage()
+        self.assertEqual(storage.app_path('dj_dynamic_templates'), apps.get_app_config('dj_dynamic_templates').path)
+        self.assertEqual(storage.directory_path('pages', 'home'), os.path.join(PROJECT_DIR, 'pages', 'templates', 'home'))
+
+    @override_settings(BASE_DIR=PROJECT_DIR)
+    def test_installed_package_is_not_an_app_path(self):
+        self.assertEqual(LocalTemplateStorage().app_path('admin'), os.path.join(PROJECT_DIR, 'admin'))
+
+
+class BatchOperationMixin:
+
+    def make_storage(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.storage = self.make_storage()
+        self.directory = self.storage.directory_path('pages', 'home')
+        self.storage.make_directory(self.directory, exists_ok=True)
+        self.paths = [self.storage.file_path('pages', 'home', f'page{index}') for index in range(4)]
+
+    def test_write_many(self):
+        self.assertEqual(self.storage.write_many({path: f'<p>{path}</p>' for path in self.paths}), {})
+        for path in self.paths:
+            self.assertEqual(self.storage.read(path), f'<p>{path}</p>'.encode())
+
+    def test_write_many_reports_failures_by_path(self):
+        missing = self.storage.file_path('pages', 'missing', 'page')
+        errors = self.storage.write_many({self.paths[0]: 'Hello', missing: 'Hello'})
+        self.assertEqual(list(errors), [missing])
+        self.assertIsInstance(errors[missing], OSError)
+        self.assertEqual(self.storage.read(self.paths[0]), b'Hello')
+
+    def test_delete_many(self):
+        self.storage.write_many({path: 'Hello' for path in self.paths[:2]})
+        self.assertEqual(self.storage.delete_many(self.paths), {})
+        self.assertFalse(any(self.storage.exists(path) for path in self.paths))
+
+    def test_stat_many(self):
+        self.storage.write(self.paths[0], 'Hello')
+        stats = self.storage.stat_many(self.paths[:2])
+        self.assertIsInstance(stats[self.paths[0]], FileStat)
+        self.assertEqual(stats[self.paths[0]].size, 5)
+        self.assertIsNone(stats[self.paths[1]])
+
+    def test_listdir_many(self):
+        self.storage.write_many({path: 'Hello' for path in self.paths[:2]})
+        missing = self.storage.directory_path('pages', 'missing')
+        listings = self.storage.listdir_many([self.directory, missing])
+        self.assertEqual(sorted(listings[self.directory]), ['page0.html', 'page1.html'])
+        self.assertEqual(listings[missing], [])
+
+    def test_map_splits_results_and_errors(self):
+        def func(item):
+            if item % 2:
+                raise ValueError(item)
+            return item * 10
+
+        results, errors = self.storage.map(func, list(range(5)))
+        self.assertEqual(results, {0: 0, 2: 20, 4: 40})
+        self.assertEqual({item: str(error) for item, error in errors.items()}, {1: '1', 3: '3'})
+
+
+class InMemoryBatchOperationTests(BatchOperationMixin, SimpleTestCase):
+
+    def make_storage(self):
+        return InMemoryTemplateStorage(workers=2)
+
+
+class LocalBatchOperationTests(BatchOperationMixin, SimpleTestCase):
+
+    def make_storage(self):
+        base_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(base_dir.cleanup)
+        settings = override_settings(BASE_DIR=base_dir.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        return LocalTemplateStorage(workers=2)
@@ -0,0 +1,92 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from dj_dynamic_templates.models import DjDynamicTemplate, DjDynamicTemplateCategory
+from dj_dynamic_templates.storage import get_storage
+
+
+class SyncStateTests(TestCase):
+
+    def setUp(self):
+        get_storage.cache_clear()
+        self.addCleanup(get_storage.cache_clear)
+        self.storage = get_storage()
+        self.category = DjDynamicTemplateCategory.objects.create(app='pages', name='home')
+        self.category.make_directory()
+        DjDynamicTemplateCategory.save_sync_state([self.category])
+        self.template = DjDynamicTemplate.objects.create(category=self.category, template_name='index', content='Hello')
+
+    def stored(self) -> DjDynamicTemplate:
+        return DjDynamicTemplate.objects.select_related('category').get(pk=self.template.pk)
+
+    def verify(self) -> str:
+        return call_command('verify_templates', '--app', 'pages', stdout=StringIO())
+
+    def test_status_follows_file_operations(self):
+        self.assertEqual(self.stored().sync_status, 'Not Verified')
+        self.template.create_file()
+        DjDynamicTemplate.save_sync_state([self.template])
+        self.assertEqual(self.stored().sync_status, 'Synced')
+
+        self.template.content = 'Bye'
+        self.template.save()
+        self.assertEqual(self.stored().sync_status, 'Not Synced')
+
+        self.template.delete_file()
+        DjDynamicTemplate.save_sync_state([self.template])
+        self.assertEqual(self.stored().sync_status, 'File Does Not Exists')
+
+        self.category.remove_directory()
+        DjDynamicTemplateCategory.save_sync_state([self.category])
+        self.assertEqual(self.stored().sync_status, 'Directory Does Not Exists')
+
+        self.template.template_is_active = False
+        self.template.save()
+        self.assertEqual(self.stored().sync_status, 'Inactive')
+
+    def test_status_reads_no_files(self):
+        self.template.create_file()
+        DjDynamicTemplate.save_sync_state([self.template])
+        template = self.stored()
+        with mock.patch.object(self.storage, 'stat', side_effect=AssertionError), \
+                mock.patch.object(self.storage, 'digest', side_effect=AssertionError):
+            self.assertEqual(template.sync_status, 'Synced')
+
+    def test_verify_picks_up_changes_on_disk(self):
+        self.template.create_file()
+        DjDynamicTemplate.save_sync_state([self.template])
+        self.assertEqual(self.verify(), '1 Synced')
+
+        self.storage.write(self.template.file_path, 'Edited on disk')
+        self.assertEqual(self.verify(), '1 Not Synced')
+        self.assertEqual(self.stored().sync_status, 'Not Synced')
+
+        self.storage.delete(self.template.file_path)
+        self.assertEqual(self.verify(), '1 File Does Not Exists')
+
+        self.storage.remove_directory(self.category.directory_path)
+        self.assertEqual(self.verify(), '1 Directory Does Not Exists')
+
+    def test_verify_hashes_only_changed_files(self):
+        self.template.create_file()
+        DjDynamicTemplate.save_sync_state([self.template])
+        with mock.patch.object(self.storage, 'digest', wraps=self.storage.digest) as digest:
+            self.verify()
+            digest.assert_not_called()
+            self.storage.write(self.template.file_path, 'Edited')
+            self.verify()
+            digest.assert_called_once_with(self.template.file_path)
+
+    def test_changelist_status_column_reads_no_files(self):
+        self.template.create_file()
+        DjDynamicTemplate.save_sync_state([self.template])
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        with mock.patch.object(self.storage, 'stat', side_effect=AssertionError), \
+                mock.patch.object(self.storage, 'digest', side_effect=AssertionError), \
+                mock.patch.object(self.storage, 'read', side_effect=AssertionError):
+            response = self.client.get('/admin/dj_dynamic_templates/djdynamictemplate/')
+        self.assertContains(response, 'Synced')
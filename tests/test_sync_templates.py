@@ -0,0 +1,131 @@
+import os
+import shutil
+import stat
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+
+from dj_dynamic_templates.coordination import claim, sync_target
+from dj_dynamic_templates.models import DjDynamicTemplate, DjDynamicTemplateCategory
+from dj_dynamic_templates.signals import templates_synced
+from dj_dynamic_templates.storage import atomic_write, get_storage
+
+
+class SyncTemplatesTests(TestCase):
+
+    def setUp(self):
+        get_storage.cache_clear()
+        self.addCleanup(get_storage.cache_clear)
+        self.storage = get_storage()
+        self.templates = {}
+        for name in ('home', 'blog'):
+            category = DjDynamicTemplateCategory.objects.create(app='pages', name=name)
+            self.templates[name] = DjDynamicTemplate.objects.create(category=category, template_name='index', content=name)
+
+    def sync(self, *args) -> tuple[str, str]:
+        stdout, stderr = StringIO(), StringIO()
+        call_command('sync_templates', '--app', 'pages', *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_writes_and_skips(self):
+        stdout, _ = self.sync()
+        self.assertIn('2 written, 0 skipped, 0 removed', stdout)
+        self.assertEqual(self.storage.read(self.templates['blog'].file_path), b'blog')
+        stdout, _ = self.sync()
+        self.assertIn('0 written, 2 skipped, 0 removed', stdout)
+
+    def test_failed_directory_is_reported(self):
+        make_directory = self.storage.make_directory
+        blog_path = self.templates['blog'].category.directory_path
+
+        def failing_make_directory(path, exists_ok=False):
+            if path == blog_path:
+                raise PermissionError(path)
+            return make_directory(path, exists_ok)
+
+        stderr = StringIO()
+        with mock.patch.object(self.storage, 'make_directory', failing_make_directory):
+            with self.assertRaisesMessage(CommandError, '1 templates or category directories failed to sync (1 written'):
+                call_command('sync_templates', '--app', 'pages', stdout=StringIO(), stderr=stderr)
+        self.assertIn("Failed to create the directory 'blog' of app 'pages'", stderr.getvalue())
+        self.assertEqual(self.storage.read(self.templates['home'].file_path), b'home')
+        self.assertFalse(self.storage.exists(self.templates['blog'].file_path))
+
+    def test_failed_write_is_reported(self):
+        write = self.storage.write
+
+        def failing_write(path, content):
+            if path == self.templates['blog'].file_path:
+                raise OSError('No space left on device')
+            write(path, content)
+
+        stderr = StringIO()
+        with mock.patch.object(self.storage, 'write', failing_write):
+            with self.assertRaisesMessage(CommandError, '1 templates or category directories failed to sync (1 written'):
+                call_command('sync_templates', '--app', 'pages', '--workers', '2', stdout=StringIO(), stderr=stderr)
+        self.assertIn("Failed to sync template 'index' in the directory 'blog' of app 'pages': No space left on device", stderr.getvalue())
+        self.assertEqual(DjDynamicTemplate.objects.get(pk=self.templates['home'].pk).synced_hash, self.templates['home'].content_hash)
+        self.assertEqual(DjDynamicTemplate.objects.get(pk=self.templates['blog'].pk).synced_hash, '')
+
+    def test_invalid_workers(self):
+        with self.assertRaises(CommandError):
+            self.sync('--workers', '0')
+
+    def test_missing_directory_is_not_counted_as_written(self):
+        # The directory disappears after make_directories created it.
+        with mock.patch.object(DjDynamicTemplateCategory, 'is_directory_exists', False):
+            with self.assertRaisesMessage(CommandError, '2 templates or category directories failed to sync (0 written'):
+                self.sync()
+        self.assertFalse(DjDynamicTemplate.objects.exclude(synced_hash='').exists())
+
+    def test_coordinated_sync_reports_claimed_apps(self):
+        category = DjDynamicTemplateCategory.objects.create(app='shop', name='home')
+        DjDynamicTemplate.objects.create(category=category, template_name='index', content='shop')
+        claim(['shop'], 'another worker', sync_target())
+        received = []
+
+        def receiver(sender, apps, counts, **kwargs):
+            received.append((apps, counts))
+
+        templates_synced.connect(receiver)
+        self.addCleanup(templates_synced.disconnect, receiver)
+        stdout = StringIO()
+        call_command('sync_templates', '--app', 'pages', 'shop', '--coordinate', stdout=stdout, stderr=StringIO())
+        self.assertIn('leased by another worker: shop', stdout.getvalue())
+        self.assertEqual(received, [(['pages'], {'written': 2, 'skipped': 0, 'removed': 0, 'failed': 0})])
+        self.assertFalse(self.storage.exists(DjDynamicTemplate.objects.get(category=category).file_path))
+
+
+class AtomicWriteTests(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'index.html')
+
+    def test_replaces_file_and_keeps_its_mode(self):
+        atomic_write(self.path, 'old')
+        os.chmod(self.path, 0o600)
+        atomic_write(self.path, 'new – ü', fsync=True)
+        with open(self.path, encoding='utf-8') as file:
+            self.assertEqual(file.read(), 'new – ü')
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+        self.assertEqual(os.listdir(self.directory), ['index.html'])
+
+    def test_writes_bytes_with_default_mode(self):
+        atomic_write(self.path, b'\x00bytes')
+        with open(self.path, 'rb') as file:
+            self.assertEqual(file.read(), b'\x00bytes')
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o644)
+
+    def test_failure_leaves_old_file(self):
+        atomic_write(self.path, 'old')
+        with mock.patch('dj_dynamic_templates.storage.os.replace', side_effect=OSError('rename failed')):
+            with self.assertRaises(OSError):
+                atomic_write(self.path, 'new')
+        with open(self.path, encoding='utf-8') as file:
+            self.assertEqual(file.read(), 'old')
+        self.assertEqual(os.listdir(self.directory), ['index.html'])
@@ -0,0 +1,116 @@
+import json
+import os
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from dj_dynamic_templates.models import DjDynamicTemplate, DjDynamicTemplateCategory
+from dj_dynamic_templates.packing import COMPRESSED, PLAIN
+from dj_dynamic_templates.transfer import dump_templates, load_templates
+
+
+def jsonl(*records) -> StringIO:
+    return StringIO(''.join(json.dumps(record) + '\n' for record in records))
+
+
+def template_record(name: str, content: str) -> dict:
+    return {'type': 'template', 'app': 'pages', 'category': 'home', 'template_name': name, 'content': content}
+
+
+class LoadTemplatesTests(TestCase):
+
+    def test_replaced_revision_is_packed(self):
+        load_templates(jsonl(template_record('index', 'Hello')))
+        counts = load_templates(jsonl(template_record('index', 'Bye')))
+        self.assertEqual((counts['created'], counts['updated']), (0, 1))
+        replaced, active = DjDynamicTemplate.objects.order_by('revision')
+        self.assertEqual((replaced.template_is_active, replaced.content, replaced.content_encoding), (False, None, COMPRESSED))
+        self.assertEqual(replaced.unpack_content(), 'Hello')
+        self.assertEqual((active.content, active.content_encoding, active.revision_of_id), ('Bye', PLAIN, replaced.pk))
+
+    def test_invalid_templates_are_rejected(self):
+        load_templates(jsonl(template_record('index', 'Hello')))
+        errors = []
+        counts = load_templates(jsonl(
+            template_record('index', '{% if %}'), template_record('broken', '{% for %}'), template_record('other', 'Fine'),
+        ), errors=errors)
+        self.assertEqual((counts['invalid'], counts['created'], counts['updated']), (2, 1, 0))
+        self.assertEqual([name for name, _ in errors], ['pages/home/index.html', 'pages/home/broken.html'])
+        active = DjDynamicTemplate.objects.filter(template_is_active=True)
+        self.assertEqual(sorted(active.values_list('template_name', 'content')), [('index', 'Hello'), ('other', 'Fine')])
+        self.assertFalse(active.filter(compiled_hash='').exists())
+
+    def test_command_fails_on_invalid_templates(self):
+        path = self.write_file(template_record('index', '{% if %}'), template_record('other', 'Fine'))
+        stderr = StringIO()
+        with self.assertRaisesMessage(CommandError, '1 templates do not compile and were not loaded (loaded 1 categories: 1 templates created'):
+            call_command('load_templates', path, stderr=stderr)
+        self.assertIn("Rejected template 'pages/home/index.html'", stderr.getvalue())
+        self.assertTrue(DjDynamicTemplateCategory.objects.filter(app='pages', name='home').exists())
+
+    def write_file(self, *records) -> str:
+        path = os.path.join(settings.BASE_DIR, 'templates.jsonl')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(jsonl(*records).getvalue())
+        self.addCleanup(os.remove, path)
+        return path
+
+
+class DumpLoadRoundTripTests(TestCase):
+
+    def setUp(self):
+        home = DjDynamicTemplateCategory.objects.create(app='pages', name='home', description='Landing pages')
+        mail = DjDynamicTemplateCategory.objects.create(app='mail', name='welcome')
+        index = DjDynamicTemplate.objects.create(category=home, template_name='index', content='Hello')
+        DjDynamicTemplate.objects.create(category=home, template_name='about', content='Über uns')
+        DjDynamicTemplate.objects.create(category=mail, template_name='body', content='Welcome')
+        index.template_is_active = False
+        index.save()
+        DjDynamicTemplate.objects.create(category=home, template_name='index', content='Hello {{ name }}', revision_of=index)
+
+    @staticmethod
+    def catalog() -> tuple:
+        return (
+            sorted(DjDynamicTemplateCategory.objects.values_list('app', 'name', 'description')),
+            sorted(DjDynamicTemplate.objects.filter(template_is_active=True).values_list(
+                'category__app', 'category__name', 'template_name', 'content', 'content_hash',
+            )),
+        )
+
+    def dump(self, **kwargs) -> StringIO:
+        file = StringIO()
+        dump_templates(file, **kwargs)
+        file.seek(0)
+        return file
+
+    def test_round_trip_into_empty_database(self):
+        expected = self.catalog()
+        file = self.dump(chunk_size=2)
+        DjDynamicTemplate.objects.all().delete()
+        DjDynamicTemplateCategory.objects.all().delete()
+        counts = load_templates(file, batch_size=2)
+        self.assertEqual((counts['categories'], counts['created'], counts['updated'], counts['skipped']), (2, 3, 0, 0))
+        self.assertEqual(self.catalog(), expected)
+
+    def test_reload_skips_unchanged_templates(self):
+        revisions = DjDynamicTemplate.objects.count()
+        counts = load_templates(self.dump())
+        self.assertEqual((counts['created'], counts['updated'], counts['skipped']), (0, 0, 3))
+        self.assertEqual(DjDynamicTemplate.objects.count(), revisions)
+
+    def test_dump_filters_apps(self):
+        records = [json.loads(line) for line in self.dump(apps=['mail'])]
+        self.assertEqual([(record['type'], record['app']) for record in records], [('category', 'mail'), ('template', 'mail')])
+
+    def test_gzip_round_trip_through_commands(self):
+        expected = self.catalog()
+        path = os.path.join(settings.BASE_DIR, 'templates.jsonl.gz')
+        self.addCleanup(os.remove, path)
+        call_command('dump_templates', path, stderr=StringIO())
+        DjDynamicTemplate.objects.all().delete()
+        DjDynamicTemplateCategory.objects.all().delete()
+        result = call_command('load_templates', path, stdout=StringIO())
+        self.assertEqual(result, 'Loaded 2 categories: 3 templates created, 0 updated, 0 skipped')
+        self.assertEqual(self.catalog(), expected)
@@ -0,0 +1,93 @@
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import AnonymousUser, Permission, User
+from django.core.exceptions import PermissionDenied
+from django.test import AsyncRequestFactory, TestCase
+
+from dj_dynamic_templates.cache import template_cache
+from dj_dynamic_templates.models import DjDynamicTemplate, DjDynamicTemplateCategory
+
+
+class TemplateViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = User.objects.create_superuser('admin', 'admin@example.com', 'admin')
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'staff', is_staff=True)
+        category = DjDynamicTemplateCategory.objects.create(app='pages', name='home')
+        cls.base = DjDynamicTemplate.objects.create(category=category, template_name='base', content='<h1>{% block title %}{% endblock %}</h1>')
+        cls.page = DjDynamicTemplate.objects.create(
+            category=category, template_name='index', content="{% extends 'pages/home/base.html' %}{% block title %}Hello{% endblock %}"
+        )
+
+    def setUp(self):
+        template_cache.clear()
+        self.addCleanup(template_cache.clear)
+
+    def url(self, template: DjDynamicTemplate) -> str:
+        return f'/admin/dj_dynamic_templates/djdynamictemplate/template-view/{template.pk}/'
+
+    def test_anonymous_users_are_sent_to_login(self):
+        response = self.client.get(self.url(self.page))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/admin/login/', response['Location'])
+
+    def test_view_permission_is_required(self):
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(self.url(self.page)).status_code, 403)
+        self.staff.user_permissions.add(Permission.objects.get(codename='view_djdynamictemplate'))
+        self.assertEqual(self.client.get(self.url(self.page)).status_code, 200)
+
+    def test_etag_and_not_modified(self):
+        self.client.force_login(self.superuser)
+        response = self.client.get(self.url(self.page))
+        self.assertEqual(response.content, b'<h1>Hello</h1>')
+        self.assertIn('private', response['Cache-Control'])
+        etag = response['ETag']
+        response = self.client.get(self.url(self.page), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_etag_follows_extended_template(self):
+        self.client.force_login(self.superuser)
+        etag = self.client.get(self.url(self.page))['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.base.content = '<h2>{% block title %}{% endblock %}</h2>'
+            self.base.save()
+        response = self.client.get(self.url(self.page), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'<h2>Hello</h2>')
+
+    def test_missing_template(self):
+        self.client.force_login(self.superuser)
+        self.assertEqual(self.client.get('/admin/dj_dynamic_templates/djdynamictemplate/template-view/0/').status_code, 404)
+
+
+class AsyncTemplateViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = User.objects.create_superuser('admin', 'admin@example.com', 'admin')
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'staff', is_staff=True)
+        category = DjDynamicTemplateCategory.objects.create(app='pages', name='home')
+        cls.page = DjDynamicTemplate.objects.create(category=category, template_name='index', content='Hello {{ request.path }}')
+
+    def request(self, user, headers=None):
+        request = AsyncRequestFactory().get(f'/admin/dj_dynamic_templates/djdynamictemplate/template-view/{self.page.pk}/', headers=headers)
+        request.user = user
+        return request
+
+    async def preview(self, user, headers=None):
+        return await site._registry[DjDynamicTemplate].apreview_view(self.request(user, headers), self.page.pk)
+
+    async def test_permissions(self):
+        response = await self.preview(AnonymousUser())
+        self.assertEqual(response.status_code, 302)
+        with self.assertRaises(PermissionDenied):
+            await self.preview(self.staff)
+
+    async def test_etag_and_not_modified(self):
+        response = await self.preview(self.superuser)
+        self.assertEqual(response.content, f'Hello /admin/dj_dynamic_templates/djdynamictemplate/template-view/{self.page.pk}/'.encode())
+        response = await self.preview(self.superuser, {'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)